@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+benchmarks/run.py — wall time, request count and peak memory of CLI commands
+against a mock cluster of configurable size.
+
+The mock server from tests/mock_server.py runs in this process, filled by
+tests/datagen.py. Every command runs as a separate drove process, like a
+user would run it. Peak memory is that process's high water mark of resident
+memory (VmHWM, so Linux only).
+
+    python benchmarks/run.py                         # "small" cluster
+    python benchmarks/run.py --size large -o new.json
+    python benchmarks/run.py --compare old.json      # fails on regressions
+    python benchmarks/run.py --faults slow.json      # inject latency and errors
+
+Results are written as json so runs can be compared later with --compare.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "tests"))
+
+from datagen import ClusterShape, generate  # noqa: E402
+from mock_server import BACKENDS, MockDroveServer  # noqa: E402
+
+SIZES = {
+    "small": {"apps": 1000, "executors": 200, "instances": 10000, "events": 100000, "log_mb": 8},
+    "large": {"apps": 10000, "executors": 2000, "instances": 100000, "events": 1000000, "log_mb": 64},
+}
+
+
+def commands(cluster, download_file: str) -> dict:
+    """Benchmarked commands. tail never ends by itself, so it runs until the whole log has been printed."""
+    app_id, app = next((app_id, app) for app_id, app in cluster.apps.items() if app["instances"])
+    instance_id = app["instances"][0]["instanceId"]
+    return {
+        "apps list": ["apps", "list"],
+        "describe cluster": ["describe", "cluster"],
+        "executor appinstances": ["executor", "appinstances", cluster.executors[0]["state"]["executorId"]],
+        "cluster events": ["cluster", "events", "--count", "1024"],
+        "tail": ["appinstances", "tail", app_id, instance_id, "--log", "output.log"],
+        "download": ["appinstances", "download", app_id, instance_id, "output.log", "--out", download_file],
+    }
+
+
+# Runs drove.py and writes the peak resident memory of the process to the file in DROVE_BENCH_RSS on exit.
+# VmHWM is read from /proc because ru_maxrss can include memory of the forking benchmark process itself.
+BOOTSTRAP = """
+import atexit, os, runpy, signal, sys
+
+def report():
+    with open("/proc/self/status") as status:
+        peak = [line.split()[1] for line in status if line.startswith("VmHWM:")]
+    with open(os.environ["DROVE_BENCH_RSS"], "w") as out:
+        out.write(peak[0] if peak else "0")
+
+def stop(signum, frame):
+    sys.exit(0)
+
+atexit.register(report)
+signal.signal(signal.SIGTERM, stop)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def run_once(server: MockDroveServer, argv: list, stop_after_bytes: int = 0) -> dict:
+    server.state.request_counts.clear()
+    rss_file = tempfile.NamedTemporaryFile(suffix=".rss", delete=False)
+    rss_file.close()
+    cmd = [sys.executable, "-c", BOOTSTRAP, str(ROOT / "drove.py"), "-e", server.endpoint] + argv
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               env=dict(os.environ, DROVE_BENCH_RSS=rss_file.name))
+    received = 0
+    while True:
+        chunk = process.stdout.read1(65536)
+        if not chunk:
+            break
+        received += len(chunk)
+        if stop_after_bytes and received >= stop_after_bytes:
+            process.terminate()
+            break
+    process.stdout.close()
+    process.wait()
+    wall = time.perf_counter() - start
+    with open(rss_file.name) as stream:
+        peak_rss_kb = int(stream.read() or 0)
+    os.unlink(rss_file.name)
+    return {
+        "wall_s": wall,
+        "requests": sum(server.state.request_counts.values()),
+        "peak_rss_kb": peak_rss_kb,
+        "output_bytes": received,
+    }
+
+
+def run(sizes: dict, repeat: int, seed: int, only: list, faults: dict = None, backend: str = "threaded") -> dict:
+    server = MockDroveServer(backend)
+    started = time.perf_counter()
+    # Executors are big enough that every instance finds room
+    cluster = generate(ClusterShape(apps=sizes["apps"], executors=sizes["executors"], instances=sizes["instances"],
+                                    events=sizes["events"], tasks=sizes["apps"] // 20,
+                                    cores_per_node=64, memory_per_node=262144,
+                                    log_sizes={"output.log": int(sizes["log_mb"] * 1024 * 1024)}, seed=seed))
+    server.state.load(cluster)
+    if faults:
+        server.state.faults.configure(faults)
+    print("Generated cluster in {0:.1f}s".format(time.perf_counter() - started), file=sys.stderr)
+    server.start()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, argv in commands(cluster, os.path.join(directory, "output.log")).items():
+            if only and name not in only:
+                continue
+            stop_after = len(server.state.logs.get("output.log", "")) if name == "tail" else 0
+            runs = [run_once(server, argv, stop_after) for _ in range(repeat)]
+            results[name] = {
+                "wall_s": statistics.median(r["wall_s"] for r in runs),
+                "requests": max(r["requests"] for r in runs),
+                "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+                "output_bytes": runs[-1]["output_bytes"],
+            }
+            print("{name:<24} {wall_s:8.3f}s {requests:6d} requests {peak_rss_kb:8d} KB".format(name=name, **results[name]),
+                  file=sys.stderr)
+    server.stop()
+    return {
+        "meta": {"sizes": sizes, "seed": seed, "repeat": repeat, "faults": faults, "backend": backend, "python": platform.python_version(),
+                 "platform": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Rows comparing two runs, and whether each metric regressed by more than tolerance (a fraction)"""
+    rows = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric in ("wall_s", "requests", "peak_rss_kb"):
+            change = (result[metric] - old[metric]) / old[metric] if old[metric] else 0.0
+            # Request counts are exact, any increase is a regression
+            limit = 0.0 if metric == "requests" else tolerance
+            rows.append([name, metric, old[metric], result[metric], change, change > limit])
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark drove CLI commands against a large mock cluster")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="Preset cluster size (default: small)")
+    for key in ("apps", "executors", "instances", "events"):
+        parser.add_argument("--" + key, type=int, help="Override the number of " + key)
+    parser.add_argument("--log-mb", dest="log_mb", type=float, help="Override the log file size used by tail and download")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the generated cluster (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command; wall time is the median (default: 3)")
+    parser.add_argument("--only", action="append", help="Only run this command (can be repeated)")
+    parser.add_argument("--backend", choices=BACKENDS, default="threaded", help="Mock server backend (default: threaded)")
+    parser.add_argument("--faults", help="Fault rules for the mock server, as json (see tests/mock_faults.py)")
+    parser.add_argument("--output", "-o", help="Write results to this json file")
+    parser.add_argument("--compare", help="Compare with results from an earlier run and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown and memory growth for --compare (default: 0.2)")
+    args = parser.parse_args()
+
+    sizes = dict(SIZES[args.size])
+    for key in ("apps", "executors", "instances", "events", "log_mb"):
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    faults = None
+    if args.faults:
+        with open(args.faults) as stream:
+            faults = json.load(stream)
+    current = run(sizes, max(args.repeat, 1), args.seed, args.only, faults, args.backend)
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(current, stream, indent=2)
+    else:
+        print(json.dumps(current, indent=2))
+
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        if baseline["meta"]["sizes"] != current["meta"]["sizes"]:
+            print("Warning: baseline was run with different cluster sizes", file=sys.stderr)
+        if baseline["meta"].get("faults") != current["meta"]["faults"]:
+            print("Warning: baseline was run with different fault rules", file=sys.stderr)
+        rows = compare(baseline, current, args.tolerance)
+        for name, metric, old, new, change, regressed in rows:
+            print("{flag} {name:<24} {metric:<12} {old:>12.6g} -> {new:<12.6g} {change:+.1%}".format(
+                flag="!!" if regressed else "  ", name=name, metric=metric, old=old, new=new, change=change), file=sys.stderr)
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,42 @@
 #!/usr/bin/python3 -u
 
+# Imported first so that the time spent importing everything else can be reported by --timing
+import drovetrace
 import argparse
 import drovecli
 import droveclient
 import droveutils
+import time
 import traceback
 
+# Recorded by run(), importing this module must not turn on tracing
+IMPORTED = time.perf_counter()
+
 def build_parser() -> argparse.ArgumentParser:
 
     parser = argparse.ArgumentParser(prog="drove")
 
     parser.add_argument("--file", "-f", help="Configuration file for drove client")
     parser.add_argument("--cluster", "-c", help="Cluster name as specified in config file")
-    parser.add_argument("--endpoint", "-e", help="Drove endpoint. (For example: https://drove.test.com)")
+    parser.add_argument("--endpoint", "-e", help="Drove endpoint. Multiple controllers can be passed comma separated. (For example: https://drove.test.com)")
     parser.add_argument("--auth-header", "-t", dest="auth_header", help="Authorization header value for the provided drove endpoint")
     parser.add_argument("--insecure", "-i", help="Do not verify SSL cert for server", default=False, action="store_true")
     parser.add_argument("--username", "-u", help="Drove cluster username")
     parser.add_argument("--password", "-p", help="Drove cluster password")
+    parser.add_argument("--retry-budget", dest="retry_budget", type=float, help="Maximum time in seconds spent retrying failed calls before giving up (default: 30)")
+    parser.add_argument("--all-clusters", dest="all_clusters", help="Run a read-only command against every cluster in the config file", default=False, action="store_true")
+    parser.add_argument("--clusters", help="Run a read-only command against these clusters from the config file (comma separated)")
     parser.add_argument("--debug", "-d", help="Print details of errors", default=False, action="store_true")
+    parser.add_argument("--timing", help="Print time spent in each phase and on each request to stderr", default=False, action="store_true")
+    parser.add_argument("--trace-file", dest="trace_file", help="Write a Chrome trace (chrome://tracing, Perfetto) of this invocation to the file")
+    parser.add_argument("--profile", default=False, action="store_true",
+                        help="Profile the command, write the profile to a file and print a summary to stderr")
+    parser.add_argument("--profile-mode", dest="profile_mode", choices=["cpu", "alloc"], default="cpu",
+                        help="What --profile measures: cpu time with cProfile (default) or allocations with tracemalloc")
+    parser.add_argument("--profile-file", dest="profile_file", help="Profile output file. Default: drove-<mode>-<time>.prof (cpu) or .folded (alloc)")
+    parser.add_argument("--profile-top", dest="profile_top", type=int, default=20, help="Number of entries in the profile summary (default: 20)")
+    parser.add_argument("--startup-report", dest="startup_report", default=False, action="store_true",
+                        help="Run the command again in a new interpreter and print the time to its first request and the import cost per package to stderr")
     parser.add_argument("--full-help", help="Show help for every command and sub-command", default=False, action="store_true")
     parser.add_argument("--print-completion", choices=["bash", "zsh", "tcsh"], help="Print shell completion script for the given shell")
     return parser
@@ -29,12 +48,15 @@ def get_parser():
     return client.parser
 
 
-def run():
+def run(argv: list = None):
+    # Recorded until DroveCli knows whether --timing, --trace-file or --startup-report asked for it
+    drovetrace.TRACER.enable()
+    drovetrace.TRACER.record("import", "cli", drovetrace.PROCESS_START, IMPORTED)
     parser = build_parser()
     client = None
     try:
         client = drovecli.DroveCli(parser)
-        client.run()
+        client.run(argv)
     except (BrokenPipeError, IOError, KeyboardInterrupt):
         pass
     except droveclient.DroveException as e:
@@ -0,0 +1,54 @@
+"""
+Programmatic python API for drove.
+
+    import droveapi
+
+    api = droveapi.from_config(cluster="stage")
+    for app in api.apps.list():
+        print(app.app_id, app.state, app.healthy_instances)
+    api.apps.scale("TEST_APP-1", 2)
+
+The CLI plugins use the same resources, so anything the CLI prints is available here as models
+without parsing table output.
+"""
+
+import droveclient
+
+from types import SimpleNamespace
+
+from droveapi.models import Application, ClusterEvent, Executor, Instance, LazyList, LocalService, Task
+from droveapi.resources import Apps, Cluster, Executors, LocalServices, Tasks
+
+__all__ = ["DroveAPI", "connect", "from_config",
+           "Application", "ClusterEvent", "Executor", "Instance", "LazyList", "LocalService", "Task"]
+
+
+class DroveAPI:
+    def __init__(self, drove_client: droveclient.DroveClient):
+        self.drove_client = drove_client
+        self.apps = Apps(drove_client)
+        self.localservices = LocalServices(drove_client)
+        self.tasks = Tasks(drove_client)
+        self.executors = Executors(drove_client)
+        self.cluster = Cluster(drove_client)
+
+
+def connect(endpoint: str,
+            auth_header: str = None,
+            username: str = None,
+            password: str = None,
+            insecure: bool = False) -> DroveAPI:
+    """Connect to a cluster. endpoint can be a comma separated list of controllers."""
+    drove_client = droveclient.DroveClient()
+    drove_client.start(endpoint, auth_header, username, password, insecure)
+    return DroveAPI(drove_client)
+
+
+def from_config(cluster: str = None, file: str = None) -> DroveAPI:
+    """Connect to a cluster defined in the drove config file (~/.drove by default)"""
+    args = SimpleNamespace(endpoint=None, auth_header=None, insecure=False, username=None, password=None,
+                           file=file, cluster=cluster, debug=False)
+    drove_client = droveclient.build_drove_client(droveclient.DroveClient(), args)
+    if drove_client is None:
+        raise droveclient.DroveException(-1, "Could not load configuration for cluster {cluster}".format(cluster=cluster), raw={})
+    return DroveAPI(drove_client)
@@ -0,0 +1,253 @@
+"""
+Declarative apply of app, local service and task specs.
+
+load() reads spec documents from json files and directories of them. A document is either a spec as
+accepted by the create commands, or an object with the spec under "spec" and the wanted size next to it:
+
+    {"instances": 4, "spec": {...app spec...}}
+    {"instancesPerHost": 2, "spec": {...local service spec...}}
+
+plan() compares the documents with the cluster and decides what each one needs: CREATE for ids the cluster
+does not have, SCALE for apps and local services whose size differs, nothing for the rest. Drove ids are
+made of name and version and a spec can not change under an id, so a spec that differs from the one on
+the cluster is a CONFLICT that is reported and left alone. execute() submits the operations of a plan.
+
+Specs are compared by the digest of their normalised json. The controller fills in defaults for fields a
+spec leaves out, so a spec read from the cluster is first reduced to the fields present in the file. The
+digest of every spec read from the cluster is kept in a cache file together with the creation time of its
+app or service and the digest of the file it was compared with, so a later plan compares unchanged specs
+against the cache without fetching them again.
+"""
+
+import droveclient
+import json
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from droveapi.snapshot import digest
+from pathlib import Path
+
+KINDS = ["app", "localservice", "task"]
+
+
+class ApplyError(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class Document:
+    kind: str
+    key: str
+    spec: dict
+    spec_hash: str
+    source: str
+    # requiredInstances for apps, instancesPerHost for local services. None leaves the size alone
+    size: int = None
+
+
+@dataclass(slots=True)
+class Action:
+    document: Document
+    change: str
+    details: str = ""
+    operations: list = field(default_factory=list)
+    error: str = None
+
+
+def normalise(data):
+    """Drop null fields at every level, the controller leaves out optional fields that were not set"""
+    if isinstance(data, dict):
+        return {key: normalise(value) for key, value in data.items() if value is not None}
+    if isinstance(data, list):
+        return [normalise(value) for value in data]
+    return data
+
+
+def project(data, shape):
+    """data reduced to the fields present in shape at every level. Lists are matched element by element."""
+    if isinstance(data, dict) and isinstance(shape, dict):
+        return {key: project(data[key], shape[key]) for key in shape if key in data}
+    if isinstance(data, list) and isinstance(shape, list) and len(data) == len(shape):
+        return [project(value, wanted) for value, wanted in zip(data, shape)]
+    return data
+
+
+def spec_kind(spec: dict) -> str:
+    if "sourceAppName" in spec and "taskId" in spec:
+        return "task"
+    return "localservice" if spec.get("type") == "LOCAL_SERVICE" else "app"
+
+
+def spec_key(kind: str, spec: dict) -> str:
+    if kind == "task":
+        return "{0}/{1}".format(spec["sourceAppName"], spec["taskId"])
+    return "{0}-{1}".format(spec["name"], spec["version"])
+
+
+def spec_files(paths: list) -> list:
+    """The json files in paths, directories searched recursively, in a stable order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(str(file) for file in Path(path).rglob("*.json") if file.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def load(paths: list) -> list:
+    documents = {}
+    for filename in spec_files(paths):
+        try:
+            with open(filename) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError) as e:
+            raise ApplyError("Error reading {filename}: {error}".format(filename=filename, error=e))
+        if not isinstance(data, dict):
+            raise ApplyError("{filename} does not hold a spec".format(filename=filename))
+        spec = data["spec"] if isinstance(data.get("spec"), dict) else data
+        kind = spec_kind(spec)
+        try:
+            key = spec_key(kind, spec)
+        except KeyError as e:
+            raise ApplyError("{filename} has no {field} in its spec".format(filename=filename, field=e))
+        if key in documents:
+            raise ApplyError("{key} is in both {first} and {second}".format(key=key, first=documents[key].source, second=filename))
+        size = data.get("instances") if kind == "app" else data.get("instancesPerHost") if kind == "localservice" else None
+        documents[key] = Document(kind, key, spec, digest(normalise(spec)), filename, size)
+    return list(documents.values())
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(str(Path.home()), ".drove-mirror", "apply", name + ".json")
+
+
+class SpecCache:
+    """
+    Digests of specs on one cluster as compared with a spec file, valid for as long as the app or service they
+    belong to was created at the same time and the file is the same
+    """
+
+    def __init__(self, path: str, endpoint: str):
+        self.path = path
+        self.endpoint = endpoint
+        self.entries: dict = {}
+        self.changed = False
+        if path:
+            try:
+                with open(path) as stream:
+                    cached = json.load(stream)
+                if cached.get("endpoint") == endpoint:
+                    self.entries = cached["specs"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def get(self, kind: str, key: str, created: int, file_hash: str) -> str:
+        entry = self.entries.get(kind + "/" + key)
+        if entry is None or entry["created"] != created or entry.get("file") != file_hash:
+            return None
+        return entry["hash"]
+
+    def put(self, kind: str, key: str, created: int, file_hash: str, spec_hash: str):
+        self.entries[kind + "/" + key] = {"created": created, "file": file_hash, "hash": spec_hash}
+        self.changed = True
+
+    def save(self):
+        if not self.path or not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp = "{path}.{pid}".format(path=self.path, pid=os.getpid())
+        with open(temp, "w") as stream:
+            json.dump({"endpoint": self.endpoint, "saved": time.time(), "specs": self.entries}, stream)
+        os.replace(temp, self.path)
+
+
+def _task_exists(api, key: str) -> bool:
+    source_app, task_id = key.split("/", 1)
+    try:
+        api.tasks.get(source_app, task_id)
+        return True
+    except droveclient.DroveException as e:
+        if e.status_code == 404:
+            return False
+        raise
+
+
+def plan(api, documents: list, cache: SpecCache, parallelism: int = 8) -> list:
+    """One Action per document, in the order of the documents. Reads from the cluster run concurrently."""
+    kinds = {document.kind for document in documents}
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        apps = pool.submit(lambda: {app.app_id: app for app in api.apps.list()} if "app" in kinds else {})
+        services = pool.submit(lambda: {s.service_id: s for s in api.localservices.list()} if "localservice" in kinds else {})
+        deployed = {"app": apps.result(), "localservice": services.result()}
+
+        def current_hash(document: Document) -> str:
+            created = deployed[document.kind][document.key].created
+            spec_hash = cache.get(document.kind, document.key, created, document.spec_hash)
+            if spec_hash is None:
+                resource = api.apps if document.kind == "app" else api.localservices
+                spec_hash = digest(project(normalise(resource.spec(document.key)), normalise(document.spec)))
+                cache.put(document.kind, document.key, created, document.spec_hash, spec_hash)
+            return spec_hash
+
+        existing = [d for d in documents if d.kind != "task" and d.key in deployed[d.kind]]
+        hashes = dict(zip((d.key for d in existing), pool.map(current_hash, existing)))
+        tasks = [d for d in documents if d.kind == "task"]
+        task_exists = dict(zip((d.key for d in tasks), pool.map(lambda d: _task_exists(api, d.key), tasks)))
+
+    actions = []
+    for document in documents:
+        if document.kind == "task":
+            actions.append(Action(document, "UNCHANGED") if task_exists[document.key]
+                           else Action(document, "CREATE", operations=["CREATE"]))
+        elif document.key not in deployed[document.kind]:
+            action = Action(document, "CREATE", operations=["CREATE"])
+            if document.kind == "app" and document.size:
+                action.operations.append("SCALE")
+                action.details = "instances: {0}".format(document.size)
+            elif document.kind == "localservice":
+                action.details = "instances per host: {0}".format(document.size or 1)
+            actions.append(action)
+        elif hashes[document.key] != document.spec_hash:
+            actions.append(Action(document, "CONFLICT",
+                                  "spec {old} on cluster, {new} in file. Change the version to deploy a new spec"
+                                  .format(old=hashes[document.key][:12], new=document.spec_hash[:12])))
+        else:
+            current = deployed[document.kind][document.key]
+            size = current.required_instances if document.kind == "app" else current.instances_per_host
+            if document.size is not None and document.size != size:
+                actions.append(Action(document, "SCALE", "{old} -> {new}".format(old=size, new=document.size), ["SCALE"]))
+            else:
+                actions.append(Action(document, "UNCHANGED"))
+    return actions
+
+
+def _submit(api, action: Action) -> Action:
+    document = action.document
+    try:
+        for operation in action.operations:
+            if document.kind == "task":
+                api.tasks.create(document.spec)
+            elif document.kind == "localservice":
+                if operation == "CREATE":
+                    api.localservices.create(document.spec, document.size or 1)
+                else:
+                    api.localservices.update_instances(document.key, document.size)
+            elif operation == "CREATE":
+                api.apps.create(document.spec)
+            else:
+                api.apps.scale(document.key, document.size)
+    except droveclient.DroveException as e:
+        action.error = str(e)
+    return action
+
+
+def execute(api, actions: list, parallelism: int = 8) -> list:
+    """Submit the operations of every action that has any, at most parallelism at a time. Failures are kept in Action.error."""
+    pending = [action for action in actions if action.operations]
+    if len(pending) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(pending)))) as pool:
+        return list(pool.map(lambda action: _submit(api, action), pending))
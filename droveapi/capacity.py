@@ -0,0 +1,249 @@
+"""
+Placement capacity model for executors.
+
+Drove places all cores and memory of an instance on a single NUMA node, so free cores only count
+towards capacity when enough of them, and enough memory, are free on the same node. Each node is
+kept as an integer bitmask of free cores plus free memory, which keeps the model compact even for
+large clusters.
+"""
+
+from dataclasses import dataclass, field
+
+from droveapi.models import Executor
+
+
+@dataclass(slots=True, frozen=True)
+class Shape:
+    """Resources required by one instance"""
+    cpus: int
+    memory: int
+
+    @classmethod
+    def from_spec(cls, spec: dict) -> "Shape":
+        cpus = 0
+        memory = 0
+        for resource in spec.get("resources", []):
+            if resource.get("type") == "CPU":
+                cpus = resource.get("count", 0)
+            elif resource.get("type") == "MEMORY":
+                memory = resource.get("sizeInMB", 0)
+        return cls(cpus, memory)
+
+
+@dataclass(slots=True)
+class NumaNode:
+    node_id: str
+    free_cores: int
+    used_cores: int
+    free_memory: int
+    used_memory: int
+
+    @property
+    def free_core_count(self) -> int:
+        return self.free_cores.bit_count()
+
+    def placeable(self, shape: Shape) -> int:
+        by_cpu = self.free_core_count // shape.cpus if shape.cpus > 0 else None
+        by_memory = self.free_memory // shape.memory if shape.memory > 0 else None
+        limits = [limit for limit in (by_cpu, by_memory) if limit is not None]
+        return min(limits) if limits else 0
+
+
+def core_mask(cores) -> int:
+    mask = 0
+    for core in cores:
+        mask |= 1 << int(core)
+    return mask
+
+
+@dataclass(slots=True)
+class ExecutorCapacity:
+    executor_id: str
+    hostname: str
+    tags: list
+    active: bool
+    nodes: list = field(default_factory=list)
+
+    @classmethod
+    def from_executor(cls, executor: Executor) -> "ExecutorCapacity":
+        cpus = executor.raw["state"].get("cpus", {})
+        memory = executor.raw["state"].get("memory", {})
+        free_cores = cpus.get("freeCores", {})
+        used_cores = cpus.get("usedCores", {})
+        free_memory = memory.get("freeMemory", {})
+        used_memory = memory.get("usedMemory", {})
+        node_ids = sorted(set(free_cores) | set(used_cores) | set(free_memory) | set(used_memory), key=str)
+        nodes = [NumaNode(str(node_id),
+                          core_mask(free_cores.get(node_id, [])),
+                          core_mask(used_cores.get(node_id, [])),
+                          free_memory.get(node_id, 0),
+                          used_memory.get(node_id, 0))
+                 for node_id in node_ids]
+        active = executor.state == "ACTIVE" and not executor.raw.get("blacklisted", False)
+        return cls(executor.executor_id, executor.hostname, executor.tags, active, nodes)
+
+    @property
+    def free_cores(self) -> int:
+        return sum(node.free_core_count for node in self.nodes)
+
+    @property
+    def free_memory(self) -> int:
+        return sum(node.free_memory for node in self.nodes)
+
+    def placeable(self, shape: Shape) -> int:
+        if not self.active:
+            return 0
+        return sum(node.placeable(shape) for node in self.nodes)
+
+    def stranded_cores(self, shape: Shape) -> int:
+        """Free cores that cannot be used by any instance of this shape"""
+        if not self.active:
+            return self.free_cores
+        return self.free_cores - self.placeable(shape) * shape.cpus
+
+    def largest_free_block(self) -> int:
+        return max((node.free_core_count for node in self.nodes), default=0)
+
+    def fragmentation(self) -> float:
+        """0 when all free cores are on one NUMA node, approaching 1 as they are spread across nodes"""
+        free = self.free_cores
+        if free == 0:
+            return 0.0
+        return 1 - self.largest_free_block() / free
+
+
+@dataclass(slots=True)
+class GroupCapacity:
+    """Aggregate for a set of executors, for example all executors carrying a tag"""
+    name: str
+    executors: int = 0
+    free_cores: int = 0
+    largest_blocks: int = 0
+    placeable: int = 0
+    stranded_cores: int = 0
+
+    def add(self, executor: ExecutorCapacity, shape: Shape):
+        self.executors += 1
+        self.free_cores += executor.free_cores
+        self.largest_blocks += executor.largest_free_block()
+        self.placeable += executor.placeable(shape)
+        self.stranded_cores += executor.stranded_cores(shape)
+
+    def fragmentation(self) -> float:
+        if self.free_cores == 0:
+            return 0.0
+        return 1 - self.largest_blocks / self.free_cores
+
+
+def by_tag(executors: list, shape: Shape, untagged: str = "(untagged)") -> dict:
+    groups = {}
+    for executor in executors:
+        for tag in executor.tags or [untagged]:
+            groups.setdefault(tag, GroupCapacity(tag)).add(executor, shape)
+    return groups
+
+
+@dataclass(slots=True)
+class Placement:
+    """Result of simulating placement of new instances"""
+    requested: int
+    allocations: dict = field(default_factory=dict)
+    warnings: list = field(default_factory=list)
+
+    @property
+    def placed(self) -> int:
+        return sum(self.allocations.values())
+
+    @property
+    def unplaced(self) -> int:
+        return self.requested - self.placed
+
+
+def policy_tags(policy: dict) -> set:
+    """Tags named by MATCH_TAG policies anywhere in the policy"""
+    if not policy:
+        return set()
+    if policy.get("type") == "MATCH_TAG":
+        return {policy.get("tag")}
+    tags = set()
+    for child in policy.get("policies", []):
+        tags |= policy_tags(child)
+    return tags
+
+
+def host_limit(policy: dict, executor: ExecutorCapacity, existing: int, warnings: list):
+    """
+    Maximum number of new instances the policy allows on the executor, None meaning no limit.
+    existing is the number of instances of the app already running there.
+    """
+    if not policy:
+        return None
+    policy_type = policy.get("type", "ANY")
+    if policy_type == "ANY":
+        return None
+    if policy_type == "ONE_PER_HOST":
+        return max(0, 1 - existing)
+    if policy_type == "MAX_N_PER_HOST":
+        return max(0, policy.get("maxCount", 1) - existing)
+    if policy_type == "MATCH_TAG":
+        return None if policy.get("tag") in executor.tags else 0
+    if policy_type == "NO_TAG":
+        return None if len(executor.tags) == 0 else 0
+    if policy_type == "COMPOSITE":
+        limits = [host_limit(child, executor, existing, warnings) for child in policy.get("policies", [])]
+        if len(limits) == 0:
+            return None
+        if policy.get("combiner", "AND") == "OR":
+            return None if None in limits else max(limits)
+        bounded = [limit for limit in limits if limit is not None]
+        return min(bounded) if bounded else None
+    message = "Placement policy {type} is not evaluated locally and was treated as ANY".format(type=policy_type)
+    if message not in warnings:
+        warnings.append(message)
+    return None
+
+
+def simulate_placement(executors: list, shape: Shape, count: int, policy: dict = None, existing: dict = None) -> Placement:
+    """
+    Place count new instances of the shape on the executors, honouring the placement policy.
+    Executors with tags only take instances of apps whose policy matches one of those tags.
+    NUMA nodes are filled tightest first so large free nodes are kept for later instances.
+    existing maps executor id to the number of instances of the app already running on it.
+    """
+    existing = existing or {}
+    placement = Placement(requested=count)
+    if count <= 0:
+        return placement
+    if shape.cpus <= 0 and shape.memory <= 0:
+        placement.warnings.append("Instance shape has no CPU or memory requirements")
+        return placement
+    tags = policy_tags(policy)
+    host_remaining = {}
+    candidates = []
+    for executor in executors:
+        if not executor.active:
+            continue
+        if executor.tags and not tags.intersection(executor.tags):
+            continue
+        limit = host_limit(policy, executor, existing.get(executor.executor_id, 0), placement.warnings)
+        if limit == 0:
+            continue
+        host_remaining[executor.executor_id] = limit
+        for node in executor.nodes:
+            fits = node.placeable(shape)
+            if fits > 0:
+                candidates.append((node.free_core_count, node.free_memory, executor.executor_id, fits))
+    candidates.sort()
+    remaining = count
+    for _, _, executor_id, fits in candidates:
+        if remaining == 0:
+            break
+        limit = host_remaining[executor_id]
+        take = min(fits, remaining) if limit is None else min(fits, remaining, limit)
+        if take <= 0:
+            continue
+        placement.allocations[executor_id] = placement.allocations.get(executor_id, 0) + take
+        if limit is not None:
+            host_remaining[executor_id] = limit - take
+        remaining -= take
+    return placement
@@ -0,0 +1,98 @@
+"""
+Index over the endpoints exposed by a cluster.
+
+EndpointIndex groups endpoints by vhost and keeps the vhosts sorted, and sorted by their reversed
+text, so exact, prefix, suffix and wildcard lookups only look at the vhosts that can match instead of
+scanning the whole list. fetch() keeps a copy of the endpoint list on disk for a few seconds, so
+repeated lookups while debugging routing do not fetch every endpoint each time.
+"""
+
+import bisect
+import fnmatch
+import json
+import os
+import time
+
+from pathlib import Path
+
+WILDCARDS = "*?["
+
+
+def cache_path(name: str) -> str:
+    return os.path.join(str(Path.home()), ".drove-mirror", "endpoints", name + ".json")
+
+
+def fetch(api, path: str, ttl: float) -> list:
+    """Endpoint list from the cache file if it is younger than ttl seconds and for the same endpoint, otherwise from the cluster"""
+    endpoint = api.drove_client.endpoint
+    if ttl > 0:
+        try:
+            with open(path) as stream:
+                cached = json.load(stream)
+            if cached.get("endpoint") == endpoint and time.time() - cached.get("fetched", 0) < ttl:
+                return cached["endpoints"]
+        except (OSError, ValueError, KeyError):
+            pass
+    endpoints = api.cluster.endpoints()
+    if ttl > 0:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = "{path}.{pid}".format(path=path, pid=os.getpid())
+        with open(temp, "w") as stream:
+            json.dump({"endpoint": endpoint, "fetched": time.time(), "endpoints": endpoints}, stream)
+        os.replace(temp, path)
+    return endpoints
+
+
+def hosts(endpoint: dict) -> list:
+    return ["{0}:{1}".format(host.get("host"), host.get("port")) for host in endpoint.get("hosts", [])]
+
+
+def _literal_head(pattern: str) -> str:
+    positions = [pattern.find(c) for c in WILDCARDS if c in pattern]
+    return pattern[:min(positions)] if positions else pattern
+
+
+class EndpointIndex:
+    def __init__(self, endpoints: list):
+        self.by_vhost: dict = {}
+        for endpoint in endpoints:
+            self.by_vhost.setdefault(endpoint.get("vhost", ""), []).append(endpoint)
+        for entries in self.by_vhost.values():
+            entries.sort(key=lambda e: e.get("appId", ""))
+        self.vhosts = sorted(self.by_vhost)
+        self.reversed_vhosts = sorted(vhost[::-1] for vhost in self.vhosts)
+
+    def __len__(self) -> int:
+        return len(self.vhosts)
+
+    @staticmethod
+    def _range(keys: list, prefix: str) -> list:
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\U0010ffff")
+        return keys[start:end]
+
+    def with_prefix(self, prefix: str) -> list:
+        return self._range(self.vhosts, prefix)
+
+    def with_suffix(self, suffix: str) -> list:
+        return sorted(vhost[::-1] for vhost in self._range(self.reversed_vhosts, suffix[::-1]))
+
+    def matching(self, pattern: str) -> list:
+        """Vhosts matching pattern, case sensitive. Without wildcards this is an exact lookup."""
+        if not any(c in pattern for c in WILDCARDS):
+            return [pattern] if pattern in self.by_vhost else []
+        head = _literal_head(pattern)
+        tail = _literal_head(pattern[::-1])[::-1]
+        candidates = self.with_prefix(head) if len(head) >= len(tail) else self.with_suffix(tail)
+        return [vhost for vhost in candidates if fnmatch.fnmatchcase(vhost, pattern)]
+
+    def lookup(self, pattern: str = None, prefix: str = None, app: str = None) -> list:
+        """Endpoints for the vhosts matching pattern or prefix (all when neither is given), optionally of one app only"""
+        if pattern:
+            vhosts = self.matching(pattern)
+        elif prefix:
+            vhosts = self.with_prefix(prefix)
+        else:
+            vhosts = self.vhosts
+        return [endpoint for vhost in vhosts for endpoint in self.by_vhost[vhost]
+                if app is None or endpoint.get("appId") == app]
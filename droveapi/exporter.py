@@ -0,0 +1,163 @@
+"""
+OpenMetrics exporter for cluster state.
+
+A Refresher polls the cluster on a background thread and keeps one rendered copy of the metrics.
+Scrapes are served from that copy, so any number of scrapers share one poll loop and never cause
+calls to the controller.
+"""
+
+import threading
+import time
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricsWriter:
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name: str, metric_type: str, help_text: str):
+        self.lines.append("# TYPE {name} {type}".format(name=name, type=metric_type))
+        self.lines.append("# HELP {name} {help}".format(name=name, help=help_text))
+
+    def sample(self, metric: str, value, /, **labels):
+        if labels:
+            label_text = ",".join("{key}=\"{value}\"".format(key=key, value=escape(label)) for key, label in labels.items())
+            self.lines.append("{metric}{{{labels}}} {value}".format(metric=metric, labels=label_text, value=value))
+        else:
+            self.lines.append("{metric} {value}".format(metric=metric, value=value))
+
+    def render(self) -> str:
+        return "\n".join(self.lines + ["# EOF"]) + "\n"
+
+
+def render_cluster(writer: MetricsWriter, summary: dict, executors: list, apps: list, tasks: list):
+    writer.family("drove_cluster_state", "stateset", "Current cluster state")
+    writer.sample("drove_cluster_state", 1, drove_cluster_state=summary.get("state", "UNKNOWN"))
+    writer.family("drove_cluster_cores", "gauge", "Cores in the cluster")
+    for kind, key in (("total", "totalCores"), ("used", "usedCores"), ("free", "freeCores")):
+        writer.sample("drove_cluster_cores", summary.get(key, 0), type=kind)
+    writer.family("drove_cluster_memory_mb", "gauge", "Memory in the cluster in MB")
+    for kind, key in (("total", "totalMemory"), ("used", "usedMemory"), ("free", "freeMemory")):
+        writer.sample("drove_cluster_memory_mb", summary.get(key, 0), type=kind)
+    writer.family("drove_cluster_executors", "gauge", "Live executors")
+    writer.sample("drove_cluster_executors", summary.get("numExecutors", 0))
+    writer.family("drove_cluster_applications", "gauge", "Applications in the cluster")
+    writer.sample("drove_cluster_applications", summary.get("numApplications", 0), type="total")
+    writer.sample("drove_cluster_applications", summary.get("numActiveApplications", 0), type="active")
+
+    writer.family("drove_executor_cores", "gauge", "Cores on an executor")
+    for executor in executors:
+        writer.sample("drove_executor_cores", executor.used_cores, executor_id=executor.executor_id, hostname=executor.hostname, type="used")
+        writer.sample("drove_executor_cores", executor.free_cores, executor_id=executor.executor_id, hostname=executor.hostname, type="free")
+    writer.family("drove_executor_memory_mb", "gauge", "Memory on an executor in MB")
+    for executor in executors:
+        writer.sample("drove_executor_memory_mb", executor.used_memory, executor_id=executor.executor_id, hostname=executor.hostname, type="used")
+        writer.sample("drove_executor_memory_mb", executor.free_memory, executor_id=executor.executor_id, hostname=executor.hostname, type="free")
+
+    writer.family("drove_app_instances", "gauge", "Required and healthy instances of an application")
+    for app in apps:
+        writer.sample("drove_app_instances", app.required_instances, app_id=app.app_id, name=app.name, type="required")
+        writer.sample("drove_app_instances", app.healthy_instances, app_id=app.app_id, name=app.name, type="healthy")
+
+    writer.family("drove_tasks", "gauge", "Active tasks by source app and state")
+    for (source_app, state), count in sorted(Counter((task.source_app, task.state) for task in tasks).items()):
+        writer.sample("drove_tasks", count, source_app=source_app, state=state)
+
+
+class Refresher:
+    def __init__(self, api, interval: float = 15):
+        self.api = api
+        self.interval = interval
+        self.metrics: str = None
+        self.cluster_lines: list = None
+        self.errors = 0
+        self.last_error: Exception = None
+        self.last_refresh = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def refresh(self) -> str:
+        """Poll the cluster once and rebuild the cached metrics. Cluster metrics from the last good poll are kept if polling fails."""
+        start = time.monotonic()
+        try:
+            # Every poll gets the whole retry budget, a long outage must not stop later polls from retrying
+            self.api.drove_client.policy.reset()
+            self.api.drove_client.invalidate()
+            writer = MetricsWriter()
+            render_cluster(writer,
+                           self.api.cluster.summary(),
+                           list(self.api.executors.list()),
+                           list(self.api.apps.list()),
+                           list(self.api.tasks.list()))
+            self.cluster_lines = writer.lines
+            self.last_refresh = time.time()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = e
+        self.duration = time.monotonic() - start
+        if self.cluster_lines is None:
+            return None
+        writer = MetricsWriter()
+        writer.lines = list(self.cluster_lines)
+        self.render_exporter_metrics(writer)
+        self.metrics = writer.render()
+        return self.metrics
+
+    def render_exporter_metrics(self, writer: MetricsWriter):
+        writer.family("drove_exporter_last_refresh_timestamp_seconds", "gauge", "Time of the last successful poll of the cluster")
+        writer.sample("drove_exporter_last_refresh_timestamp_seconds", "{0:.3f}".format(self.last_refresh))
+        writer.family("drove_exporter_refresh_duration_seconds", "gauge", "Time taken by the last poll of the cluster")
+        writer.sample("drove_exporter_refresh_duration_seconds", "{0:.3f}".format(self.duration))
+        writer.family("drove_exporter_refresh_errors", "counter", "Failed polls of the cluster")
+        writer.sample("drove_exporter_refresh_errors_total", self.errors)
+
+    def run(self):
+        # The first poll is made by the caller before starting, so wait an interval before each poll
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="drove-exporter-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def parse_listen(listen: str) -> tuple:
+    """Split host:port. An empty host listens on all interfaces."""
+    host, _, port = listen.rpartition(":")
+    return host, int(port)
+
+
+def serve(refresher: Refresher, host: str, port: int) -> ThreadingHTTPServer:
+    """Create a server for the refresher's metrics. The caller runs serve_forever()."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            metrics = refresher.metrics
+            if metrics is None:
+                self.send_error(503, "Metrics not collected yet")
+                return
+            body = metrics.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), MetricsHandler)
@@ -0,0 +1,245 @@
+"""
+Local SQLite mirror of cluster state.
+
+sync() pulls applications, local services, their instances, tasks and executors into an indexed
+SQLite database. Rows are upserted by id and, where drove reports an updated timestamp, only
+rewritten when the cluster copy is newer or, for apps and services, when their state or instance
+counts differ. Specs are fetched only for applications and services that are new or were updated
+since the last sync. Rows for objects that no longer exist are deleted.
+"""
+
+import json
+import os
+import sqlite3
+
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    app_id TEXT PRIMARY KEY,
+    name TEXT,
+    state TEXT,
+    required_instances INTEGER,
+    healthy_instances INTEGER,
+    total_cpus INTEGER,
+    total_memory INTEGER,
+    image TEXT,
+    spec TEXT,
+    created INTEGER,
+    updated INTEGER
+);
+CREATE TABLE IF NOT EXISTS local_services (
+    service_id TEXT PRIMARY KEY,
+    name TEXT,
+    state TEXT,
+    activation_state TEXT,
+    instances_per_host INTEGER,
+    healthy_instances INTEGER,
+    image TEXT,
+    spec TEXT,
+    created INTEGER,
+    updated INTEGER
+);
+CREATE TABLE IF NOT EXISTS instances (
+    instance_id TEXT PRIMARY KEY,
+    app_id TEXT,
+    state TEXT,
+    executor_id TEXT,
+    hostname TEXT,
+    cpus INTEGER,
+    memory INTEGER,
+    error_message TEXT,
+    created INTEGER,
+    updated INTEGER
+);
+CREATE INDEX IF NOT EXISTS instances_app ON instances (app_id);
+CREATE INDEX IF NOT EXISTS instances_executor ON instances (executor_id);
+CREATE INDEX IF NOT EXISTS instances_state ON instances (state);
+CREATE TABLE IF NOT EXISTS service_instances (
+    instance_id TEXT PRIMARY KEY,
+    service_id TEXT,
+    state TEXT,
+    executor_id TEXT,
+    hostname TEXT,
+    cpus INTEGER,
+    memory INTEGER,
+    error_message TEXT,
+    created INTEGER,
+    updated INTEGER
+);
+CREATE INDEX IF NOT EXISTS service_instances_service ON service_instances (service_id);
+CREATE INDEX IF NOT EXISTS service_instances_executor ON service_instances (executor_id);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_key TEXT PRIMARY KEY,
+    source_app TEXT,
+    task_id TEXT,
+    instance_id TEXT,
+    state TEXT,
+    executor_id TEXT,
+    hostname TEXT,
+    cpus INTEGER,
+    memory INTEGER,
+    created INTEGER,
+    updated INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_source_app ON tasks (source_app);
+CREATE INDEX IF NOT EXISTS tasks_executor ON tasks (executor_id);
+CREATE TABLE IF NOT EXISTS executors (
+    executor_id TEXT PRIMARY KEY,
+    hostname TEXT,
+    port INTEGER,
+    state TEXT,
+    tags TEXT,
+    free_cores INTEGER,
+    used_cores INTEGER,
+    free_memory INTEGER,
+    used_memory INTEGER
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Summary columns that can change while the updated time of an app or service stays the same
+APP_SUMMARY = ("state", "required_instances", "healthy_instances", "total_cpus", "total_memory")
+SERVICE_SUMMARY = ("state", "activation_state", "instances_per_host", "healthy_instances")
+
+
+def open_mirror(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def open_read_only(path: str) -> sqlite3.Connection:
+    return sqlite3.connect("file:{path}?mode=ro".format(path=path), uri=True)
+
+
+def image(spec: dict) -> str:
+    return spec.get("executable", {}).get("url", "")
+
+
+def upsert(connection: sqlite3.Connection, table: str, key: str, rows: list, versioned: bool = True, compared: tuple = ()) -> int:
+    """Insert or update rows keyed on key. With versioned, existing rows are only updated when updated is newer
+    or one of the compared columns differs."""
+    if len(rows) == 0:
+        return 0
+    columns = list(rows[0].keys())
+    sql = "INSERT INTO {table} ({columns}) VALUES ({params}) ON CONFLICT({key}) DO UPDATE SET {updates}".format(
+        table=table, columns=", ".join(columns), params=", ".join("?" * len(columns)), key=key,
+        updates=", ".join("{column} = excluded.{column}".format(column=column) for column in columns if column != key))
+    if versioned:
+        sql = sql + " WHERE " + " OR ".join(["excluded.updated > {table}.updated".format(table=table)] +
+                                            ["excluded.{column} IS NOT {table}.{column}".format(table=table, column=column)
+                                             for column in compared])
+    before = connection.total_changes
+    connection.executemany(sql, [tuple(row[column] for column in columns) for row in rows])
+    return connection.total_changes - before
+
+
+def sweep(connection: sqlite3.Connection, table: str, key: str, ids) -> int:
+    """Delete rows whose key is not in ids"""
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS seen_ids (id TEXT PRIMARY KEY)")
+    connection.execute("DELETE FROM seen_ids")
+    connection.executemany("INSERT OR IGNORE INTO seen_ids VALUES (?)", ((i,) for i in ids))
+    return connection.execute("DELETE FROM {table} WHERE {key} NOT IN (SELECT id FROM seen_ids)".format(table=table, key=key)).rowcount
+
+
+def instance_row(instance, owner_column: str) -> dict:
+    return {
+        "instance_id": instance.instance_id,
+        owner_column: instance.app_id,
+        "state": instance.state,
+        "executor_id": instance.executor_id,
+        "hostname": instance.hostname,
+        "cpus": instance.cpus,
+        "memory": instance.memory,
+        "error_message": instance.error_message,
+        "created": instance.created,
+        "updated": instance.updated,
+    }
+
+
+def sync(api, connection: sqlite3.Connection, parallelism: int = 8) -> dict:
+    """Bring the mirror up to date. Returns the number of rows written and deleted per table."""
+    stats = {}
+    known_apps = dict(connection.execute("SELECT app_id, updated FROM apps"))
+    known_services = dict(connection.execute("SELECT service_id, updated FROM local_services"))
+    apps = list(api.apps.list())
+    services = list(api.localservices.list())
+    changed_apps = [app for app in apps if known_apps.get(app.app_id) != app.updated]
+    changed_services = [service for service in services if known_services.get(service.service_id) != service.updated]
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        app_specs = pool.map(api.apps.spec, [app.app_id for app in changed_apps])
+        service_specs = pool.map(api.localservices.spec, [service.service_id for service in changed_services])
+        app_instances = pool.map(api.apps.instances, [app.app_id for app in apps])
+        service_instances = pool.map(api.localservices.instances, [service.service_id for service in services])
+        tasks = pool.submit(api.tasks.list)
+        executors = pool.submit(api.executors.list)
+
+        with connection:
+            # Instance counts and state change without a new updated time, so they are compared on every sync.
+            # Specs can only change together with updated and are only written for the apps fetched above
+            specs = dict(zip((app.app_id for app in changed_apps), app_specs))
+            rows = [{"app_id": app.app_id, "name": app.name, "state": app.state,
+                     "required_instances": app.required_instances, "healthy_instances": app.healthy_instances,
+                     "total_cpus": app.total_cpus, "total_memory": app.total_memory, "created": app.created, "updated": app.updated}
+                    for app in apps]
+            written = upsert(connection, "apps", "app_id", [dict(row, image=image(specs[row["app_id"]]), spec=json.dumps(specs[row["app_id"]]))
+                                                            for row in rows if row["app_id"] in specs], compared=APP_SUMMARY)
+            written += upsert(connection, "apps", "app_id", [row for row in rows if row["app_id"] not in specs], compared=APP_SUMMARY)
+            stats["apps"] = (written, sweep(connection, "apps", "app_id", [app.app_id for app in apps]))
+
+            specs = dict(zip((service.service_id for service in changed_services), service_specs))
+            rows = [{"service_id": service.service_id, "name": service.name, "state": service.state,
+                     "activation_state": service.activation_state, "instances_per_host": service.instances_per_host,
+                     "healthy_instances": service.healthy_instances, "created": service.created, "updated": service.updated}
+                    for service in services]
+            written = upsert(connection, "local_services", "service_id",
+                             [dict(row, image=image(specs[row["service_id"]]), spec=json.dumps(specs[row["service_id"]]))
+                              for row in rows if row["service_id"] in specs], compared=SERVICE_SUMMARY)
+            written += upsert(connection, "local_services", "service_id", [row for row in rows if row["service_id"] not in specs],
+                              compared=SERVICE_SUMMARY)
+            stats["local_services"] = (written, sweep(connection, "local_services", "service_id", [s.service_id for s in services]))
+
+            rows = [instance_row(instance, "app_id") for instances in app_instances for instance in instances]
+            stats["instances"] = (upsert(connection, "instances", "instance_id", rows),
+                                  sweep(connection, "instances", "instance_id", [row["instance_id"] for row in rows]))
+
+            rows = [instance_row(instance, "service_id") for instances in service_instances for instance in instances]
+            stats["service_instances"] = (upsert(connection, "service_instances", "instance_id", rows),
+                                          sweep(connection, "service_instances", "instance_id", [row["instance_id"] for row in rows]))
+
+            rows = [{"task_key": "{0}/{1}".format(task.source_app, task.task_id), "source_app": task.source_app,
+                     "task_id": task.task_id, "instance_id": task.instance_id, "state": task.state,
+                     "executor_id": task.executor_id, "hostname": task.hostname, "cpus": task.cpus, "memory": task.memory,
+                     "created": task.created, "updated": task.updated}
+                    for task in tasks.result()]
+            stats["tasks"] = (upsert(connection, "tasks", "task_key", rows),
+                              sweep(connection, "tasks", "task_key", [row["task_key"] for row in rows]))
+
+            rows = [{"executor_id": executor.executor_id, "hostname": executor.hostname, "port": executor.port,
+                     "state": executor.state, "tags": json.dumps(executor.tags),
+                     "free_cores": executor.free_cores, "used_cores": executor.used_cores,
+                     "free_memory": executor.free_memory, "used_memory": executor.used_memory}
+                    for executor in executors.result()]
+            stats["executors"] = (upsert(connection, "executors", "executor_id", rows, versioned=False),
+                                  sweep(connection, "executors", "executor_id", [row["executor_id"] for row in rows]))
+            connection.execute("INSERT OR REPLACE INTO sync_state VALUES ('endpoint', ?)", (api.drove_client.endpoint,))
+    return stats
+
+
+def query(path: str, sql: str) -> tuple:
+    """Run sql against the mirror in read only mode. Returns column names and rows."""
+    connection = open_read_only(path)
+    try:
+        cursor = connection.execute(sql)
+        headers = [column[0] for column in cursor.description or []]
+        return headers, cursor.fetchall()
+    finally:
+        connection.close()
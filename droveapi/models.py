@@ -0,0 +1,270 @@
+"""
+Typed, slotted models for drove API responses.
+
+Models keep a reference to the raw json they were built from in ``raw``, so fields that are not
+modelled are still reachable. Collections are returned as LazyList, which builds a model only when
+an item is accessed, so large listings do not pay for objects that are never looked at.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Callable
+
+
+class LazyList(Sequence):
+    """Read-only sequence that converts raw json items to models on access"""
+    __slots__ = ("_items", "_factory")
+
+    def __init__(self, items: list, factory: Callable):
+        self._items = items
+        self._factory = factory
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(self._items[index], self._factory)
+        return self._factory(self._items[index])
+
+    def __iter__(self):
+        factory = self._factory
+        for item in self._items:
+            yield factory(item)
+
+    def __repr__(self) -> str:
+        return "LazyList(size={size})".format(size=len(self._items))
+
+
+def cpu_cores(raw: dict) -> dict:
+    """NUMA node -> list of cores allocated to an instance or task"""
+    for resource in raw.get("resources", []):
+        if resource.get("type") == "CPU":
+            return resource.get("cores", {})
+    return {}
+
+
+def memory_mb(raw: dict) -> dict:
+    """NUMA node -> memory in MB allocated to an instance or task"""
+    for resource in raw.get("resources", []):
+        if resource.get("type") == "MEMORY":
+            return resource.get("memoryInMB", {})
+    return {}
+
+
+@dataclass(slots=True)
+class Application:
+    app_id: str
+    name: str
+    state: str
+    total_cpus: int
+    total_memory: int
+    required_instances: int
+    healthy_instances: int
+    created: int
+    updated: int
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict, app_id: str = None) -> "Application":
+        return cls(app_id=app_id or raw.get("id", raw.get("appId")),
+                   name=raw.get("name"),
+                   state=raw.get("state"),
+                   total_cpus=raw.get("totalCPUs", 0),
+                   total_memory=raw.get("totalMemory", 0),
+                   required_instances=raw.get("requiredInstances", 0),
+                   healthy_instances=raw.get("healthyInstances", 0),
+                   created=raw.get("created", 0),
+                   updated=raw.get("updated", 0),
+                   raw=raw)
+
+
+@dataclass(slots=True)
+class LocalService:
+    service_id: str
+    name: str
+    state: str
+    activation_state: str
+    total_cpus: int
+    total_memory: int
+    instances_per_host: int
+    healthy_instances: int
+    created: int
+    updated: int
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict, service_id: str = None) -> "LocalService":
+        return cls(service_id=service_id or raw.get("id", raw.get("serviceId")),
+                   name=raw.get("name"),
+                   state=raw.get("state"),
+                   activation_state=raw.get("activationState"),
+                   total_cpus=raw.get("totalCPUs", 0),
+                   total_memory=raw.get("totalMemory", 0),
+                   instances_per_host=raw.get("instancesPerHost", 0),
+                   healthy_instances=raw.get("healthyInstances", 0),
+                   created=raw.get("created", 0),
+                   updated=raw.get("updated", 0),
+                   raw=raw)
+
+
+@dataclass(slots=True)
+class Instance:
+    """An application or local service instance. For local service instances app_id holds the service id."""
+    instance_id: str
+    app_id: str
+    app_name: str
+    state: str
+    executor_id: str
+    hostname: str
+    error_message: str
+    created: int
+    updated: int
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict) -> "Instance":
+        local_info = raw.get("localInfo") or {}
+        return cls(instance_id=raw.get("instanceId"),
+                   app_id=raw.get("appId", raw.get("serviceId")),
+                   app_name=raw.get("appName", raw.get("serviceName")),
+                   state=raw.get("state"),
+                   executor_id=local_info.get("executorId") or raw.get("executorId"),
+                   hostname=local_info.get("hostname") or raw.get("hostname", ""),
+                   error_message=raw.get("errorMessage", ""),
+                   created=raw.get("created", 0),
+                   updated=raw.get("updated", 0),
+                   raw=raw)
+
+    @property
+    def ports(self) -> dict:
+        """Port name -> host port"""
+        ports = (self.raw.get("localInfo") or {}).get("ports", {})
+        return {name: value["hostPort"] for name, value in ports.items() if "hostPort" in value}
+
+    @property
+    def cpus(self) -> int:
+        return sum(len(cores) for cores in cpu_cores(self.raw).values())
+
+    @property
+    def numa_nodes(self) -> int:
+        """NUMA nodes the cores are allocated on. The CPU column of the instance and task listings shows this"""
+        return len(cpu_cores(self.raw))
+
+    @property
+    def memory(self) -> int:
+        return sum(memory_mb(self.raw).values())
+
+
+@dataclass(slots=True)
+class Task:
+    task_id: str
+    source_app: str
+    instance_id: str
+    state: str
+    executor_id: str
+    hostname: str
+    created: int
+    updated: int
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict) -> "Task":
+        return cls(task_id=raw.get("taskId"),
+                   source_app=raw.get("sourceAppName"),
+                   instance_id=raw.get("instanceId"),
+                   state=raw.get("state"),
+                   executor_id=raw.get("executorId"),
+                   hostname=raw.get("hostname", ""),
+                   created=raw.get("created", 0),
+                   updated=raw.get("updated", 0),
+                   raw=raw)
+
+    @property
+    def cpus(self) -> int:
+        return sum(len(cores) for cores in cpu_cores(self.raw).values())
+
+    @property
+    def numa_nodes(self) -> int:
+        """NUMA nodes the cores are allocated on. The CPU column of the instance and task listings shows this"""
+        return len(cpu_cores(self.raw))
+
+    @property
+    def memory(self) -> int:
+        return sum(memory_mb(self.raw).values())
+
+
+@dataclass(slots=True)
+class Executor:
+    """
+    An executor, built either from the cluster executor listing or from the executor details call.
+    Only the details call populates the NUMA topology and the instances, tasks and service instances.
+    """
+    executor_id: str
+    hostname: str
+    port: int
+    transport_type: str
+    state: str
+    tags: list
+    free_cores: int
+    used_cores: int
+    free_memory: int
+    used_memory: int
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict) -> "Executor":
+        if "executorId" in raw:
+            return cls(executor_id=raw["executorId"],
+                       hostname=raw.get("hostname"),
+                       port=raw.get("port"),
+                       transport_type=raw.get("transportType"),
+                       state=raw.get("state"),
+                       tags=raw.get("tags", []),
+                       free_cores=raw.get("freeCores", 0),
+                       used_cores=raw.get("usedCores", 0),
+                       free_memory=raw.get("freeMemory", 0),
+                       used_memory=raw.get("usedMemory", 0),
+                       raw=raw)
+        cpus = raw["state"].get("cpus", {})
+        memory = raw["state"].get("memory", {})
+        return cls(executor_id=raw["state"]["executorId"],
+                   hostname=raw.get("hostname"),
+                   port=raw.get("port"),
+                   transport_type=raw.get("transportType"),
+                   state=raw.get("executorState"),
+                   tags=raw.get("tags", []),
+                   free_cores=sum(len(cores) for cores in cpus.get("freeCores", {}).values()),
+                   used_cores=sum(len(cores) for cores in cpus.get("usedCores", {}).values()),
+                   free_memory=sum(memory.get("freeMemory", {}).values()),
+                   used_memory=sum(memory.get("usedMemory", {}).values()),
+                   raw=raw)
+
+    @property
+    def instances(self) -> LazyList:
+        return LazyList(self.raw.get("instances", []), Instance.from_json)
+
+    @property
+    def tasks(self) -> LazyList:
+        return LazyList(self.raw.get("tasks", []), Task.from_json)
+
+    @property
+    def service_instances(self) -> LazyList:
+        return LazyList(self.raw.get("serviceInstances", []), Instance.from_json)
+
+
+@dataclass(slots=True)
+class ClusterEvent:
+    event_id: str
+    type: str
+    time: int
+    metadata: dict
+    raw: dict = field(repr=False)
+
+    @classmethod
+    def from_json(cls, raw: dict) -> "ClusterEvent":
+        return cls(event_id=raw.get("id"),
+                   type=raw.get("type"),
+                   time=raw.get("time", 0),
+                   metadata=raw.get("metadata", {}),
+                   raw=raw)
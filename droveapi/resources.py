@@ -0,0 +1,245 @@
+"""
+Resource classes wrapping DroveClient calls. Reads return models from droveapi.models and writes
+return the data section of the controller response.
+"""
+
+import droveclient
+
+from concurrent.futures import ThreadPoolExecutor
+from droveapi.models import Application, ClusterEvent, Executor, Instance, LazyList, LocalService, Task
+
+
+def op_spec(timeout: str = "5m", parallelism: int = 1) -> dict:
+    return {
+        "timeout": timeout,
+        "parallelism": parallelism,
+        "failureStrategy": "STOP"
+    }
+
+
+class Resource:
+    def __init__(self, drove_client: droveclient.DroveClient):
+        self.drove_client = drove_client
+
+
+class Apps(Resource):
+    OPERATIONS = "/apis/v1/applications/operations"
+
+    def list(self) -> LazyList:
+        data = self.drove_client.get("/apis/v1/applications")
+        return LazyList(list(data.items()), lambda item: Application.from_json(item[1], item[0]))
+
+    def get(self, app_id: str) -> Application:
+        return Application.from_json(self.drove_client.get("/apis/v1/applications/{app_id}".format(app_id=app_id)), app_id)
+
+    def spec(self, app_id: str) -> dict:
+        return self.drove_client.get("/apis/v1/applications/{app_id}/spec".format(app_id=app_id))
+
+    def instances(self, app_id: str, healthy_only: bool = False) -> LazyList:
+        data = self.drove_client.get("/apis/v1/applications/{app_id}/instances".format(app_id=app_id))
+        if healthy_only:
+            data = [instance for instance in data if instance["state"] == "HEALTHY"]
+        return LazyList(data, Instance.from_json)
+
+    def healthy_instance_ids(self, app_id: str) -> set:
+        return {instance.instance_id for instance in self.instances(app_id, healthy_only=True)}
+
+    def iter_instances(self, app_ids, healthy_only: bool = False):
+        for instance in self.drove_client.iter_app_instances(app_ids, healthy_only):
+            yield Instance.from_json(instance)
+
+    def create(self, spec: dict) -> str:
+        operation = {
+            "type": "CREATE",
+            "spec": spec,
+            "opSpec": op_spec()
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)["appId"]
+
+    def destroy(self, app_id: str) -> dict:
+        operation = {
+            "type": "DESTROY",
+            "appId": app_id,
+            "opSpec": op_spec()
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def scale(self, app_id: str, instances: int, parallelism: int = 1, timeout: str = "5m") -> dict:
+        operation = {
+            "type": "SCALE",
+            "appId": app_id,
+            "requiredInstances": instances,
+            "opSpec": op_spec(timeout, parallelism)
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def deploy(self, app_id: str, instances: int, parallelism: int = 1, timeout: str = "5m") -> dict:
+        operation = {
+            "type": "START_INSTANCES",
+            "appId": app_id,
+            "instances": instances,
+            "opSpec": op_spec(timeout, parallelism)
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def suspend(self, app_id: str, parallelism: int = 1, timeout: str = "5m") -> dict:
+        operation = {
+            "type": "SUSPEND",
+            "appId": app_id,
+            "opSpec": op_spec(timeout, parallelism)
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def restart(self, app_id: str, parallelism: int = 1, timeout: str = "5m") -> dict:
+        operation = {
+            "type": "REPLACE_INSTANCES",
+            "appId": app_id,
+            "opSpec": op_spec(timeout, parallelism)
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def cancel(self, app_id: str) -> dict:
+        return self.drove_client.post("{base}/{app_id}/cancel".format(base=self.OPERATIONS, app_id=app_id), None, False)
+
+
+class LocalServices(Resource):
+    OPERATIONS = "/apis/v1/localservices/operations"
+
+    def list(self) -> LazyList:
+        data = self.drove_client.get("/apis/v1/localservices")
+        return LazyList(list(data.items()), lambda item: LocalService.from_json(item[1], item[0]))
+
+    def get(self, service_id: str) -> LocalService:
+        return LocalService.from_json(self.drove_client.get("/apis/v1/localservices/{service_id}".format(service_id=service_id)), service_id)
+
+    def spec(self, service_id: str) -> dict:
+        return self.drove_client.get("/apis/v1/localservices/{service_id}/spec".format(service_id=service_id))
+
+    def instances(self, service_id: str, healthy_only: bool = False) -> LazyList:
+        data = self.drove_client.get("/apis/v1/localservices/{service_id}/instances".format(service_id=service_id))
+        if healthy_only:
+            data = [instance for instance in data if instance["state"] == "HEALTHY"]
+        return LazyList(data, Instance.from_json)
+
+    def healthy_instance_ids(self, service_id: str) -> set:
+        return {instance.instance_id for instance in self.instances(service_id, healthy_only=True)}
+
+    def create(self, spec: dict, instances_per_host: int = 1) -> str:
+        operation = {
+            "type": "CREATE",
+            "spec": spec,
+            "instancesPerHost": instances_per_host
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)["serviceId"]
+
+    def _simple_operation(self, operation_type: str, service_id: str) -> dict:
+        operation = {
+            "type": operation_type,
+            "serviceId": service_id
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def destroy(self, service_id: str) -> dict:
+        return self._simple_operation("DESTROY", service_id)
+
+    def activate(self, service_id: str) -> dict:
+        return self._simple_operation("ACTIVATE", service_id)
+
+    def deactivate(self, service_id: str) -> dict:
+        return self._simple_operation("DEACTIVATE", service_id)
+
+    def deploy_test_instance(self, service_id: str) -> dict:
+        return self._simple_operation("DEPLOY_TEST_INSTANCE", service_id)
+
+    def update_instances(self, service_id: str, instances_per_host: int) -> dict:
+        operation = {
+            "type": "UPDATE_INSTANCE_COUNT",
+            "serviceId": service_id,
+            "instancesPerHost": instances_per_host
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def restart(self, service_id: str, stop_first: bool = False, parallelism: int = 1, timeout: str = "5m") -> dict:
+        operation = {
+            "type": "RESTART",
+            "serviceId": service_id,
+            "stopFirst": stop_first,
+            "opSpec": op_spec(timeout, parallelism)
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+    def cancel(self, service_id: str) -> dict:
+        return self.drove_client.post("{base}/{service_id}/cancel".format(base=self.OPERATIONS, service_id=service_id), None, False)
+
+
+class Tasks(Resource):
+    OPERATIONS = "/apis/v1/tasks/operations"
+
+    def list(self, app: str = None) -> LazyList:
+        data = self.drove_client.get("/apis/v1/tasks")
+        if app:
+            data = [task for task in data if task["sourceAppName"] == app]
+        return LazyList(data, Task.from_json)
+
+    def iter_tasks(self, app: str = None):
+        for task in self.drove_client.iter_tasks(app):
+            yield Task.from_json(task)
+
+    def get(self, source_app: str, task_id: str) -> Task:
+        return Task.from_json(self.drove_client.get("/apis/v1/tasks/{source_app}/instances/{task_id}"
+                                                    .format(source_app=source_app, task_id=task_id)))
+
+    def create(self, spec: dict) -> str:
+        """Returns the drove assigned task id"""
+        operation = {
+            "type": "CREATE",
+            "spec": spec,
+            "opSpec": op_spec()
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)["taskId"]
+
+    def kill(self, source_app: str, task_id: str) -> dict:
+        operation = {
+            "type": "KILL",
+            "sourceAppName": source_app,
+            "taskId": task_id,
+            "opSpec": op_spec()
+        }
+        return self.drove_client.post(self.OPERATIONS, operation)
+
+
+class Executors(Resource):
+    def list(self) -> LazyList:
+        return LazyList(self.drove_client.get("/apis/v1/cluster/executors"), Executor.from_json)
+
+    def get(self, executor_id: str) -> Executor:
+        return Executor.from_json(self.drove_client.get("/apis/v1/cluster/executors/{id}".format(id=executor_id)))
+
+    def get_all(self, parallelism: int = 8) -> list:
+        """Details for every executor in the cluster, fetched concurrently"""
+        executor_ids = [executor.executor_id for executor in self.list()]
+        if len(executor_ids) == 0:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(executor_ids)))) as pool:
+            return list(pool.map(self.get, executor_ids))
+
+    def blacklist(self, executor_ids: list) -> dict:
+        return self.drove_client.post("/apis/v1/cluster/executors/blacklist", params={"id": executor_ids}, body={})
+
+    def unblacklist(self, executor_ids: list) -> dict:
+        return self.drove_client.post("/apis/v1/cluster/executors/unblacklist", params={"id": executor_ids}, body={})
+
+
+class Cluster(Resource):
+    def ping(self) -> dict:
+        return self.drove_client.get("/apis/v1/ping")
+
+    def summary(self) -> dict:
+        return self.drove_client.get("/apis/v1/cluster")
+
+    def endpoints(self) -> list:
+        return self.drove_client.get("/apis/v1/endpoints")
+
+    def iter_events(self, since: int = 0, types = None, page_size: int = droveclient.EVENT_PAGE_SIZE, follow: bool = False):
+        for event in self.drove_client.iter_events(since, types, page_size, follow):
+            yield ClusterEvent.from_json(event)
@@ -0,0 +1,168 @@
+"""
+Cross-cluster search index.
+
+A single SQLite database holds the searchable terms of every configured cluster: app names and ids,
+local service names and ids, task source apps and ids, docker image urls and vhosts. refresh() brings
+one cluster up to date incrementally: specs are fetched only for applications and services that are
+new or were updated since the previous refresh, and rows for objects that no longer exist are deleted.
+search() only reads the database, so it answers without calling any cluster.
+"""
+
+import os
+import sqlite3
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from droveapi.mirror import image
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    cluster TEXT,
+    kind TEXT,
+    object_id TEXT,
+    state TEXT,
+    updated INTEGER,
+    PRIMARY KEY (cluster, kind, object_id)
+);
+CREATE TABLE IF NOT EXISTS terms (
+    cluster TEXT,
+    kind TEXT,
+    object_id TEXT,
+    field TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS terms_object ON terms (cluster, kind, object_id);
+CREATE INDEX IF NOT EXISTS terms_value ON terms (value COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS clusters (
+    cluster TEXT PRIMARY KEY,
+    refreshed REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS index_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def open_index(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def vhost(spec: dict) -> str:
+    return (spec.get("exposureSpec") or {}).get("vhost", "")
+
+
+def _store(connection: sqlite3.Connection, cluster: str, kind: str, object_id: str, state: str, updated: int, terms: dict):
+    connection.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)", (cluster, kind, object_id, state, updated))
+    connection.execute("DELETE FROM terms WHERE cluster = ? AND kind = ? AND object_id = ?", (cluster, kind, object_id))
+    connection.executemany("INSERT INTO terms VALUES (?, ?, ?, ?, ?)",
+                           [(cluster, kind, object_id, field, value) for field, value in terms.items() if value])
+
+
+def _remove_missing(connection: sqlite3.Connection, cluster: str, kind: str, ids: set) -> int:
+    known = [row[0] for row in connection.execute("SELECT object_id FROM objects WHERE cluster = ? AND kind = ?", (cluster, kind))]
+    missing = [(cluster, kind, object_id) for object_id in known if object_id not in ids]
+    connection.executemany("DELETE FROM objects WHERE cluster = ? AND kind = ? AND object_id = ?", missing)
+    connection.executemany("DELETE FROM terms WHERE cluster = ? AND kind = ? AND object_id = ?", missing)
+    return len(missing)
+
+
+def refresh(api, connection: sqlite3.Connection, cluster: str, parallelism: int = 8) -> tuple:
+    """Bring the index for one cluster up to date. Returns the number of objects written and removed."""
+    known = {}
+    for kind, object_id, updated in connection.execute("SELECT kind, object_id, updated FROM objects WHERE cluster = ?", (cluster,)):
+        known[(kind, object_id)] = updated
+    apps = list(api.apps.list())
+    services = list(api.localservices.list())
+    changed_apps = [app for app in apps if known.get(("app", app.app_id)) != app.updated]
+    changed_services = [service for service in services if known.get(("localservice", service.service_id)) != service.updated]
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        app_specs = pool.map(api.apps.spec, [app.app_id for app in changed_apps])
+        service_specs = pool.map(api.localservices.spec, [service.service_id for service in changed_services])
+        tasks = pool.submit(api.tasks.list)
+
+        written = removed = 0
+        with connection:
+            for app, spec in zip(changed_apps, app_specs):
+                _store(connection, cluster, "app", app.app_id, app.state, app.updated,
+                       {"id": app.app_id, "name": app.name, "image": image(spec), "vhost": vhost(spec)})
+                written += 1
+            for service, spec in zip(changed_services, service_specs):
+                _store(connection, cluster, "localservice", service.service_id, service.state, service.updated,
+                       {"id": service.service_id, "name": service.name, "image": image(spec)})
+                written += 1
+            task_ids = set()
+            for task in tasks.result():
+                task_key = "{0}/{1}".format(task.source_app, task.task_id)
+                task_ids.add(task_key)
+                if known.get(("task", task_key)) != task.updated:
+                    _store(connection, cluster, "task", task_key, task.state, task.updated,
+                           {"id": task.task_id, "source_app": task.source_app, "image": image(task.raw)})
+                    written += 1
+            removed += _remove_missing(connection, cluster, "app", {app.app_id for app in apps})
+            removed += _remove_missing(connection, cluster, "localservice", {service.service_id for service in services})
+            removed += _remove_missing(connection, cluster, "task", task_ids)
+            connection.execute("INSERT OR REPLACE INTO clusters VALUES (?, ?, NULL)", (cluster, time.time()))
+    return written, removed
+
+
+def record_failure(connection: sqlite3.Connection, cluster: str, error: str):
+    """Keep the entries from the last successful refresh and remember why this one failed"""
+    with connection:
+        connection.execute("INSERT INTO clusters VALUES (?, NULL, ?) ON CONFLICT(cluster) DO UPDATE SET error = excluded.error",
+                           (cluster, error))
+
+
+def forget(connection: sqlite3.Connection, clusters: list) -> None:
+    """Drop entries for clusters that are no longer in the config file. The index must only hold clusters of that file."""
+    with connection:
+        for table in ("objects", "terms", "clusters"):
+            connection.execute("DELETE FROM {table} WHERE cluster NOT IN ({params})".format(
+                table=table, params=", ".join("?" * len(clusters))), clusters)
+
+
+def refreshed_at(connection: sqlite3.Connection) -> dict:
+    """Time of the last successful refresh of each cluster"""
+    return {cluster: refreshed for cluster, refreshed in connection.execute("SELECT cluster, refreshed FROM clusters")}
+
+
+def mark_refresh_started(connection: sqlite3.Connection, started: float = None) -> None:
+    with connection:
+        connection.execute("INSERT OR REPLACE INTO index_state VALUES ('refresh_started', ?)", (str(started or time.time()),))
+
+
+def refresh_started(connection: sqlite3.Connection) -> float:
+    row = connection.execute("SELECT value FROM index_state WHERE key = 'refresh_started'").fetchone()
+    return float(row[0]) if row else 0.0
+
+
+def like_pattern(pattern: str) -> str:
+    """Shell style wildcards (* and ?) anchor the match; anything else matches as a substring"""
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if "*" in pattern or "?" in pattern:
+        return escaped.replace("*", "%").replace("?", "_")
+    return "%" + escaped + "%"
+
+
+def search(connection: sqlite3.Connection, pattern: str, kinds: list = None, fields: list = None) -> list:
+    """Case insensitive search over all indexed terms. Returns (cluster, kind, object_id, state, field, value) rows."""
+    sql = ("SELECT t.cluster, t.kind, t.object_id, o.state, t.field, t.value FROM terms t"
+           " JOIN objects o USING (cluster, kind, object_id)"
+           " WHERE t.value LIKE ? ESCAPE '\\'")
+    params = [like_pattern(pattern)]
+    if kinds:
+        sql += " AND t.kind IN ({0})".format(", ".join("?" * len(kinds)))
+        params.extend(kinds)
+    if fields:
+        sql += " AND t.field IN ({0})".format(", ".join("?" * len(fields)))
+        params.extend(fields)
+    sql += " ORDER BY t.cluster, t.kind, t.object_id, t.field"
+    return connection.execute(sql, params).fetchall()
@@ -0,0 +1,177 @@
+"""
+Cluster state snapshots.
+
+A snapshot is a gzip compressed json document with one section per kind of object (apps, local services,
+tasks, executors and endpoints). Every item, every section and the snapshot as a whole carry a sha256
+hash of their content, computed bottom up like a merkle tree. Diffs compare hashes first and only
+descend into sections and items whose hashes differ, so unchanged parts of large clusters cost nothing.
+"""
+
+import gzip
+import hashlib
+import json
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+FORMAT_VERSION = 1
+SECTIONS = ["apps", "localservices", "tasks", "executors", "endpoints"]
+
+
+def digest(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def build_section(items: dict) -> dict:
+    hashed = {key: {"hash": digest(value), "data": value} for key, value in items.items()}
+    return {
+        "hash": digest(sorted((key, item["hash"]) for key, item in hashed.items())),
+        "items": hashed
+    }
+
+
+def placements(instances) -> dict:
+    return {instance.instance_id: {"executorId": instance.executor_id, "state": instance.state} for instance in instances}
+
+
+def capture(api, parallelism: int = 8) -> dict:
+    """Capture the current state of the cluster behind a droveapi.DroveAPI"""
+    apps = list(api.apps.list())
+    services = list(api.localservices.list())
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        app_specs = pool.map(api.apps.spec, [app.app_id for app in apps])
+        app_instances = pool.map(api.apps.instances, [app.app_id for app in apps])
+        service_specs = pool.map(api.localservices.spec, [service.service_id for service in services])
+        service_instances = pool.map(api.localservices.instances, [service.service_id for service in services])
+        tasks = pool.submit(api.tasks.list)
+        executors = pool.submit(api.executors.list)
+        endpoints = pool.submit(api.cluster.endpoints)
+
+        sections = dict()
+        sections["apps"] = {
+            app.app_id: {"summary": app.raw, "spec": spec, "specHash": digest(spec), "instances": placements(instances)}
+            for app, spec, instances in zip(apps, app_specs, app_instances)
+        }
+        sections["localservices"] = {
+            service.service_id: {"summary": service.raw, "spec": spec, "specHash": digest(spec), "instances": placements(instances)}
+            for service, spec, instances in zip(services, service_specs, service_instances)
+        }
+        sections["tasks"] = {"{0}/{1}".format(task.source_app, task.task_id): task.raw for task in tasks.result()}
+        sections["executors"] = {executor.executor_id: executor.raw for executor in executors.result()}
+        vhosts = dict()
+        for endpoint in endpoints.result():
+            vhosts.setdefault(endpoint.get("vhost", ""), []).append(endpoint)
+        sections["endpoints"] = {vhost: sorted(entries, key=digest) for vhost, entries in vhosts.items()}
+
+    built = {name: build_section(sections[name]) for name in SECTIONS}
+    return {
+        "version": FORMAT_VERSION,
+        "endpoint": api.drove_client.endpoint,
+        "hash": digest([built[name]["hash"] for name in SECTIONS]),
+        "sections": built
+    }
+
+
+def save(snapshot: dict, filename: str):
+    with gzip.open(filename, "wt", encoding="utf-8") as fp:
+        json.dump(snapshot, fp, separators=(",", ":"))
+
+
+def load(filename: str) -> dict:
+    with gzip.open(filename, "rt", encoding="utf-8") as fp:
+        snapshot = json.load(fp)
+    if snapshot.get("version") != FORMAT_VERSION:
+        raise ValueError("Unsupported snapshot version {version} in {filename}".format(version=snapshot.get("version"), filename=filename))
+    return snapshot
+
+
+@dataclass(slots=True)
+class Change:
+    section: str
+    key: str
+    change: str
+    details: str = ""
+
+
+@dataclass(slots=True)
+class CapacityDelta:
+    executor_id: str
+    hostname: str
+    used_cores: int
+    used_memory: int
+
+
+@dataclass(slots=True)
+class SnapshotDiff:
+    identical: bool = False
+    changes: list = field(default_factory=list)
+    capacity: list = field(default_factory=list)
+
+
+def describe_deployment_change(old: dict, new: dict) -> list:
+    details = []
+    if old["specHash"] != new["specHash"]:
+        details.append("spec {old} -> {new}".format(old=old["specHash"][:12], new=new["specHash"][:12]))
+    if old["summary"].get("state") != new["summary"].get("state"):
+        details.append("state {old} -> {new}".format(old=old["summary"].get("state"), new=new["summary"].get("state")))
+    old_instances = old["instances"]
+    new_instances = new["instances"]
+    started = len(new_instances.keys() - old_instances.keys())
+    stopped = len(old_instances.keys() - new_instances.keys())
+    if started or stopped:
+        details.append("instances +{started} -{stopped}".format(started=started, stopped=stopped))
+    for instance_id in sorted(old_instances.keys() & new_instances.keys()):
+        old_executor = old_instances[instance_id]["executorId"]
+        new_executor = new_instances[instance_id]["executorId"]
+        if old_executor != new_executor:
+            details.append("{instance} moved {old} -> {new}".format(instance=instance_id, old=old_executor, new=new_executor))
+    return details
+
+
+def describe_item_change(section: str, old: dict, new: dict) -> str:
+    if section in ("apps", "localservices"):
+        details = describe_deployment_change(old, new)
+    elif isinstance(old, dict) and isinstance(new, dict) and "state" in old and old.get("state") != new.get("state"):
+        details = ["state {old} -> {new}".format(old=old.get("state"), new=new.get("state"))]
+    else:
+        details = []
+    if not details and isinstance(old, dict) and isinstance(new, dict):
+        fields = sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+        details = ["changed: " + ", ".join(fields)]
+    elif not details:
+        details = ["changed"]
+    return "; ".join(details)
+
+
+def diff(old: dict, new: dict) -> SnapshotDiff:
+    result = SnapshotDiff()
+    if old["hash"] == new["hash"]:
+        result.identical = True
+        return result
+    for section in SECTIONS:
+        old_section = old["sections"][section]
+        new_section = new["sections"][section]
+        if old_section["hash"] == new_section["hash"]:
+            continue
+        old_items = old_section["items"]
+        new_items = new_section["items"]
+        for key in sorted(new_items.keys() - old_items.keys()):
+            result.changes.append(Change(section, key, "ADDED"))
+        for key in sorted(old_items.keys() - new_items.keys()):
+            result.changes.append(Change(section, key, "REMOVED"))
+        for key in sorted(old_items.keys() & new_items.keys()):
+            if old_items[key]["hash"] != new_items[key]["hash"]:
+                result.changes.append(Change(section, key, "CHANGED",
+                                             describe_item_change(section, old_items[key]["data"], new_items[key]["data"])))
+    old_executors = old["sections"]["executors"]["items"]
+    new_executors = new["sections"]["executors"]["items"]
+    for executor_id in sorted(old_executors.keys() | new_executors.keys()):
+        before = old_executors.get(executor_id, {}).get("data", {})
+        after = new_executors.get(executor_id, {}).get("data", {})
+        delta = CapacityDelta(executor_id,
+                              after.get("hostname", before.get("hostname", "")),
+                              after.get("usedCores", 0) - before.get("usedCores", 0),
+                              after.get("usedMemory", 0) - before.get("usedMemory", 0))
+        if delta.used_cores or delta.used_memory:
+            result.capacity.append(delta)
+    return result
@@ -1,8 +1,21 @@
 import argparse
+import contextlib
 import droveclient
+import drovetrace
+import droveutils
+import io
+import os
+import plugins
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from plugins import DrovePlugin
 from types import SimpleNamespace
-import shtab
+
+# Commands that only read cluster state and so can be run against several clusters at once
+READ_ONLY_COMMANDS = {"list", "summary", "spec", "info", "show", "ping", "leader", "endpoints", "capacity"}
+# Read-only commands that print a single table through droveutils.print_table, so --watch can match their rows
+WATCH_COMMANDS = {"list"}
 
 
 class DroveCli:
@@ -10,14 +23,30 @@ class DroveCli:
         self.parser = parser
         self.plugins: dict[str, DrovePlugin] = {}
         self.debug = False
-        subparsers = parser.add_subparsers(help="Available plugins", dest="plugin")
-        drove_client = droveclient.DroveClient()
-        for plugin_class in DrovePlugin.plugins:
-            plugin = plugin_class()
-            # print("Loading plugin: " + str(plugin))
-            plugin.populate_options(drove_client=drove_client, subparser=subparsers)
-            self.plugins[plugin.name()] = plugin
-        parser.set_defaults(func=self.show_help)
+        with drovetrace.span("parser"):
+            subparsers = parser.add_subparsers(help="Available plugins", dest="plugin")
+            drove_client = droveclient.DroveClient(cache_ttl=droveclient.CACHE_TTL)
+            for plugin_class in DrovePlugin.plugins:
+                plugin = plugin_class()
+                # print("Loading plugin: " + str(plugin))
+                plugin.populate_options(drove_client=drove_client, subparser=subparsers)
+                self.plugins[plugin.name()] = plugin
+            self._add_command_options(subparsers)
+            parser.set_defaults(func=self.show_help)
+
+    @staticmethod
+    def _add_command_options(subparsers: argparse._SubParsersAction) -> None:
+        """Add --watch to commands that render one table, and mark commands that only read cluster state"""
+        for plugin_name, plugin_parser in subparsers.choices.items():
+            for action in plugin_parser._actions:
+                if not isinstance(action, argparse._SubParsersAction):
+                    continue
+                for command_name, command_parser in action.choices.items():
+                    if command_name in WATCH_COMMANDS and command_name in READ_ONLY_COMMANDS:
+                        command_parser.add_argument("--watch", nargs="?", type=float, const=2.0, metavar="interval",
+                                                    help="Refresh every <interval> seconds (default: 2) and highlight changed rows. Press CTRL-C to exit")
+                    if command_name in READ_ONLY_COMMANDS or plugin_name == "describe":
+                        command_parser.set_defaults(read_only=True)
 
     @staticmethod
     def _print_full_help(parser: argparse.ArgumentParser) -> None:
@@ -32,11 +61,38 @@ class DroveCli:
                     DroveCli._print_full_help(subparser)
                 break
 
-    def run(self):
-        args = self.parser.parse_args()
+    def run(self, argv: list = None):
+        with drovetrace.span("parse args"):
+            args = self.parser.parse_args(argv)
         self.debug = args.debug
+        if not (args.timing or args.trace_file or args.startup_report):
+            drovetrace.TRACER.disable()
+        if args.startup_report:
+            self.startup_report(args, sys.argv[1:] if argv is None else argv)
+            return
+        try:
+            if args.profile:
+                with drovetrace.profile(args.profile_mode, args.profile_file, args.profile_top):
+                    self._run(args)
+            else:
+                self._run(args)
+        finally:
+            if args.trace_file:
+                drovetrace.TRACER.write_chrome_trace(args.trace_file)
+            if args.timing:
+                drovetrace.TRACER.print_summary()
+
+    @staticmethod
+    def startup_report(args: argparse.Namespace, argv: list) -> None:
+        argv = [arg for arg in argv if arg != "--startup-report"]
+        code = drovetrace.startup_report(os.path.abspath(sys.argv[0]), argv, args.profile_top)
+        if code != 0:
+            exit(code)
+
+    def _run(self, args: argparse.Namespace):
 
         if args.print_completion:
+            import shtab
             print(shtab.complete(self.parser, shell=args.print_completion))
             exit(0)
 
@@ -48,12 +104,92 @@ class DroveCli:
         if args.debug:
             print("Selected plugin: " + args.plugin)
 
+        if args.all_clusters or args.clusters:
+            self.fan_out(args)
+            return
+
         if args.plugin:
             plugin = self.plugins.get(args.plugin)
             if plugin and plugin.needs_client():
                 if droveclient.build_drove_client(plugin.drove_client, args) is None:
                     return
-        args.func(args)
+        with drovetrace.span("command", command=" ".join(filter(None, [args.plugin, getattr(args, "command", None)]))):
+            if getattr(args, "watch", None) is not None:
+                self.watch(args)
+                return
+            args.func(args)
+
+    def watch(self, args: argparse.Namespace) -> None:
+        plugin = self.plugins.get(args.plugin)
+
+        def produce() -> list:
+            # Each refresh must go to the cluster instead of reusing cached responses, and gets the whole retry budget
+            plugin.drove_client.invalidate()
+            plugin.drove_client.policy.reset()
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                args.func(args)
+            return output.getvalue().rstrip("\n").splitlines()
+
+        droveutils.watch(produce, max(args.watch, 0.1))
+
+    def fan_out(self, args: argparse.Namespace) -> None:
+        """Run a read-only command against several clusters concurrently and merge the output"""
+        if not getattr(args, "read_only", False):
+            print("Error: --all-clusters and --clusters can only be used with read-only commands")
+            return
+        if getattr(args, "watch", None) is not None:
+            print("Error: --watch cannot be used with --all-clusters or --clusters")
+            return
+        if args.clusters:
+            clusters = [name.strip() for name in args.clusters.split(",") if name.strip()]
+        else:
+            try:
+                clusters = droveclient.cluster_names(args.file)
+            except (OSError, IOError) as e:
+                print("Error reading config file: " + str(e))
+                return
+        if len(clusters) == 0:
+            print("Error: no clusters to run against")
+            return
+
+        def run_on(cluster: str) -> SimpleNamespace:
+            result = SimpleNamespace(cluster=cluster, output=None, error=None, latency=0.0)
+            start = time.monotonic()
+            with droveutils.capture_output() as output:
+                result.output = output
+                try:
+                    # Commands see the cluster they run against, for example to name per cluster caches
+                    options = droveclient.cluster_args(args, cluster)
+                    drove_client = droveclient.connect_drove_client(droveclient.DroveClient(cache_ttl=droveclient.CACHE_TTL), options)
+                    with plugins.using_client(drove_client):
+                        args.func(options)
+                except Exception as e:
+                    result.error = str(e)
+            result.latency = time.monotonic() - start
+            return result
+
+        stdout = sys.stdout
+        sys.stdout = droveutils.ThreadLocalStdout(stdout)
+        try:
+            with ThreadPoolExecutor(max_workers=len(clusters)) as pool:
+                results = list(pool.map(run_on, clusters))
+        finally:
+            sys.stdout = stdout
+
+        succeeded = [r for r in results if r.error is None]
+        tables = [r.output.only_table() for r in succeeded]
+        if len(succeeded) > 0 and all(t is not None for t in tables) and all(t[0] == tables[0][0] for t in tables):
+            rows = [[r.cluster] + list(row) for r, (_, table_rows) in zip(succeeded, tables) for row in table_rows]
+            droveutils.print_table(["Cluster"] + tables[0][0], rows)
+        else:
+            for result in succeeded:
+                print("=" * 20 + " " + result.cluster + " " + "=" * 20)
+                print(result.output.text.getvalue(), end="")
+
+        import tabulate
+        report = [[r.cluster, "OK" if r.error is None else "ERROR", "{0:.0f}".format(r.latency * 1000), r.error or ""] for r in results]
+        print(tabulate.tabulate(report, headers=["Cluster", "Status", "Latency (ms)", "Error"]), file=sys.stderr)
 
     def show_help(self, options: SimpleNamespace) -> None:
         self.parser.print_help()
@@ -1,31 +1,74 @@
 import configparser
+import drovetrace
 import json
 import os
-import ssl
-import requests
-import urllib3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry as BaseRetry
 from types import SimpleNamespace
+from urllib.parse import urlparse
 
-class CustomRetry(BaseRetry):
+# Seconds to wait for a controller to answer a leader probe before moving on
+PROBE_TIMEOUT = 2.0
+# (connect, read) timeouts in seconds for a single attempt
+REQUEST_TIMEOUT = (5.0, 60.0)
+# Seconds for which the CLI reuses a GET response for later identical calls in the same invocation.
+# Clients built by library users do not cache unless asked to
+CACHE_TTL = 2.0
+# Number of events requested per call while paging through cluster events
+EVENT_PAGE_SIZE = 1024
+
+class RetryPolicy:
     """
-    Custom Retry class that prevents retries on SSLError.
+    Retry settings shared by every call made through one client. Time spent on backoff and on retried
+    attempts is charged to the budget and retries stop once it is used up, so the budget caps a whole
+    command. Long running commands (exporter, top, --watch) call reset() at the start of every cycle.
     """
-    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
-        if error and isinstance(error, urllib3.exceptions.SSLError):
-            raise error
-        return super().increment(method, url, response, error, _pool, _stacktrace)
+    def __init__(self,
+                 budget: float = 30.0,
+                 retries: int = 5,
+                 backoff_factor: float = 0.2,
+                 backoff_max: float = 5.0,
+                 methods: list = None,
+                 breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.budget = budget
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.methods = frozenset(m.upper() for m in (methods or ["GET"]))
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def spend(self, seconds: float):
+        with self._lock:
+            self.spent += seconds
+
+    def reset(self):
+        with self._lock:
+            self.spent = 0.0
+
+    def remaining(self) -> float:
+        return self.budget - self.spent
 
-class TokenAuth(requests.auth.AuthBase):
-    def __init__(self, token: str):
-        self.token = token
-        super().__init__()
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0
 
-    def __call__(self, r):
-        r.headers.update({"Authorization": self.token})
-        return r
+    def build_retry(self, connect_retries: int = None, retry_unavailable: bool = True) -> "drovehttp.CustomRetry":
+        import drovehttp
+        return drovehttp.CustomRetry(total=self.retries,
+                           connect=self.retries if connect_retries is None else connect_retries,
+                           read=self.retries,
+                           status=self.retries,
+                           status_forcelist=[502, 503, 504] if retry_unavailable else [502, 504],
+                           allowed_methods=self.methods,
+                           raise_on_status=False,
+                           backoff_factor=self.backoff_factor,
+                           backoff_max=self.backoff_max,
+                           policy=self)
 
 class DroveException(Exception):
     """Exception raised while calling drove endpoint"""
@@ -36,21 +79,119 @@ class DroveException(Exception):
         self.api_response = api_response
         super().__init__(message)
 
+class ConfigError(DroveException):
+    """Raised when the cluster to connect to can not be read from the config file"""
+
+    def __init__(self, message: str):
+        super().__init__(-1, message, raw={})
+
+class CircuitBreaker:
+    """Stops sending requests after too many consecutive failures, allowing a trial call after a cool down"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float = None
+        # Shared by the threads of concurrent fetches made through one client
+        self._lock = threading.Lock()
+
+    def check(self, endpoint: str):
+        with self._lock:
+            failures, opened_at = self.failures, self.opened_at
+        if opened_at is None or time.monotonic() - opened_at >= self.cooldown:
+            return
+        raise DroveException(-1, "Circuit breaker open after {failures} consecutive failed calls to {endpoint}. "
+                                 "Not sending further requests for {wait:.0f} seconds"
+                             .format(failures=failures, endpoint=endpoint,
+                                     wait=self.cooldown - (time.monotonic() - opened_at)),
+                             raw={})
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures = self.failures + 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+def parse_endpoints(endpoint: str) -> list:
+    """Split a comma separated list of controller endpoints, dropping trailing slashes"""
+    endpoints = []
+    for value in endpoint.split(","):
+        value = value.strip()
+        if value:
+            endpoints.append(value[:-1] if value.endswith('/') else value)
+    return endpoints
+
+def endpoint_for_leader(leader: str, endpoints: list) -> str:
+    """Map the leader reported by /apis/v1/cluster (host:port) to one of the configured endpoints"""
+    if not leader:
+        return None
+    leader_netloc = urlparse(leader if "://" in leader else "//" + leader).netloc.lower()
+    leader_host = leader_netloc.split(":")[0]
+    for endpoint in endpoints:
+        if urlparse(endpoint).netloc.lower() == leader_netloc:
+            return endpoint
+    for endpoint in endpoints:
+        if (urlparse(endpoint).hostname or "").lower() == leader_host:
+            return endpoint
+    return None
+
+def cache_key(path: str, params) -> tuple:
+    if params is None:
+        return (path, None)
+    items = params.items() if isinstance(params, dict) else params
+    return (path, tuple(sorted((str(k), str(v)) for k, v in items)))
+
 class DroveClient:
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 0):
         self.endpoint: str = None
+        self.endpoints: list = []
         self.auth_header: str = None
         self.username = None
         self.password = None
         self.insecure: bool = False
-        self.session = requests.session()
-        retries = CustomRetry(connect=5,
-                              read=5,
-                              backoff_factor=0.1)
+        self._session = None
+        self._connect_retries: int = None
+        self._failover = False
+        self.configure_retries(RetryPolicy())
+        self.cache_ttl = cache_ttl
+        self._cache: dict = {}
+        self._inflight: dict = {}
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
 
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-    
+    @property
+    def session(self) -> "requests.Session":
+        """Created on first use, so that commands which never call a cluster do not pay for importing requests"""
+        if self._session is None:
+            import requests
+            self._session = requests.session()
+            self._mount(self._session)
+        return self._session
+
+    def configure_retries(self, policy: RetryPolicy):
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.breaker_threshold, policy.breaker_cooldown)
+        self.mount_adapters()
+
+    def mount_adapters(self, connect_retries: int = None, failover: bool = False):
+        self._connect_retries = connect_retries
+        self._failover = failover
+        if self._session is not None:
+            self._mount(self._session)
+
+    def _mount(self, session: "requests.Session"):
+        import drovehttp
+        # With several controllers a 503 means the leader moved, which a new probe finds faster than retrying
+        retries = self.policy.build_retry(self._connect_retries, retry_unavailable=not self._failover)
+
+        session.mount('https://', drovehttp.TimedAdapter(max_retries=retries))
+        session.mount('http://', drovehttp.TimedAdapter(max_retries=retries))
 
     def start(self,
                endpoint: str = None,
@@ -58,20 +199,136 @@ class DroveClient:
                username: str = None,
                password: str = None,
                insecure: bool = False):
-        self.endpoint = endpoint
+        self.endpoints = parse_endpoints(endpoint)
+        self.endpoint = self.endpoints[0]
         self.auth_header = auth_header
         self.insecure = insecure
         self.session.verify = not insecure
         if insecure:
+            import urllib3
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         if username != None and password != None:
+            import requests
             self.session.auth = requests.auth.HTTPBasicAuth(username, password)
         elif auth_header:
-            self.session.auth = TokenAuth(auth_header)
+            import drovehttp
+            self.session.auth = drovehttp.TokenAuth(auth_header)
 
+        if len(self.endpoints) > 1:
+            # Failing over to the next controller is much cheaper than retrying a dead one
+            self.mount_adapters(connect_retries=0, failover=True)
+            self.endpoint = self.find_leader()
         self.get("/apis/v1/ping")
         # print("Connection validated for endpoint: " + self.endpoint)        
 
+    def find_leader(self, exclude: set = None) -> str:
+        """
+        Probe all configured controllers in parallel and return the endpoint of the leader.
+        Falls back to the first reachable controller if the leader is not among the configured endpoints.
+        """
+        candidates = [e for e in self.endpoints if e not in (exclude or set())]
+        if len(candidates) == 0:
+            raise DroveException(-1, "Error connecting to endpoints " + ", ".join(self.endpoints), raw={})
+        import requests
+        with requests.session() as probe:
+            probe.verify = self.session.verify
+            probe.auth = self.session.auth
+            pool = ThreadPoolExecutor(max_workers=len(candidates))
+            try:
+                futures = {pool.submit(self._probe, probe, candidate): candidate for candidate in candidates}
+                reachable = []
+                leader = None
+                for future in as_completed(futures):
+                    data = future.result()
+                    if data is None:
+                        continue
+                    reachable.append(futures[future])
+                    leader = leader or endpoint_for_leader(data.get("leader"), candidates)
+                    if leader in reachable:
+                        return leader
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        if len(reachable) == 0:
+            raise DroveException(-1, "Error connecting to endpoints " + ", ".join(candidates), raw={})
+        # Keep the order from the config so that the choice is predictable
+        return [e for e in candidates if e in reachable][0]
+
+    def _probe(self, probe: "requests.Session", endpoint: str) -> dict:
+        try:
+            return handle_drove_response(probe.get(endpoint + "/apis/v1/cluster", timeout=PROBE_TIMEOUT), 200)
+        except Exception:
+            return None
+
+    def send(self, method: str, path: str, **kwargs) -> "requests.Response":
+        """
+        Send a request to the current leader, failing over to another controller if it cannot be reached or
+        answers 503. Transport failures are raised as DroveException.
+        """
+        import drovehttp
+        import requests
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        try:
+            response = self._send_once(method, path, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # Only replay requests that are known not to have reached the controller, unless they are idempotent
+            if len(self.endpoints) < 2 or (method != "GET" and not drovehttp.is_connect_failure(e)):
+                raise self.connection_error() from e
+            self.endpoint = self.find_leader(exclude={self.endpoint})
+            try:
+                return self._send_once(method, path, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise self.connection_error() from e
+        if response.status_code != 503 or len(self.endpoints) < 2:
+            return response
+        # A controller that lost the leadership still accepts connections but refuses calls. Move to the new
+        # leader for later calls and replay the call if it is idempotent
+        try:
+            leader = self.find_leader()
+        except DroveException:
+            return response
+        if leader == self.endpoint:
+            return response
+        self.endpoint = leader
+        if method != "GET":
+            return response
+        try:
+            return self._send_once(method, path, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise self.connection_error() from e
+
+    def _send_once(self, method: str, path: str, **kwargs) -> "requests.Response":
+        import requests
+        self.breaker.check(self.endpoint)
+        drovetrace.TRACER.take_connect()
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.endpoint + path, **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            drovetrace.TRACER.record(method + " " + path, "http", start, time.perf_counter(), method=method, path=path,
+                                     endpoint=self.endpoint, status=-1, connect_ms=drovetrace.TRACER.take_connect() * 1000,
+                                     error=type(e).__name__)
+            raise
+        if drovetrace.TRACER.enabled:
+            retries = response.raw.retries if response.raw is not None else None
+            drovetrace.TRACER.record(method + " " + path, "http", start, time.perf_counter(), method=method, path=path,
+                                     endpoint=self.endpoint, status=response.status_code,
+                                     bytes=int(response.headers.get("Content-Length", 0)) if kwargs.get("stream") else len(response.content),
+                                     connect_ms=drovetrace.TRACER.take_connect() * 1000,
+                                     ttfb_ms=response.elapsed.total_seconds() * 1000,
+                                     retries=len(retries.history) if retries is not None else 0)
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def connection_error(self) -> DroveException:
+        message = "Error connecting to endpoint " + self.endpoint
+        if self.policy.exhausted():
+            message = message + " (retry budget of {budget:g} seconds exhausted)".format(budget=self.policy.budget)
+        return DroveException(-1, message, raw={})
+
     def app_instances(self, app_id: str, healthy_only: bool = True):
         data = self.get("/apis/v1/applications/{app_id}/instances".format(app_id=app_id))
         instances = [instance["instanceId"] for instance in data if not healthy_only or instance["state"] == "HEALTHY"]
@@ -82,18 +339,103 @@ class DroveClient:
         instances = [instance["instanceId"] for instance in data if not healthy_only or instance["state"] == "HEALTHY"]
         return set(instances)
 
+    def iter_events(self, since: int = 0, types = None, page_size: int = EVENT_PAGE_SIZE,
+                    follow: bool = False, poll_interval: float = 1.0):
+        """
+        Yield cluster events newer than since (epoch millis) in time order, paging with lastSyncTime.
+        The cursor is the newest event time seen so far and events at that time are remembered by id,
+        so events repeated across page boundaries are yielded only once. With follow the generator
+        keeps polling for new events and never returns.
+        """
+        cursor = since
+        seen = {}
+        while True:
+            events = sorted(self.fetch("/apis/v1/cluster/events", params={"size": page_size, "lastSyncTime": cursor}),
+                            key=lambda event: event["time"])
+            fresh = [event for event in events if event["id"] not in seen]
+            for event in fresh:
+                seen[event["id"]] = event["time"]
+                if not types or event["type"] in types:
+                    yield event
+            if len(events) > 0:
+                latest = max(cursor, events[-1]["time"])
+                if len(fresh) == 0 and len(events) >= page_size and latest == cursor:
+                    # A full page of events sharing one timestamp was already seen, step past it to make progress
+                    latest = cursor + 1
+                cursor = latest
+                seen = {event_id: event_time for event_id, event_time in seen.items() if event_time >= cursor}
+            if len(events) < page_size:
+                if not follow:
+                    return
+                time.sleep(poll_interval)
+
+    def iter_app_instances(self, app_ids, healthy_only: bool = False):
+        """Yield instances of the given applications one application at a time"""
+        for app_id in app_ids:
+            data = self.fetch("/apis/v1/applications/{app_id}/instances".format(app_id=app_id))
+            for instance in data:
+                if not healthy_only or instance["state"] == "HEALTHY":
+                    yield instance
+
+    def iter_tasks(self, app: str = None):
+        """Yield active tasks, optionally only those started by the given source app"""
+        for task in self.fetch("/apis/v1/tasks"):
+            if not app or task["sourceAppName"] == app:
+                yield task
+
     def get(self, path: str, params = None, expected_status = 200) -> dict:
+        """
+        GET a drove API. With a cache_ttl, identical calls made while a request is in flight wait for and share
+        its response, and responses are reused for cache_ttl seconds. Every caller gets its own data decoded
+        from the shared response, so changing it does not affect other callers.
+        """
+        if self.cache_ttl <= 0:
+            return self.fetch(path, params, expected_status)
+        key = cache_key(path, params) + (expected_status,)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                return self.decode(cached[1], expected_status)
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                generation = self._cache_generation
+        if not owner:
+            return self.decode(future.result(), expected_status)
         try:
-            response = self.session.get(self.endpoint + path, params=params)
-        except requests.ConnectionError as e:
-            raise DroveException(-1, "Error connecting to endpoint " + self.endpoint, raw={})
-        return handle_drove_response(response, expected_status)
+            response = self.send("GET", path, params=params)
+            data = self.decode(response, expected_status)
+        except BaseException as e:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._cache_lock:
+            self._inflight.pop(key, None)
+            # Do not cache responses fetched before a write invalidated the cache
+            if generation == self._cache_generation:
+                self._cache[key] = (time.monotonic(), response)
+        future.set_result(response)
+        return data
+
+    def fetch(self, path: str, params = None, expected_status = 200) -> dict:
+        """GET a drove API bypassing the response cache"""
+        return self.decode(self.send("GET", path, params=params), expected_status)
+
+    def decode(self, response: "requests.Response", expected_status: int) -> dict:
+        with drovetrace.span("decode"):
+            return handle_drove_response(response, expected_status)
+
+    def invalidate(self):
+        """Drop all cached responses"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_generation = self._cache_generation + 1
     
     def get_raw(self, path: str, expected_status: int = 200) -> dict:
-        try:
-            response = self.session.get(self.endpoint + path)
-        except requests.ConnectionError as e:
-            raise DroveException(-1, "Error connecting to endpoint " + self.endpoint, raw={})
+        response = self.send("GET", path)
 
         status_code = response.status_code
         text = response.text
@@ -107,7 +449,7 @@ class DroveClient:
     def get_to_file(self, path: str, filename: str, expected_status: int = 200) -> int:
         size = 0
         try:
-            with self.session.get(self.endpoint + path, stream=True) as r:
+            with self.send("GET", path, stream=True) as r:
                 if r.status_code != expected_status:
                     raise DroveException(r.status_code, "Drove call failed with status: " + str(r.status_code))
                 with open(filename, 'wb') as f:
@@ -124,18 +466,18 @@ class DroveClient:
             raise DroveException(-1, str(e))
         
     def post(self, path: str, body: dict, params = None, expected_status = 200) -> dict:
-        try:
-            response = self.session.post(self.endpoint + path, json=body, params=params)
-        except requests.ConnectionError as e:
-            raise DroveException(-1, "Error connecting to endpoint " + self.endpoint, raw="{}")
-        return handle_drove_response(response, expected_status)
+        # Anything read so far may be changed by this call
+        self.invalidate()
+        response = self.send("POST", path, json=body, params=params)
+        with drovetrace.span("decode"):
+            return handle_drove_response(response, expected_status)
         
-def handle_drove_response(response: requests.Response, expected_status: int):
+def handle_drove_response(response: "requests.Response", expected_status: int):
     status_code = response.status_code
     text = response.text
     api_response = None
     try:
-        if text is not None and response.json() is not None:
+        if text is not None:
             api_response = response.json()
     except json.decoder.JSONDecodeError:
         raise DroveException(status_code, text)
@@ -155,12 +497,64 @@ def handle_drove_response(response: requests.Response, expected_status: int):
         raise DroveException(status_code, text)
     return api_response["data"] if "data" in api_response else api_response
 
+def cluster_names(config_file: str = None) -> list:
+    """Names of the clusters defined in the config file, in file order"""
+    config_file = config_file if config_file is not None else str(Path.home()) + "/.drove"
+    config_parser = configparser.ConfigParser()
+    with open(config_file) as stream:
+        config_parser.read_string(stream.read())
+    return config_parser.sections()
+
+def current_cluster(args: SimpleNamespace) -> str:
+    """The cluster build_drove_client reads from the config file: -c, then current_cluster. None when the endpoint is
+    given on the command line or the DEFAULT section is used"""
+    if args.endpoint is not None:
+        return None
+    cluster = args.cluster
+    if cluster is None:
+        config_file = args.file if args.file is not None else str(Path.home()) + "/.drove"
+        config_parser = configparser.ConfigParser()
+        try:
+            with open(config_file) as stream:
+                config_parser.read_string(stream.read())
+        except (OSError, configparser.Error):
+            return None
+        cluster = config_parser.defaults().get('current_cluster')
+    return None if cluster == 'DEFAULT' else cluster
+
+def cluster_args(args: SimpleNamespace, cluster: str) -> SimpleNamespace:
+    """Copy of args for running against a named cluster from the config file, without any endpoint and credentials
+    given on the command line"""
+    cluster_args = SimpleNamespace(**vars(args))
+    cluster_args.cluster = cluster
+    cluster_args.endpoint = None
+    cluster_args.auth_header = None
+    cluster_args.username = None
+    cluster_args.password = None
+    return cluster_args
+
+def build_cluster_client(args: SimpleNamespace, cluster: str) -> DroveClient:
+    """Build a client for a named cluster from the config file, ignoring any endpoint and credentials on the command line.
+    Raises ConfigError when the cluster can not be read from the config file."""
+    return connect_drove_client(DroveClient(), cluster_args(args, cluster))
+
 def build_drove_client(drove_client: DroveClient, args: SimpleNamespace):
+    """Connect drove_client to the cluster picked by args. Prints the error and returns None if the config is unusable."""
+    try:
+        return connect_drove_client(drove_client, args)
+    except ConfigError as e:
+        print(str(e))
+        return None
+
+def connect_drove_client(drove_client: DroveClient, args: SimpleNamespace) -> DroveClient:
+    config_start = time.perf_counter()
     endpoint = args.endpoint
     auth_header = args.auth_header
     insecure = args.insecure
     username = args.username
     password = args.password
+    retry_budget = getattr(args, "retry_budget", None)
+    retry_settings = {}
 
     if endpoint is None:
         # If cmdl options are not passed, see if config file is passed
@@ -183,8 +577,7 @@ def build_drove_client(drove_client: DroveClient, args: SimpleNamespace):
                     if cluster_to_use in config_parser:
                         drove_config = config_parser[cluster_to_use]
                     else:
-                        print("error: No cluster definition found for {cluster} in config {config_file}".format(config_file=config_file, cluster=cluster_to_use))
-                        return None
+                        raise ConfigError("error: No cluster definition found for {cluster} in config {config_file}".format(config_file=config_file, cluster=cluster_to_use))
 
                 endpoint = drove_config.get("endpoint")
                 username = drove_config.get("username")
@@ -192,20 +585,47 @@ def build_drove_client(drove_client: DroveClient, args: SimpleNamespace):
                 auth_header = drove_config.get("auth_header", None)
                 if not args.insecure:
                     insecure = drove_config.getboolean("insecure", False)
+                if "retry_budget" in drove_config:
+                    retry_settings["budget"] = drove_config.getfloat("retry_budget")
+                if "retries" in drove_config:
+                    retry_settings["retries"] = drove_config.getint("retries")
+                if "retry_methods" in drove_config:
+                    retry_settings["methods"] = drove_config.get("retry_methods").split(",")
+                if "breaker_threshold" in drove_config:
+                    retry_settings["breaker_threshold"] = drove_config.getint("breaker_threshold")
+                if "cache_ttl" in drove_config:
+                    drove_client.cache_ttl = drove_config.getfloat("cache_ttl")
+            except ConfigError:
+                raise
             except Exception as e:
                 #Looks like some random file was passed. Bail out
-                print("Error parsing config file " + config_file + ": " + str(e))
-                return None
+                raise ConfigError("Error parsing config file " + config_file + ": " + str(e))
         else:
-            print("Error: Config file {config_file} is not present or readable".format(config_file=config_file))
-            return None
+            raise ConfigError("Error: Config file {config_file} is not present or readable".format(config_file=config_file))
     # At least endpoint is needed
     if endpoint == None:
         raise Exception("Error: provide config file or required command line params for drove connectivity\n")
-    endpoint = endpoint[:-1] if endpoint.endswith('/') else endpoint
     if args.debug:
         print('Endpoint: {endpoint} Username: {has_username} Password: {has_password} AuthHeader: {has_auth_header} Insecure: {insecure}'
               .format(endpoint=endpoint, has_username=username is not None, has_password=password is not None,
                        has_auth_header=auth_header is not None, insecure=insecure))
-    drove_client.start(endpoint, auth_header, username, password, insecure)
+    if retry_budget is not None:
+        retry_settings["budget"] = retry_budget
+    if len(retry_settings) > 0:
+        drove_client.configure_retries(RetryPolicy(**retry_settings))
+    drovetrace.TRACER.record("config", "cli", config_start, time.perf_counter())
+    with drovetrace.span("connect"):
+        drove_client.start(endpoint, auth_header, username, password, insecure)
+    if args.debug and len(drove_client.endpoints) > 1:
+        print('Leader endpoint: {leader}'.format(leader=drove_client.endpoint))
     return drove_client
+
+# Moved to drovehttp, still reachable from here for code written against droveclient
+_DROVEHTTP_NAMES = {"CustomRetry", "TimedConnect", "TimedHTTPConnection", "TimedHTTPSConnection", "TimedHTTPConnectionPool",
+                    "TimedHTTPSConnectionPool", "TimedAdapter", "TokenAuth", "is_connect_failure"}
+
+def __getattr__(name: str):
+    if name in _DROVEHTTP_NAMES:
+        import drovehttp
+        return getattr(drovehttp, name)
+    raise AttributeError("module {module!r} has no attribute {name!r}".format(module=__name__, name=name))
@@ -0,0 +1,95 @@
+"""
+HTTP transport for DroveClient: retries with a time budget, connection timing for --timing and token auth.
+
+Kept apart from droveclient so that requests and urllib3, which take a good part of the startup time, are
+only imported by commands that call a cluster. DroveClient imports this module when it creates its session.
+"""
+
+import drovetrace
+import random
+import requests
+import time
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry as BaseRetry
+
+class CustomRetry(BaseRetry):
+    """
+    Custom Retry class that prevents retries on SSLError, adds full jitter to the backoff
+    and stops retrying once the retry budget is exhausted. The time from one failed attempt to the next
+    (backoff and the retried attempt) is charged to the budget.
+    """
+    def __init__(self, *args, policy: "droveclient.RetryPolicy" = None, **kwargs):
+        self.policy = policy
+        self.failed_at: float = None
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.policy = self.policy
+        retry.failed_at = self.failed_at
+        return retry
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if self.policy is None:
+            return backoff
+        return min(random.uniform(0, backoff), max(self.policy.remaining(), 0))
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if error and isinstance(error, urllib3.exceptions.SSLError):
+            raise error
+        now = time.monotonic()
+        if self.policy is not None:
+            if self.failed_at is not None:
+                self.policy.spend(now - self.failed_at)
+            if self.policy.exhausted():
+                reason = error or urllib3.exceptions.ResponseError("retry budget exhausted")
+                raise urllib3.exceptions.MaxRetryError(_pool, url, reason) from reason
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        retry.failed_at = now
+        return retry
+
+class TimedConnect:
+    """Reports the time taken to open a connection (DNS, TCP and TLS) to the tracer"""
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            drovetrace.TRACER.note_connect(time.perf_counter() - start)
+
+class TimedHTTPConnection(TimedConnect, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnect, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+class TokenAuth(requests.auth.AuthBase):
+    def __init__(self, token: str):
+        self.token = token
+        super().__init__()
+
+    def __call__(self, r):
+        r.headers.update({"Authorization": self.token})
+        return r
+
+def is_connect_failure(error: requests.ConnectionError) -> bool:
+    """True if the request never reached the server, so it is safe to replay it elsewhere"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
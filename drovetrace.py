@@ -0,0 +1,236 @@
+"""
+Timing and tracing for a drove CLI invocation.
+
+Spans are recorded for the phases of an invocation (imports, parser build, config load, command,
+rendering) and for every HTTP request made by DroveClient. Recording is off by default, so programs
+using droveclient or droveapi as a library keep nothing. drove.py turns it on at start so that the
+phases before argument parsing are captured; DroveCli turns it off again and drops what was recorded
+unless --timing, --trace-file or --startup-report was passed. --timing prints a summary to stderr and --trace-file
+writes the spans in the Chrome trace event format, which chrome://tracing, Perfetto and most
+OpenTelemetry trace viewers can load.
+
+profile() runs a block under cProfile or tracemalloc for --profile. startup_report() runs an invocation
+again in a child interpreter under -X importtime for --startup-report and reports where the time before
+the first request went.
+
+This module is imported before anything else, so it only imports what recording spans needs. Tabulate
+and the profilers are imported when a summary or profile is asked for.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Taken at import time. drove.py imports this module first, so this is close to process start
+PROCESS_START = time.perf_counter()
+# The same moment as wall clock time, so another process can line up its own timings with this one's
+PROCESS_START_WALL = time.time()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.spans: list = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name: str, category: str, start: float, end: float, **args):
+        """Record a finished span. start and end are time.perf_counter() values."""
+        if not self.enabled:
+            return
+        span = {"name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                "ts": (start - PROCESS_START) * 1e6, "dur": (end - start) * 1e6, "args": args}
+        with self._lock:
+            self.spans.append(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "cli", **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, category, start, time.perf_counter(), **args)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        with self._lock:
+            self.spans = []
+
+    def note_connect(self, duration: float):
+        """Called by drovehttp.TimedConnect so the request that opened a connection can report the connect time"""
+        self._local.connect = getattr(self._local, "connect", 0.0) + duration
+
+    def take_connect(self) -> float:
+        duration = getattr(self._local, "connect", 0.0)
+        self._local.connect = 0.0
+        return duration
+
+    def requests(self) -> list:
+        return [span for span in self.spans if span["cat"] == "http"]
+
+    def phases(self) -> dict:
+        """Total time per phase in milliseconds, in the order the phases first started. Phases can nest."""
+        totals: dict = {}
+        for span in sorted(self.spans, key=lambda s: s["ts"]):
+            if span["cat"] == "cli":
+                totals[span["name"]] = totals.get(span["name"], 0.0) + span["dur"] / 1000
+        return totals
+
+    def print_summary(self, stream = None):
+        import tabulate
+        stream = stream if stream is not None else sys.stderr
+        requests = self.requests()
+        rows = [[s["args"].get("method"), s["args"].get("path"), s["args"].get("status"), s["args"].get("bytes"),
+                 "{0:.1f}".format(s["args"].get("connect_ms", 0.0)), "{0:.1f}".format(s["args"].get("ttfb_ms", 0.0)),
+                 "{0:.1f}".format(s["dur"] / 1000), s["args"].get("retries", 0)]
+                for s in requests]
+        if rows:
+            print(tabulate.tabulate(rows, headers=["Method", "Path", "Status", "Bytes", "Connect (ms)", "TTFB (ms)", "Total (ms)", "Retries"]),
+                  file=stream)
+            print(file=stream)
+        phases = [[name, "{0:.1f}".format(total)] for name, total in self.phases().items()]
+        phases.append(["requests ({count})".format(count=len(requests)), "{0:.1f}".format(sum(s["dur"] for s in requests) / 1000)])
+        phases.append(["wall", "{0:.1f}".format((time.perf_counter() - PROCESS_START) * 1000)])
+        print(tabulate.tabulate(phases, headers=["Phase", "Time (ms)"]), file=stream)
+
+    def write_chrome_trace(self, path: str):
+        with self._lock:
+            events = list(self.spans)
+        events.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "drove"}})
+        with open(path, "w") as stream:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"processStart": PROCESS_START_WALL}}, stream)
+
+
+TRACER = Tracer()
+
+
+def span(name: str, category: str = "cli", **args):
+    return TRACER.span(name, category, **args)
+
+
+def default_profile_file(mode: str) -> str:
+    suffix = "prof" if mode == "cpu" else "folded"
+    return "drove-{mode}-{time}.{suffix}".format(mode=mode, time=time.strftime("%Y%m%d-%H%M%S"), suffix=suffix)
+
+
+def write_folded(snapshot: "tracemalloc.Snapshot", path: str):
+    """Write allocations as folded stacks (outermost frame first), the input format of flamegraph.pl and speedscope"""
+    with open(path, "w") as stream:
+        for statistic in snapshot.statistics("traceback"):
+            frames = ["{0}:{1}".format(frame.filename, frame.lineno) for frame in reversed(statistic.traceback)]
+            stream.write("{stack} {size}\n".format(stack=";".join(frames), size=statistic.size))
+
+
+@contextlib.contextmanager
+def profile(mode: str, path: str = None, top: int = 20, stream = None):
+    """
+    Profile the block. cpu writes a pstats file (snakeviz, gprof2dot and flameprof read it), alloc writes
+    allocations still held at the end of the block as folded stacks. A top-N summary goes to stream.
+    """
+    import tabulate
+    stream = stream if stream is not None else sys.stderr
+    path = path or default_profile_file(mode)
+    if mode == "cpu":
+        import cProfile
+        import io
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+            print(summary.getvalue().strip(), file=stream)
+            print("CPU profile written to " + path, file=stream)
+    else:
+        import tracemalloc
+        tracemalloc.start(25)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            write_folded(snapshot, path)
+            rows = [[str(s.traceback[0]), s.count, "{0:.1f}".format(s.size / 1024)] for s in snapshot.statistics("lineno")[:top]]
+            print(tabulate.tabulate(rows, headers=["Location", "Blocks", "Size (KB)"]), file=stream)
+            print("Peak traced memory: {0:.1f} KB".format(peak / 1024), file=stream)
+            print("Allocation profile written to " + path, file=stream)
+
+
+def parse_import_times(text: str) -> list:
+    """(module, self us, cumulative us) for every line python -X importtime wrote to stderr, in the order written"""
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            imports.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return imports
+
+
+def import_costs(imports: list) -> dict:
+    """Self time per top level package in microseconds, most expensive first"""
+    totals: dict = {}
+    for module, self_us, _ in imports:
+        package = module.split(".")[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def startup_report(script: str, argv: list, top: int = 20, stream = None) -> int:
+    """
+    Run drove with argv in a child interpreter under -X importtime and with a trace file, pass its output
+    through and print to stream how long the interpreter took to start, the phases of the invocation, the
+    time to the first request and the import cost per top level package. Returns the child's exit code.
+    """
+    import subprocess
+    import tabulate
+    import tempfile
+    stream = stream if stream is not None else sys.stderr
+    with tempfile.TemporaryDirectory(prefix="drove-startup-") as directory:
+        trace_file = os.path.join(directory, "trace.json")
+        spawned = time.time()
+        result = subprocess.run([sys.executable, "-X", "importtime", script, "--trace-file", trace_file] + list(argv),
+                                stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        wall = time.time() - spawned
+        sys.stdout.write(result.stdout)
+        stderr = [line for line in result.stderr.splitlines(keepends=True) if not line.startswith("import time:")]
+        sys.stderr.write("".join(stderr))
+        if not os.path.isfile(trace_file):
+            print("No trace was written, the command failed before it started", file=stream)
+            return result.returncode or 1
+        with open(trace_file) as trace:
+            data = json.load(trace)
+
+    events = [event for event in data["traceEvents"] if event.get("ph") == "X"]
+    interpreter = (data["otherData"]["processStart"] - spawned) * 1000
+    phases = [["interpreter start", "{0:.1f}".format(interpreter)]]
+    tracer = Tracer()
+    tracer.spans = events
+    phases.extend([name, "{0:.1f}".format(total)] for name, total in tracer.phases().items())
+    requests = sorted(tracer.requests(), key=lambda event: event["ts"])
+    if requests:
+        phases.append(["first request", "{0:.1f}".format(interpreter + requests[0]["ts"] / 1000)])
+    phases.append(["wall", "{0:.1f}".format(wall * 1000)])
+    print(tabulate.tabulate(phases, headers=["Phase", "Time (ms)"]), file=stream)
+    print(file=stream)
+
+    imports = parse_import_times(result.stderr)
+    costs = list(import_costs(imports).items())
+    rows = [[package, "{0:.1f}".format(us / 1000)] for package, us in costs[:top]]
+    if len(costs) > top:
+        rows.append(["({0} more)".format(len(costs) - top), "{0:.1f}".format(sum(us for _, us in costs[top:]) / 1000)])
+    rows.append(["total ({0} modules)".format(len(imports)), "{0:.1f}".format(sum(self_us for _, self_us, _ in imports) / 1000)])
+    print(tabulate.tabulate(rows, headers=["Package", "Import self time (ms)"]), file=stream)
+    return result.returncode
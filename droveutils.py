@@ -1,35 +1,234 @@
+import contextlib
 import datetime
 import droveclient
+import drovetrace
+import functools
+import io
+import itertools
 import json
-import tabulate
+import shutil
+import sys
+import threading
 import time
 
+# Output capture for the current thread, see capture_output()
+_thread_output = threading.local()
+
 def print_dict(data: dict, level: int = 0):
+    if level == 0:
+        with drovetrace.span("render"):
+            _print_dict(data, 0)
+    else:
+        _print_dict(data, level)
+
+def _print_dict(data: dict, level: int):
     for key, value in data.items():
         print(level * 4 * " ", end='')
         if type(value) is dict and not len(dict(value)) == 0:
             print(f"{key: <30}")
-            print_dict(value, level + 1)
+            _print_dict(value, level + 1)
         elif type(value) is list and all(isinstance(n, dict) for n in value):
             print(f"{key: <30}")
             for item in value:
-                print_dict(item, level + 1)
+                _print_dict(item, level + 1)
                 print()
         else:
             print(f"{key: <30}{value}")
 
 def print_json(data: dict):
-    print(json.dumps(data, indent = 4))
+    with drovetrace.span("render"):
+        print(json.dumps(data, indent = 4))
 
 def print_table(headers: list, data: list):
-    print(tabulate.tabulate(data, headers=headers))
-
-def print_dict_table(data: dict, headers: list = None):
-    if headers:
+    import tabulate
+    capture = getattr(_thread_output, "capture", None)
+    if capture is not None:
+        capture.tables.append((list(headers), list(data)))
+    with drovetrace.span("render"):
         print(tabulate.tabulate(data, headers=headers))
+
+def print_dict_table(data, headers: dict = None):
+    """Print a list of dicts (or a dict of columns) as a table through print_table
+
+    Columns are the keys in order of first appearance, titled from headers where it has an entry"""
+    if isinstance(data, dict):
+        keys = list(data.keys())
+        rows = [list(row) for row in itertools.zip_longest(*data.values())]
     else:
-        print(tabulate.tabulate(data, headers="keys"))
+        keys = list(dict.fromkeys(key for row in data for key in row))
+        rows = [[row.get(key) for key in keys] for row in data]
+    titles = headers or {}
+    print_table([titles.get(key, key) for key in keys], rows)
                             
+class CapturedOutput:
+    def __init__(self):
+        self.text = io.StringIO()
+        # (headers, rows) for every table printed while capturing
+        self.tables: list = []
+
+    def only_table(self) -> tuple:
+        """The table if exactly one table and nothing else was printed, otherwise None"""
+        if len(self.tables) != 1:
+            return None
+        import tabulate
+        headers, rows = self.tables[0]
+        if self.text.getvalue().strip() != tabulate.tabulate(rows, headers=headers).strip():
+            return None
+        return self.tables[0]
+
+class ThreadLocalStdout:
+    """Stand-in for sys.stdout that sends output from threads inside capture_output() to their own buffer"""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data: str) -> int:
+        capture = getattr(_thread_output, "capture", None)
+        return (capture.text if capture is not None else self.stream).write(data)
+
+    def flush(self):
+        if getattr(_thread_output, "capture", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+@contextlib.contextmanager
+def capture_output():
+    """Capture output printed on this thread. sys.stdout must be a ThreadLocalStdout."""
+    capture = CapturedOutput()
+    _thread_output.capture = capture
+    try:
+        yield capture
+    finally:
+        _thread_output.capture = None
+
+class ScreenRenderer:
+    """
+    Draws full screen frames, rewriting only the lines that changed since the previous frame.
+    When the output is not a terminal every frame is printed in full.
+    """
+    def __init__(self, stream = None, interactive: bool = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.interactive = self.stream.isatty() if interactive is None else interactive
+        self.previous: list = []
+
+    def render(self, lines: list) -> int:
+        """Draw a frame and return the number of lines written"""
+        if not self.interactive:
+            self.stream.write("\n".join(lines) + "\n\n")
+            self.stream.flush()
+            self.previous = lines
+            return len(lines)
+        width = shutil.get_terminal_size().columns
+        lines = [line[:width] for line in lines]
+        output = []
+        if not self.previous:
+            # Clear the screen and hide the cursor on the first frame
+            output.append("\x1b[2J\x1b[?25l")
+        written = 0
+        for index, line in enumerate(lines):
+            if index >= len(self.previous) or self.previous[index] != line:
+                output.append("\x1b[{row};1H{line}\x1b[K".format(row=index + 1, line=line))
+                written += 1
+        for index in range(len(lines), len(self.previous)):
+            output.append("\x1b[{row};1H\x1b[K".format(row=index + 1))
+        self.stream.write("".join(output))
+        self.stream.flush()
+        self.previous = lines
+        return written
+
+    def close(self):
+        if self.interactive and self.previous:
+            self.stream.write("\x1b[{row};1H\x1b[?25h\n".format(row=len(self.previous) + 1))
+            self.stream.flush()
+
+def keyed_rows(lines: list) -> dict:
+    """Key output lines by their first column. Repeated keys are numbered in order of appearance."""
+    rows = {}
+    seen = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        column = line.split()[0]
+        occurrence = seen.get(column, 0)
+        seen[column] = occurrence + 1
+        rows[(column, occurrence)] = line
+    return rows
+
+def diff_rows(previous: list, current: list) -> tuple:
+    """Returns keys of added and changed rows in current and lines of rows removed from previous"""
+    old = keyed_rows(previous)
+    new = keyed_rows(current)
+    added = {key for key in new if key not in old}
+    changed = {key for key in new if key in old and old[key] != new[key]}
+    removed = [line for key, line in old.items() if key not in new]
+    return added, changed, removed
+
+def watch(produce, interval: float, stream = None, interactive: bool = None, iterations: int = 0):
+    """
+    Call produce() every interval seconds and show the lines it returns, highlighting rows that were added,
+    changed or removed since the previous call. Rows are matched on their first column. On a terminal the
+    screen is redrawn in place, otherwise only the changes are printed after the first output.
+    """
+    renderer = ScreenRenderer(stream, interactive)
+    stream = renderer.stream
+    previous = None
+    count = 0
+    try:
+        while True:
+            current = produce()
+            title = "Every {interval:g}s: {now}".format(interval=interval, now=to_date(now()))
+            if previous is None:
+                renderer.render([title, ""] + current)
+            else:
+                added, changed, removed = diff_rows(previous, current)
+                if renderer.interactive:
+                    keys = list(keyed_rows(current).keys())
+                    lines = [title, "{added} added, {changed} changed, {removed} removed".format(added=len(added), changed=len(changed), removed=len(removed))]
+                    index = 0
+                    for line in current:
+                        if not line.strip():
+                            lines.append(line)
+                            continue
+                        key = keys[index]
+                        index += 1
+                        if key in added:
+                            lines.append("\x1b[32m" + line + "\x1b[0m")
+                        elif key in changed:
+                            lines.append("\x1b[33m" + line + "\x1b[0m")
+                        else:
+                            lines.append(line)
+                    lines.extend("\x1b[31m" + line + "\x1b[0m" for line in removed)
+                    renderer.render(lines)
+                elif added or changed or removed:
+                    rows = keyed_rows(current)
+                    lines = [title]
+                    lines.extend("+ " + rows[key] for key in rows if key in added)
+                    lines.extend("~ " + rows[key] for key in rows if key in changed)
+                    lines.extend("- " + line for line in removed)
+                    renderer.render(lines)
+            previous = current
+            count += 1
+            if iterations and count >= iterations:
+                break
+            time.sleep(interval)
+    finally:
+        renderer.close()
+
+def retry_until_true(func):
+    """
+    Call func again, waiting 4 to 10 seconds with exponential backoff, until it returns True.
+    The import of tenacity, which is still a required dependency, is deferred to the first call so
+    it is not paid at startup. The retry policy is built again on every call.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        import tenacity
+        retrying = tenacity.retry(wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
+                                  retry=tenacity.retry_if_result(lambda x: x == False))
+        return retrying(func)(*args, **kwargs)
+    return wrapper
+
 def to_date(epoch: int) -> str:
     date = datetime.datetime.fromtimestamp(epoch/1000)
     return date.strftime("%d/%m/%Y, %H:%M:%S")
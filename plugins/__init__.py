@@ -1,12 +1,26 @@
 import argparse
+import contextlib
 import droveclient
-import os
+import importlib
+import pkgutil
+import threading
 import traceback
 
-from importlib import util
 from types import SimpleNamespace
 
 
+# Client used by plugins on the current thread instead of their own, see using_client()
+_thread_client = threading.local()
+
+@contextlib.contextmanager
+def using_client(drove_client: droveclient.DroveClient):
+    """Make every plugin use the given client for calls made on this thread"""
+    _thread_client.client = drove_client
+    try:
+        yield drove_client
+    finally:
+        _thread_client.client = None
+
 class DrovePlugin:
     plugins = []
 
@@ -24,6 +38,27 @@ class DrovePlugin:
     def needs_client(self) -> bool:
         return True
 
+    @property
+    def drove_client(self) -> droveclient.DroveClient:
+        client = getattr(_thread_client, "client", None)
+        return client if client is not None else self.__dict__.get("_drove_client")
+
+    @drove_client.setter
+    def drove_client(self, drove_client: droveclient.DroveClient):
+        self._drove_client = drove_client
+
+    @property
+    def api(self) -> "droveapi.DroveAPI":
+        # Plugins do not always call super().__init__(), so build this lazily from the client
+        import droveapi
+        drove_client = self.drove_client
+        api = getattr(self, "_api", None)
+        if api is None or api.drove_client is not drove_client:
+            api = droveapi.DroveAPI(drove_client)
+            if getattr(_thread_client, "client", None) is None:
+                self._api = api
+        return api
+
     def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
         self.drove_client = drove_client
         subparser.set_defaults(func=self.process)
@@ -33,21 +68,11 @@ class DrovePlugin:
         self.parser.print_help()
         exit(-1)
 
-def load_module(path):
-    name = os.path.split(path)[-1]
-    spec = util.spec_from_file_location(name, path)
-    module = util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-path = os.path.abspath(__file__)
-dirpath = os.path.dirname(path)
-
-for fname in os.listdir(dirpath):
-    # Load only "real modules"
-    if not fname.startswith('.') and \
-       not fname.startswith('__') and fname.endswith('.py'):
+# Plugins are imported as submodules of this package rather than loaded from their files, so they
+# get cached bytecode like any other module and can be loaded from inside a zipapp
+for module_info in pkgutil.iter_modules(__path__, __name__ + "."):
+    if not module_info.name.rsplit(".", 1)[-1].startswith(("_", ".")):
         try:
-            load_module(os.path.join(dirpath, fname))
+            importlib.import_module(module_info.name)
         except Exception:
-            traceback.print_exc()
\ No newline at end of file
+            traceback.print_exc()
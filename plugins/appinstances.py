@@ -2,10 +2,8 @@ import argparse
 import droveclient
 import droveutils
 import plugins
-import tenacity
 
 from operator import itemgetter
-from tenacity import retry
 from types import SimpleNamespace
 
 class Applications(plugins.DrovePlugin):
@@ -169,8 +167,7 @@ class Applications(plugins.DrovePlugin):
         else:
             print("Instance(s) kill command accepted.")
 
-    @retry(wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-           retry=tenacity.retry_if_result(lambda x: x == False))
+    @droveutils.retry_until_true
     def ensure_replaced(self, app_id: str, existing: set) -> bool:
         healthy = self.drove_client.app_instances(app_id, False)
         overlap = len(existing.intersection(healthy))
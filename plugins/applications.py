@@ -3,10 +3,9 @@ import droveclient
 import droveutils
 import json
 import plugins
-import tenacity
 
+from collections import Counter
 from operator import itemgetter
-from tenacity import retry
 from types import SimpleNamespace
 
 class Applications(plugins.DrovePlugin):
@@ -59,6 +58,12 @@ class Applications(plugins.DrovePlugin):
         sub_parser.add_argument("--wait", "-w", help="Wait to ensure instance count is reached", default=False, action="store_true")
         sub_parser.set_defaults(func=self.scale_app)
 
+        sub_parser = commands.add_parser("simulate-scale", help="Check whether the cluster can place the instances needed to scale an app, without changing anything")
+        sub_parser.add_argument("app_id", metavar="app-id", help="Application ID")
+        sub_parser.add_argument("instances", metavar="instances", type=int, help="Total number of instances the app is to be scaled to")
+        sub_parser.add_argument("--parallelism", "-p", help="Number of executors to fetch details for in parallel", type=int, default=8)
+        sub_parser.set_defaults(func=self.simulate_scale)
+
         sub_parser = commands.add_parser("suspend", help="Suspend the app")
         sub_parser.add_argument("app_id", metavar="app-id", help="Application ID")
         sub_parser.add_argument("--parallelism", "-p", help="Number of parallel threads to be used to execute operation", type=int, default = 1)
@@ -81,19 +86,18 @@ class Applications(plugins.DrovePlugin):
 
 
     def list_apps(self, options: SimpleNamespace):
-        data = self.drove_client.get('/apis/v1/applications')
         app_rows = []
-        for app_id, app_data in data.items():
+        for app in self.api.apps.list():
             row = []
-            row.append(app_id)
-            row.append(app_data["name"])
-            row.append(app_data["state"])
-            row.append(app_data["totalCPUs"])
-            row.append(app_data["totalMemory"])
-            row.append(app_data["requiredInstances"])
-            row.append(app_data["healthyInstances"])
-            row.append(droveutils.to_date(app_data["created"]))
-            row.append(droveutils.to_date(app_data["updated"]))
+            row.append(app.app_id)
+            row.append(app.name)
+            row.append(app.state)
+            row.append(app.total_cpus)
+            row.append(app.total_memory)
+            row.append(app.required_instances)
+            row.append(app.healthy_instances)
+            row.append(droveutils.to_date(app.created))
+            row.append(droveutils.to_date(app.updated))
 
             app_rows.append(row)
 
@@ -103,56 +107,26 @@ class Applications(plugins.DrovePlugin):
         droveutils.print_table(headers, app_rows)
 
     def show_summary(self, options: SimpleNamespace):
-        data = self.drove_client.get("/apis/v1/applications/{app_id}".format(app_id = options.app_id))
-        droveutils.print_dict(data)
+        droveutils.print_dict(self.api.apps.get(options.app_id).raw)
 
     def show_spec(self, options: SimpleNamespace):
-        data = self.drove_client.get("/apis/v1/applications/{app_id}/spec".format(app_id = options.app_id))
-        droveutils.print_json(data)
+        droveutils.print_json(self.api.apps.spec(options.app_id))
 
     def create_app(self, options: SimpleNamespace):
         try:
             with open(options.spec_file, 'r') as fp:
                 spec = json.load(fp)
-            operation = {
-                "type": "CREATE",
-                "spec": spec,
-                "opSpec": {
-                   "timeout": "5m",
-                    "parallelism": 1,
-                    "failureStrategy": "STOP"
-                }
-            }
-            data = self.drove_client.post("/apis/v1/applications/operations", operation)
-            print("Application created with app id: {appid}".format(appid=data["appId"]))
+            app_id = self.api.apps.create(spec)
+            print("Application created with app id: {appid}".format(appid=app_id))
         except (OSError, IOError) as e:
             print("Error creating application. Error: " + str(e))
 
     def destroy_app(self, options: SimpleNamespace):
-        operation = {
-            "type": "DESTROY",
-            "appId": options.app_id,
-            "opSpec": {
-                "timeout": "5m",
-                "parallelism": 1,
-                "failureStrategy": "STOP"
-            }
-        }
-        data = self.drove_client.post("/apis/v1/applications/operations", operation)
+        self.api.apps.destroy(options.app_id)
         print("Application destroyed")
 
     def scale_app(self, options: SimpleNamespace):
-        operation = {
-            "type": "SCALE",
-            "appId": options.app_id,
-            "requiredInstances": options.instances,
-            "opSpec": {
-                "timeout": options.timeout,
-                "parallelism": options.parallelism,
-                "failureStrategy": "STOP"
-            }
-        }
-        data = self.drove_client.post("/apis/v1/applications/operations", operation)
+        self.api.apps.scale(options.app_id, options.instances, options.parallelism, options.timeout)
         if options.wait:
             print("Waiting till required scale is reached")
             self.ensure_count(options.app_id, options.instances)
@@ -160,17 +134,46 @@ class Applications(plugins.DrovePlugin):
         else:
             print("Application scaling command accepted. Please use appinstances comand or the UI to check status of deployment")
 
+    def simulate_scale(self, options: SimpleNamespace):
+        from droveapi import capacity
+        spec = self.api.apps.spec(options.app_id)
+        shape = capacity.Shape.from_spec(spec)
+        policy = spec.get("placementPolicy", {"type": "ANY"})
+        executors = self.api.executors.get_all(options.parallelism)
+        existing = Counter()
+        for executor in executors:
+            for instance in executor.instances:
+                if instance.app_id == options.app_id:
+                    existing[executor.executor_id] += 1
+        current = sum(existing.values())
+        capacities = {e.executor_id: capacity.ExecutorCapacity.from_executor(e) for e in executors}
+        placement = capacity.simulate_placement(list(capacities.values()), shape, options.instances - current, policy, existing)
+
+        data = dict()
+        data["Instance Shape"] = "{cpus} cores, {memory:,} MB memory".format(cpus=shape.cpus, memory=shape.memory)
+        data["Placement Policy"] = json.dumps(policy)
+        data["Current Instances"] = current
+        data["New Instances Needed"] = max(0, options.instances - current)
+        data["Placeable"] = placement.placed
+        data["Unplaceable"] = max(0, placement.unplaced)
+        droveutils.print_dict(data)
+        for warning in placement.warnings:
+            print("Warning: " + warning)
+        if placement.placed > 0:
+            print()
+            rows = []
+            for executor_id, count in sorted(placement.allocations.items(), key=itemgetter(1), reverse=True):
+                executor = capacities[executor_id]
+                rows.append([executor_id, executor.hostname, ",".join(executor.tags), existing.get(executor_id, 0), count])
+            droveutils.print_table(["Executor ID", "Host", "Tags", "Existing Instances", "New Instances"], rows)
+        print()
+        if placement.unplaced > 0:
+            print("Cluster cannot place {count} of the required instances".format(count=placement.unplaced))
+        else:
+            print("Cluster can place all required instances")
+
     def suspend_app(self, options: SimpleNamespace):
-        operation = {
-            "type": "SUSPEND",
-            "appId": options.app_id,
-            "opSpec": {
-                "timeout": options.timeout,
-                "parallelism": options.parallelism,
-                "failureStrategy": "STOP"
-            }
-        }
-        data = self.drove_client.post("/apis/v1/applications/operations", operation)
+        self.api.apps.suspend(options.app_id, options.parallelism, options.timeout)
         if options.wait:
             print("Waiting till all instances shut down")
             self.ensure_count(options.app_id, 0)
@@ -179,18 +182,8 @@ class Applications(plugins.DrovePlugin):
             print("Application suspend command accepted.")
 
     def deploy_app(self, options: SimpleNamespace):
-        operation = {
-            "type": "START_INSTANCES",
-            "appId": options.app_id,
-            "instances": options.instances,
-            "opSpec": {
-                "timeout": options.timeout,
-                "parallelism": options.parallelism,
-                "failureStrategy": "STOP"
-            }
-        }
-        existing_count = 0 if options.wait == False else len(self.drove_client.app_instances(options.app_id))
-        data = self.drove_client.post("/apis/v1/applications/operations", operation)
+        existing_count = 0 if options.wait == False else len(self.api.apps.healthy_instance_ids(options.app_id))
+        self.api.apps.deploy(options.app_id, options.instances, options.parallelism, options.timeout)
         if options.wait:
             print("Waiting till required scale is reached")
             self.ensure_count(options.app_id, existing_count + options.instances)
@@ -199,38 +192,27 @@ class Applications(plugins.DrovePlugin):
             print("Application deployment command accepted. Please use appinstances comand or the UI to check status of deployment")
 
     def restart_app(self, options: SimpleNamespace):
-        operation = {
-            "type": "REPLACE_INSTANCES",
-            "appId": options.app_id,
-            "opSpec": {
-                "timeout": options.timeout,
-                "parallelism": options.parallelism,
-                "failureStrategy": "STOP"
-            }
-        }
-        existing = [] if options.wait == False else self.drove_client.app_instances(options.app_id)
-        data = self.drove_client.post("/apis/v1/applications/operations", operation)
+        existing = set() if options.wait == False else self.api.apps.healthy_instance_ids(options.app_id)
+        self.api.apps.restart(options.app_id, options.parallelism, options.timeout)
         if options.wait:
-            self.ensure_replaced(options.app_id, set(existing))
+            self.ensure_replaced(options.app_id, existing)
             print("All instances replaced")
         else:
             print("Application restart command accepted.")
 
     def cancel_app_operation(self, options: SimpleNamespace):
-        data = self.drove_client.post("/apis/v1/applications/operations/{appId}/cancel".format(appId=options.app_id), None, False)
+        data = self.api.apps.cancel(options.app_id)
         print("Operation cancellation request registered :" + data["message"])
 
-    @retry(wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-           retry=tenacity.retry_if_result(lambda x: x == False))
+    @droveutils.retry_until_true
     def ensure_count(self, app_id: str, instances: int) -> bool:
-        healthy = len(self.drove_client.app_instances(app_id))
+        healthy = len(self.api.apps.healthy_instance_ids(app_id))
         print("Healthy instances count: {count}".format(count=healthy))
         return healthy == instances
 
-    @retry(wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-           retry=tenacity.retry_if_result(lambda x: x == False))
+    @droveutils.retry_until_true
     def ensure_replaced(self, app_id: str, existing: set) -> bool:
-        healthy = self.drove_client.app_instances(app_id)
+        healthy = self.api.apps.healthy_instance_ids(app_id)
         overlap = len(existing.intersection(healthy))
         print("Remaining old instance count: {overlap}".format(overlap = overlap))
         return overlap == 0
@@ -0,0 +1,61 @@
+import argparse
+import droveclient
+import droveutils
+import plugins
+import sys
+
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+class Apply(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "apply"
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Create and scale apps, local services and tasks to match a set of spec files")
+        parser.add_argument("--filename", "-f", dest="paths", action="append", required=True, metavar="PATH",
+                            help="Spec file or directory of spec files (searched recursively for *.json). Can be repeated")
+        parser.add_argument("--dry-run", dest="dry_run", default=False, action="store_true", help="Print the plan without submitting anything")
+        parser.add_argument("--all", dest="show_all", default=False, action="store_true", help="Also list specs that need no change in the plan")
+        parser.add_argument("--parallelism", "-p", help="Number of parallel calls to the cluster (default: 8)", type=int, default=8)
+        parser.add_argument("--no-cache", dest="no_cache", default=False, action="store_true",
+                            help="Fetch every deployed spec instead of using the digests cached by earlier runs")
+        super().populate_options(drove_client, parser)
+
+    def process(self, options: SimpleNamespace):
+        from droveapi import apply
+        try:
+            documents = apply.load(options.paths)
+        except apply.ApplyError as e:
+            print("Error: " + str(e))
+            exit(1)
+        name = droveclient.current_cluster(options) or urlparse(self.drove_client.endpoint).netloc.replace(":", "_")
+        cache = apply.SpecCache(None if options.no_cache else apply.cache_path(name), self.drove_client.endpoint)
+        try:
+            actions = apply.plan(self.api, documents, cache, options.parallelism)
+        finally:
+            cache.save()
+
+        changes = {change: sum(1 for action in actions if action.change == change) for change in ("CREATE", "SCALE", "UNCHANGED", "CONFLICT")}
+        rows = [[action.document.kind, action.document.key, action.change, action.details, action.document.source]
+                for action in actions if options.show_all or action.change != "UNCHANGED"]
+        if rows:
+            droveutils.print_table(["Kind", "Id", "Change", "Details", "File"], rows)
+            print()
+        print("Plan: {CREATE} to create, {SCALE} to scale, {UNCHANGED} unchanged, {CONFLICT} conflicts".format(**changes))
+        if options.dry_run:
+            return
+
+        results = apply.execute(self.api, actions, options.parallelism)
+        if results:
+            print()
+            droveutils.print_table(["Kind", "Id", "Operations", "Status", "Error"],
+                                   [[action.document.kind, action.document.key, ", ".join(action.operations),
+                                     "FAILED" if action.error else "OK", action.error or ""] for action in results])
+        failed = sum(1 for action in results if action.error)
+        if failed or changes["CONFLICT"]:
+            print("Error: {failed} failed, {conflicts} conflicts".format(failed=failed, conflicts=changes["CONFLICT"]), file=sys.stderr)
+            exit(1)
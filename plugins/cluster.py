@@ -1,12 +1,11 @@
 import argparse
-from operator import itemgetter
 import droveclient
 import droveutils
 import json
 import plugins
-import time
 
 from types import SimpleNamespace
+from urllib.parse import urlparse
 
 class Cluster(plugins.DrovePlugin):
     def name(self):
@@ -30,7 +29,13 @@ class Cluster(plugins.DrovePlugin):
         sub_parser.set_defaults(func=self.show_leader)
 
         sub_parser = commands.add_parser("endpoints", help="Show all exposed endpoints")
-        sub_parser.add_argument("--vhost", "-v", help="Show details only for the specific vhost")
+        sub_parser.add_argument("--vhost", "-v", help="Show details only for the specific vhost. Wildcards (* and ?) are supported")
+        sub_parser.add_argument("--prefix", help="Show details only for vhosts starting with this prefix")
+        sub_parser.add_argument("--app", "-a", help="Show endpoints only for this app")
+        sub_parser.add_argument("--format", "-F", choices=["dict", "table", "jsonl"], default="dict",
+                                help="Output format. table prints one row per vhost and app, jsonl one json object per line")
+        sub_parser.add_argument("--cache-ttl", dest="cache_ttl", type=float, default=0,
+                                help="Reuse an endpoint list fetched within this many seconds, which may be out of date (default: 0, always fetch)")
 
         sub_parser.set_defaults(func=self.show_endpoints)
 
@@ -41,6 +46,14 @@ class Cluster(plugins.DrovePlugin):
         sub_parser.add_argument("--textfmt", "-s", help="Use the format string to print message", type=str, default="{type: <25} | {id: <36} | {time: <20} | {metadata}")
         sub_parser.set_defaults(func=self.handle_events)
 
+        sub_parser = commands.add_parser("capacity", help="Show how many instances of a given shape can be placed on the cluster")
+        shape = sub_parser.add_mutually_exclusive_group()
+        shape.add_argument("--app", "-a", help="Use the CPU and memory requirements from the spec of this application")
+        shape.add_argument("--cpus", help="Cores needed per instance. Default: 1", type=int, default=1)
+        sub_parser.add_argument("--memory", "-m", help="Memory (MB) needed per instance. Default: 1024", type=int, default=1024)
+        sub_parser.add_argument("--parallelism", "-p", help="Number of executors to fetch details for in parallel", type=int, default=8)
+        sub_parser.set_defaults(func=self.show_capacity)
+
         maintenance_parser = commands.add_parser("maintenance-on", help="Set cluster to maintenance mode")
         maintenance_parser.set_defaults(func=self.set_maintenance)
 
@@ -83,24 +96,64 @@ class Cluster(plugins.DrovePlugin):
             print("Cluster has no leader")
 
     def show_endpoints(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/endpoints")
-        data = sorted(raw, key=itemgetter('vhost', 'appId'))
-        if options.vhost:
-            data = [d for d in data if d['vhost'] == options.vhost]
-        droveutils.print_dict({"endpoints" : data})
+        from droveapi import endpoints
+        name = options.cluster or urlparse(self.drove_client.endpoint).netloc.replace(":", "_")
+        raw = endpoints.fetch(self.api, endpoints.cache_path(name), options.cache_ttl)
+        data = endpoints.EndpointIndex(raw).lookup(options.vhost, options.prefix, options.app)
+        if options.format == "table":
+            rows = [[d.get("vhost"), d.get("appId"), ", ".join(endpoints.hosts(d))] for d in data]
+            droveutils.print_table(["VHost", "App", "Hosts"], rows)
+        elif options.format == "jsonl":
+            for d in data:
+                print(json.dumps({"vhost": d.get("vhost"), "appId": d.get("appId"), "hosts": endpoints.hosts(d)}))
+        else:
+            droveutils.print_dict({"endpoints" : data})
 
     def handle_events(self, options: SimpleNamespace):
-        currtime = 0
-        while True:
-            events = self.drove_client.get("/apis/v1/cluster/events?size={size}&lastSyncTime={time}".format(size=options.count, time=currtime))
-            if options.type:
-                events = [e for e in events if e['type'] == options.type]
-            if len(events) > 0:
-                print("\n".join([self.convert_event(options.textfmt, e) for e in events]))
-            if not options.follow:
-                break
-            currtime = droveutils.now()
-            time.sleep(1)
+        types = [options.type] if options.type else None
+        for event in self.drove_client.iter_events(types=types, page_size=options.count, follow=options.follow):
+            print(self.convert_event(options.textfmt, event))
+
+    def show_capacity(self, options: SimpleNamespace):
+        from droveapi import capacity
+        if options.app:
+            shape = capacity.Shape.from_spec(self.api.apps.spec(options.app))
+        else:
+            shape = capacity.Shape(options.cpus, options.memory)
+        if shape.cpus <= 0 and shape.memory <= 0:
+            print("Error: instance shape needs at least one core or some memory")
+            return
+        executors = [capacity.ExecutorCapacity.from_executor(e) for e in self.api.executors.get_all(options.parallelism)]
+
+        data = dict()
+        data["Instance Shape"] = "{cpus} cores, {memory:,} MB memory".format(cpus=shape.cpus, memory=shape.memory)
+        data["Placeable Instances"] = sum(e.placeable(shape) for e in executors)
+        data["Free Cores"] = sum(e.free_cores for e in executors)
+        data["Stranded Cores"] = sum(e.stranded_cores(shape) for e in executors)
+        data["Free Memory"] = "{0:,} MB".format(sum(e.free_memory for e in executors))
+        droveutils.print_dict(data)
+        print()
+
+        rows = []
+        for executor in sorted(executors, key=lambda e: e.fragmentation(), reverse=True):
+            rows.append([executor.executor_id,
+                         executor.hostname,
+                         ",".join(executor.tags),
+                         "ACTIVE" if executor.active else "UNAVAILABLE",
+                         " ".join("{node}:{free}".format(node=node.node_id, free=node.free_core_count) for node in executor.nodes),
+                         executor.free_memory,
+                         executor.placeable(shape),
+                         executor.stranded_cores(shape),
+                         "{0:.0%}".format(executor.fragmentation())])
+        droveutils.print_table(["Executor ID", "Host", "Tags", "State", "Free Cores (per NUMA node)", "Free Memory (MB)",
+                                "Placeable", "Stranded Cores", "Fragmentation"], rows)
+        print()
+
+        rows = []
+        for tag, group in sorted(capacity.by_tag(executors, shape).items()):
+            rows.append([tag, group.executors, group.free_cores, group.placeable, group.stranded_cores,
+                         "{0:.0%}".format(group.fragmentation())])
+        droveutils.print_table(["Tag", "Executors", "Free Cores", "Placeable", "Stranded Cores", "Fragmentation"], rows)
 
     def set_maintenance(self, options: SimpleNamespace):
         try:
@@ -57,7 +57,7 @@ class Executors(plugins.DrovePlugin):
         super().populate_options(drove_client, parser)
 
     def list(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/cluster/executors")
+        raw = [executor.raw for executor in self.api.executors.list()]
         droveutils.print_dict_table(raw, headers={"executorId" : "Executor ID",
                                                 "hostname" : "Host",
                                                 "port" : "Port",
@@ -70,7 +70,7 @@ class Executors(plugins.DrovePlugin):
                                                 "state" : "State"})
 
     def show_info(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/cluster/executors/{id}".format(id=options.executor_id))
+        raw = self.api.executors.get(options.executor_id).raw
         # droveutils.print_dict(raw)
         data = {}
         data["ID"] = raw["state"]["executorId"]
@@ -96,48 +96,27 @@ class Executors(plugins.DrovePlugin):
         droveutils.print_dict(data)
 
     def show_appinstances(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/cluster/executors/{id}".format(id=options.executor_id))
+        executor = self.api.executors.get(options.executor_id)
         headers = ["Instance ID", "App name", "App ID", "CPU", "Memory (MB)", "State", "Error Message", "Created", "Last Updated"]
-        rows = []
-        for instance in raw.get("instances", list()):
-            row = []
-            row.append(instance["instanceId"])
-            row.append(instance["appName"])
-            row.append(instance["appId"])
-            cpu_list = [r for r in instance.get("resources", list()) if r.get("type", "") == "CPU"]
-            if len(cpu_list) > 0:
-                row.append(len(cpu_list[0].get("cores", dict())))
-            memory_list = [r for r in instance.get("resources", list()) if r.get("type", "") == "MEMORY"]
-            if len(memory_list) > 0:
-                row.append("{0: ,}".format(sum(memory_list[0].get("memoryInMB", dict()).values())))
-            row.append(instance["state"])
-            row.append(instance["errorMessage"])
-            row.append(droveutils.to_date(instance["created"]))
-            row.append(droveutils.to_date(instance["updated"]))
-
-            rows.append(row)
+        rows = [self.instance_row(instance) for instance in executor.instances]
         rows = sorted(rows, key=itemgetter(options.sort), reverse=options.reverse)
         droveutils.print_table(headers, rows)
 
     def show_tasks(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/cluster/executors/{id}".format(id=options.executor_id))
+        executor = self.api.executors.get(options.executor_id)
         task_rows = []
-        for task in raw.get("tasks", list()):
-            if options.app and task["sourceAppName"] != options.app:
+        for task in executor.tasks:
+            if options.app and task.source_app != options.app:
                 continue
             row = []
-            row.append(task["instanceId"])
-            row.append(task["sourceAppName"])
-            row.append(task["taskId"])
-            row.append(task["state"])
-            cpu_list = [r for r in task.get("resources", list()) if r.get("type", "") == "CPU"]
-            if len(cpu_list) > 0:
-                row.append(len(cpu_list[0].get("cores", dict())))
-            memory_list = [r for r in task.get("resources", list()) if r.get("type", "") == "MEMORY"]
-            if len(memory_list) > 0:
-                row.append("{0: ,}".format(sum(memory_list[0].get("memoryInMB", dict()).values())))
-            row.append(droveutils.to_date(task["created"]))
-            row.append(droveutils.to_date(task["updated"]))
+            row.append(task.instance_id)
+            row.append(task.source_app)
+            row.append(task.task_id)
+            row.append(task.state)
+            row.append(task.numa_nodes)
+            row.append("{0: ,}".format(task.memory))
+            row.append(droveutils.to_date(task.created))
+            row.append(droveutils.to_date(task.updated))
 
             task_rows.append(row)
 
@@ -146,32 +125,28 @@ class Executors(plugins.DrovePlugin):
         droveutils.print_table(headers, task_rows)
 
     def show_lsinstances(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/cluster/executors/{id}".format(id=options.executor_id))
+        executor = self.api.executors.get(options.executor_id)
         headers = ["Instance ID", "Service name", "Service ID", "CPU", "Memory (MB)", "State", "Error Message", "Created", "Last Updated"]
-        rows = []
-        for instance in raw.get("serviceInstances", list()):
-            row = []
-            row.append(instance["instanceId"])
-            row.append(instance["serviceName"])
-            row.append(instance["serviceId"])
-            cpu_list = [r for r in instance.get("resources", list()) if r.get("type", "") == "CPU"]
-            if len(cpu_list) > 0:
-                row.append(len(cpu_list[0].get("cores", dict())))
-            memory_list = [r for r in instance.get("resources", list()) if r.get("type", "") == "MEMORY"]
-            if len(memory_list) > 0:
-                row.append("{0: ,}".format(sum(memory_list[0].get("memoryInMB", dict()).values())))
-            row.append(instance["state"])
-            row.append(instance["errorMessage"])
-            row.append(droveutils.to_date(instance["created"]))
-            row.append(droveutils.to_date(instance["updated"]))
-
-            rows.append(row)
+        rows = [self.instance_row(instance) for instance in executor.service_instances]
         rows = sorted(rows, key=itemgetter(options.sort), reverse=options.reverse)
         droveutils.print_table(headers, rows)
 
+    def instance_row(self, instance) -> list:
+        row = []
+        row.append(instance.instance_id)
+        row.append(instance.app_name)
+        row.append(instance.app_id)
+        row.append(instance.numa_nodes)
+        row.append("{0: ,}".format(instance.memory))
+        row.append(instance.state)
+        row.append(instance.error_message)
+        row.append(droveutils.to_date(instance.created))
+        row.append(droveutils.to_date(instance.updated))
+        return row
+
     def blacklist(self, options: SimpleNamespace):
         try:
-            response = self.drove_client.post("/apis/v1/cluster/executors/blacklist", params={'id' : options.executor_ids}, body={})
+            response = self.api.executors.blacklist(options.executor_ids)
             successful = response["successful"]
             failed = response["failed"]
             print("Successful: " + ",".join(successful))
@@ -188,7 +163,7 @@ class Executors(plugins.DrovePlugin):
 
     def unblacklist(self, options: SimpleNamespace):
         try:
-            response = self.drove_client.post("/apis/v1/cluster/executors/unblacklist", params={'id' : options.executor_ids}, body={})
+            response = self.api.executors.unblacklist(options.executor_ids)
             successful = response["successful"]
             failed = response["failed"]
             print("Successful: " + ",".join(successful))
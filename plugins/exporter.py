@@ -0,0 +1,44 @@
+import argparse
+import droveclient
+import plugins
+
+from types import SimpleNamespace
+
+class Exporter(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "exporter"
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Serve cluster metrics in OpenMetrics format for Prometheus")
+        parser.add_argument("--listen", "-l", help="Address to serve metrics on as [host]:port. Default: :9190", default=":9190")
+        parser.add_argument("--interval", "-n", help="Seconds between polls of the cluster. Default: 15", type=float, default=15)
+        parser.add_argument("--once", help="Print the metrics once and exit instead of serving them", action="store_true")
+        super().populate_options(drove_client, parser)
+
+    def process(self, options: SimpleNamespace):
+        from droveapi import exporter
+        refresher = exporter.Refresher(self.api, options.interval)
+        if options.once:
+            metrics = refresher.refresh()
+            if metrics is None:
+                print("Error collecting metrics from cluster: " + str(refresher.last_error))
+                return
+            print(metrics, end="")
+            return
+        try:
+            host, port = exporter.parse_listen(options.listen)
+        except ValueError:
+            print("Error: invalid listen address {listen}. Use [host]:port".format(listen=options.listen))
+            return
+        refresher.refresh()
+        refresher.start()
+        server = exporter.serve(refresher, host, port)
+        print("Serving metrics on http://{host}:{port}/metrics".format(host=host or "0.0.0.0", port=server.server_address[1]), flush=True)
+        try:
+            server.serve_forever()
+        finally:
+            refresher.stop()
+            server.server_close()
@@ -0,0 +1,122 @@
+import argparse
+import droveclient
+import droveutils
+import hashlib
+import os
+import plugins
+import subprocess
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+def default_index_path(config_file: str = None) -> str:
+    """One index per config file, so clusters dropped from one file do not take entries of another file with them"""
+    name = "find-index"
+    if config_file is not None:
+        name += "-" + hashlib.sha256(os.path.abspath(config_file).encode()).hexdigest()[:12]
+    return os.path.join(str(Path.home()), ".drove-mirror", name + ".db")
+
+def refresh_command(options: SimpleNamespace, path: str) -> tuple:
+    """
+    Command and environment for a drove process that refreshes the index. The drove module is run from where
+    this one was imported, which works the same from a source tree, an installed package and the zipapp,
+    whatever sys.argv[0] is.
+    """
+    import drove
+    location = os.path.dirname(os.path.abspath(drove.__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [location, env.get("PYTHONPATH")]))
+    command = [sys.executable, "-m", "drove"]
+    if options.file:
+        command += ["-f", options.file]
+    if options.insecure:
+        command.append("--insecure")
+    command += ["find", "--refresh", "--db", path, "--parallelism", str(options.parallelism)]
+    return command, env
+
+class Find(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "find"
+
+    def needs_client(self) -> bool:
+        # Answers come from the local index. Clients are built per cluster only when refreshing
+        return False
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Find apps, local services, tasks, images and vhosts across all configured clusters")
+        parser.add_argument("pattern", nargs="?", help="Text to look for (case insensitive). Use * and ? to match the whole value")
+        parser.add_argument("--kind", "-k", choices=["app", "localservice", "task"], action="append", help="Only search objects of this kind (can be repeated)")
+        parser.add_argument("--field", choices=["id", "name", "image", "vhost", "source_app"], action="append", help="Only match this field (can be repeated)")
+        parser.add_argument("--refresh", "-r", help="Refresh the index from all clusters before searching", default=False, action="store_true")
+        parser.add_argument("--max-age", dest="max_age", type=int, default=300,
+                            help="Refresh the index in the background when it is older than this many seconds (default: 300)")
+        parser.add_argument("--db", help="Index database file. Default: ~/.drove-mirror/find-index.db, one per config file given with -f")
+        parser.add_argument("--parallelism", type=int, default=8, help="Number of parallel calls to each cluster")
+        super().populate_options(drove_client, parser)
+        parser.set_defaults(func=self.find)
+
+    def find(self, options: SimpleNamespace):
+        from droveapi import search
+        path = options.db or default_index_path(options.file)
+        try:
+            clusters = droveclient.cluster_names(options.file)
+        except (OSError, IOError) as e:
+            print("Error reading config file: " + str(e))
+            return
+        if len(clusters) == 0:
+            print("No clusters defined in the config file")
+            return
+
+        connection = search.open_index(path)
+        try:
+            search.forget(connection, clusters)
+            refreshed = search.refreshed_at(connection)
+            if options.refresh or not any(refreshed.get(cluster) for cluster in clusters):
+                self.refresh(options, path, clusters)
+            else:
+                now = time.time()
+                oldest = min(refreshed.get(cluster) or 0 for cluster in clusters)
+                if now - oldest > options.max_age and now - search.refresh_started(connection) > options.max_age:
+                    search.mark_refresh_started(connection, now)
+                    self.refresh_in_background(options, path)
+                    print("Index last refreshed {age:.0f}s ago, refreshing in the background".format(age=now - oldest), file=sys.stderr)
+            if options.pattern is None:
+                return
+            rows = search.search(connection, options.pattern, options.kind, options.field)
+        finally:
+            connection.close()
+        droveutils.print_table(["Cluster", "Kind", "ID", "State", "Field", "Value"], rows)
+
+    def refresh(self, options: SimpleNamespace, path: str, clusters: list):
+        """Refresh every cluster concurrently. A cluster that fails keeps its previous entries."""
+        import droveapi
+        from droveapi import search
+        def refresh_cluster(cluster: str) -> list:
+            start = time.monotonic()
+            connection = search.open_index(path)
+            try:
+                api = droveapi.DroveAPI(droveclient.build_cluster_client(options, cluster))
+                written, removed = search.refresh(api, connection, cluster, options.parallelism)
+                return [cluster, "OK", written, removed, "{0:.0f}".format((time.monotonic() - start) * 1000), ""]
+            except Exception as e:
+                search.record_failure(connection, cluster, str(e))
+                return [cluster, "ERROR", 0, 0, "{0:.0f}".format((time.monotonic() - start) * 1000), str(e)]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(clusters)) as pool:
+            report = list(pool.map(refresh_cluster, clusters))
+        import tabulate
+        print(tabulate.tabulate(report, headers=["Cluster", "Status", "Written", "Removed", "Latency (ms)", "Error"]), file=sys.stderr)
+
+    def refresh_in_background(self, options: SimpleNamespace, path: str):
+        """Start a detached drove process that refreshes the index, so this search is not held up"""
+        command, env = refresh_command(options, path)
+        subprocess.Popen(command, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
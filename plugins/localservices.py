@@ -3,10 +3,8 @@ import droveclient
 import droveutils
 import json
 import plugins
-import tenacity
 
 from operator import itemgetter
-from tenacity import retry
 from types import SimpleNamespace
 
 class LocalServices(plugins.DrovePlugin):
@@ -78,20 +76,19 @@ class LocalServices(plugins.DrovePlugin):
 
 
     def list_services(self, options: SimpleNamespace):
-        data = self.drove_client.get('/apis/v1/localservices')
         service_rows = []
-        for service_id, service_data in data.items():
+        for service in self.api.localservices.list():
             row = []
-            row.append(service_id)
-            row.append(service_data["name"])
-            row.append(service_data["state"])
-            row.append(service_data["activationState"])
-            row.append(service_data["totalCPUs"])
-            row.append(service_data["totalMemory"])
-            row.append(service_data["instancesPerHost"])
-            row.append(service_data["healthyInstances"])
-            row.append(droveutils.to_date(service_data["created"]))
-            row.append(droveutils.to_date(service_data["updated"]))
+            row.append(service.service_id)
+            row.append(service.name)
+            row.append(service.state)
+            row.append(service.activation_state)
+            row.append(service.total_cpus)
+            row.append(service.total_memory)
+            row.append(service.instances_per_host)
+            row.append(service.healthy_instances)
+            row.append(droveutils.to_date(service.created))
+            row.append(droveutils.to_date(service.updated))
 
             service_rows.append(row)
 
@@ -101,95 +98,56 @@ class LocalServices(plugins.DrovePlugin):
         droveutils.print_table(headers, service_rows)
 
     def show_summary(self, options: SimpleNamespace):
-        data = self.drove_client.get("/apis/v1/localservices/{service_id}".format(service_id = options.service_id))
-        droveutils.print_dict(data)
+        droveutils.print_dict(self.api.localservices.get(options.service_id).raw)
 
     def show_spec(self, options: SimpleNamespace):
-        data = self.drove_client.get("/apis/v1/localservices/{service_id}/spec".format(service_id = options.service_id))
-        droveutils.print_json(data)
+        droveutils.print_json(self.api.localservices.spec(options.service_id))
 
     def create_service(self, options: SimpleNamespace):
         try:
             with open(options.spec_file, 'r') as fp:
                 spec = json.load(fp)
-            operation = {
-                "type": "CREATE",
-                "spec": spec,
-                "instancesPerHost": options.instances
-            }
-            data = self.drove_client.post("/apis/v1/localservices/operations", operation)
-            print("Local service created with service id: {serviceId}".format(serviceId=data["serviceId"]))
+            service_id = self.api.localservices.create(spec, options.instances)
+            print("Local service created with service id: {serviceId}".format(serviceId=service_id))
         except (OSError, IOError) as e:
             print("Error creating local services. Error: " + str(e))
 
     def destroy_service(self, options: SimpleNamespace):
-        operation = {
-            "type": "DESTROY",
-            "serviceId": options.service_id
-        }
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        self.api.localservices.destroy(options.service_id)
         print("Local service destroyed")
 
     def activate_service(self, options: SimpleNamespace):
-        operation = {
-            "type": "ACTIVATE",
-            "serviceId": options.service_id
-        }
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        self.api.localservices.activate(options.service_id)
         print("Local service activated")
 
     def conftest_service(self, options: SimpleNamespace):
-        operation = {
-            "type": "DEPLOY_TEST_INSTANCE",
-            "serviceId": options.service_id
-        }
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        self.api.localservices.deploy_test_instance(options.service_id)
         print("Local service activated")
 
     def deactivate_service(self, options: SimpleNamespace):
-        operation = {
-            "type": "DEACTIVATE",
-            "serviceId": options.service_id
-        }
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        self.api.localservices.deactivate(options.service_id)
         print("Local service deactivated")
 
     def update_count(self, options: SimpleNamespace):
-        operation = {
-            "type": "UPDATE_INSTANCE_COUNT",
-            "serviceId": options.service_id,
-            "instancesPerHost": options.count
-        }
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        self.api.localservices.update_instances(options.service_id, options.count)
         print("Local service instance count updated")
     
     def restart_service(self, options: SimpleNamespace):
-        operation = {
-            "type": "RESTART",
-            "serviceId": options.service_id,
-            "stopFirst": options.stop,
-            "opSpec": {
-                "timeout": options.timeout,
-                "parallelism": options.parallelism,
-                "failureStrategy": "STOP"
-            }
-        }
-        existing = [] if options.wait == False else self.drove_client.service_instances(options.service_id)
-        data = self.drove_client.post("/apis/v1/localservices/operations", operation)
+        existing = set() if options.wait == False else self.api.localservices.healthy_instance_ids(options.service_id)
+        self.api.localservices.restart(options.service_id, options.stop, options.parallelism, options.timeout)
         if options.wait:
-            self.ensure_replaced(options.service_id, set(existing))
+            self.ensure_replaced(options.service_id, existing)
             print("All instances replaced")
         else:
             print("Local service restart command accepted.")
 
     def cancel_service_operation(self, options: SimpleNamespace):
-        data = self.drove_client.post("/apis/v1/localservices/operations/{serviceId}/cancel".format(serviceId=options.service_id), None, False)
+        data = self.api.localservices.cancel(options.service_id)
         print("Operation cancellation request registered :" + data["message"])
 
-    @retry(wait=tenacity.wait_exponential(multiplier=1, min=4, max=10),
-           retry=tenacity.retry_if_result(lambda x: x == False))
+    @droveutils.retry_until_true
     def ensure_replaced(self, service_id: str, existing: set) -> bool:
-        healthy = self.drove_client.service_instances(service_id)
+        healthy = self.api.localservices.healthy_instance_ids(service_id)
         overlap = len(existing.intersection(healthy))
         print("Remaining old instance count: {overlap}".format(overlap = overlap))
         return overlap == 0
@@ -0,0 +1,78 @@
+import argparse
+import droveclient
+import droveutils
+import os
+import plugins
+
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+def default_db_path(options: SimpleNamespace) -> str:
+    """One mirror per cluster: named after the cluster picked from the config file or the endpoint host"""
+    name = droveclient.current_cluster(options)
+    if not name and options.endpoint:
+        name = urlparse(options.endpoint.split(",")[0]).netloc.replace(":", "_")
+    return os.path.join(str(Path.home()), ".drove-mirror", (name or "default") + ".db")
+
+class Mirror(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "mirror"
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Maintain a local SQLite mirror of cluster state")
+
+        commands = parser.add_subparsers(help="Available commands for the local mirror")
+
+        sub_parser = commands.add_parser("sync", help="Pull apps, local services, instances, tasks and executors into the mirror")
+        sub_parser.add_argument("--db", help="Mirror database file. Default: ~/.drove-mirror/<cluster>.db")
+        sub_parser.add_argument("--parallelism", "-p", help="Number of parallel calls to the cluster", type=int, default=8)
+        sub_parser.set_defaults(func=self.sync)
+
+        super().populate_options(drove_client, parser)
+
+    def sync(self, options: SimpleNamespace):
+        from droveapi import mirror
+        path = options.db or default_db_path(options)
+        connection = mirror.open_mirror(path)
+        try:
+            stats = mirror.sync(self.api, connection, options.parallelism)
+        finally:
+            connection.close()
+        rows = [[table, written, deleted] for table, (written, deleted) in stats.items()]
+        droveutils.print_table(["Table", "Rows Written", "Rows Deleted"], rows)
+        print("Mirror updated: " + path)
+
+class Query(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "query"
+
+    def needs_client(self) -> bool:
+        return False
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Run read-only SQL against the local mirror. Tables: apps, local_services, instances, service_instances, tasks, executors")
+        parser.add_argument("sql", help="SQL query to run")
+        parser.add_argument("--db", help="Mirror database file. Default: ~/.drove-mirror/<cluster>.db")
+        super().populate_options(drove_client, parser)
+        parser.set_defaults(func=self.run_query)
+
+    def run_query(self, options: SimpleNamespace):
+        import sqlite3
+        from droveapi import mirror
+        path = options.db or default_db_path(options)
+        if not os.path.isfile(path):
+            print("No mirror found at {path}. Run drove mirror sync first".format(path=path))
+            return
+        try:
+            headers, rows = mirror.query(path, options.sql)
+        except sqlite3.Error as e:
+            print("Query error: " + str(e))
+            return
+        droveutils.print_table(headers, rows)
@@ -0,0 +1,71 @@
+import argparse
+import datetime
+import droveclient
+import droveutils
+import plugins
+
+from types import SimpleNamespace
+
+class Snapshot(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "snapshot"
+
+    def needs_client(self) -> bool:
+        # Only save talks to the cluster, diff works on files
+        return False
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Save and compare snapshots of cluster state")
+
+        commands = parser.add_subparsers(help="Available commands for cluster snapshots")
+
+        sub_parser = commands.add_parser("save", help="Save apps, local services, tasks, executors and endpoints to a compressed snapshot file")
+        sub_parser.add_argument("--output", "-o", help="Snapshot file name. Default: drove-snapshot-<time>-<hash>.json.gz")
+        sub_parser.add_argument("--parallelism", "-p", help="Number of parallel calls to the cluster", type=int, default=8)
+        sub_parser.set_defaults(func=self.save)
+
+        sub_parser = commands.add_parser("diff", help="Show what changed between two snapshots")
+        sub_parser.add_argument("old", help="Older snapshot file")
+        sub_parser.add_argument("new", help="Newer snapshot file")
+        sub_parser.set_defaults(func=self.diff)
+
+        super().populate_options(drove_client, parser)
+
+    def save(self, options: SimpleNamespace):
+        from droveapi import snapshot
+        if droveclient.build_drove_client(self.drove_client, options) is None:
+            return
+        data = snapshot.capture(self.api, options.parallelism)
+        filename = options.output
+        if not filename:
+            filename = "drove-snapshot-{time}-{hash}.json.gz".format(time=datetime.datetime.now().strftime("%Y%m%d-%H%M%S"), hash=data["hash"][:12])
+        snapshot.save(data, filename)
+        counts = ", ".join("{count} {section}".format(count=len(data["sections"][section]["items"]), section=section)
+                           for section in snapshot.SECTIONS)
+        print("Snapshot saved to {filename} (hash: {hash}): {counts}".format(filename=filename, hash=data["hash"][:12], counts=counts))
+
+    def diff(self, options: SimpleNamespace):
+        from droveapi import snapshot
+        try:
+            old = snapshot.load(options.old)
+            new = snapshot.load(options.new)
+        except (OSError, IOError, ValueError) as e:
+            print("Error reading snapshot. Error: " + str(e))
+            return
+        result = snapshot.diff(old, new)
+        if result.identical:
+            print("Snapshots are identical")
+            return
+        if result.changes:
+            rows = [[change.section, change.key, change.change, change.details] for change in result.changes]
+            droveutils.print_table(["Section", "Id", "Change", "Details"], rows)
+        if result.capacity:
+            print()
+            rows = [[delta.executor_id, delta.hostname, "{0:+d}".format(delta.used_cores), "{0:+,d}".format(delta.used_memory)]
+                    for delta in result.capacity]
+            rows.append(["Total", "", "{0:+d}".format(sum(d.used_cores for d in result.capacity)),
+                         "{0:+,d}".format(sum(d.used_memory for d in result.capacity))])
+            droveutils.print_table(["Executor ID", "Host", "Used Cores", "Used Memory (MB)"], rows)
@@ -64,55 +64,29 @@ class Tasks(plugins.DrovePlugin):
         try:
             with open(options.spec_file, 'r') as fp:
                 spec = json.load(fp)
-            operation = {
-                "type": "CREATE",
-                "spec": spec,
-                "opSpec": {
-                   "timeout": "5m",
-                    "parallelism": 1,
-                    "failureStrategy": "STOP"
-                }
-            }
-            data = self.drove_client.post("/apis/v1/tasks/operations", operation)
+            internal_task_id = self.api.tasks.create(spec)
             print("Task created. Source App Name: {sourceAppName} Task ID: {taskId}. Drove assigned task ID: {internalTaskId}"
-                  .format(internalTaskId=data["taskId"], sourceAppName=spec["sourceAppName"], taskId=spec["taskId"]))
+                  .format(internalTaskId=internal_task_id, sourceAppName=spec["sourceAppName"], taskId=spec["taskId"]))
         except (OSError, IOError) as e:
             print("Error creating task. Error: " + str(e))
 
     def kill_task(self, options: SimpleNamespace):
-        operation = {
-            "type": "KILL",
-            "sourceAppName" : options.source_app_name,
-            "taskId" : options.task_id,
-            "opSpec": {
-                "timeout": "5m",
-                "parallelism": 1,
-                "failureStrategy": "STOP"
-            }
-        }
-        data = self.drove_client.post("/apis/v1/tasks/operations", operation)
+        self.api.tasks.kill(options.source_app_name, options.task_id)
         print("Task kill issued")
 
     def list_task(self, options: SimpleNamespace):
-        data = self.drove_client.get('/apis/v1/tasks')
         task_rows = []
-        for task in data:
-            if options.app and task["sourceAppName"] != options.app:
-                continue
+        for task in self.api.tasks.list(options.app):
             row = []
-            row.append(task["instanceId"])
-            row.append(task["sourceAppName"])
-            row.append(task["taskId"])
-            row.append(task["state"])
-            row.append(task.get("hostname", ""))
-            cpu_list = [r for r in task.get("resources", list()) if r.get("type", "") == "CPU"]
-            if len(cpu_list) > 0:
-                row.append(len(cpu_list[0].get("cores", dict())))
-            memory_list = [r for r in task.get("resources", list()) if r.get("type", "") == "MEMORY"]
-            if len(memory_list) > 0:
-                row.append(sum(memory_list[0].get("memoryInMB", dict()).values()))
-            row.append(droveutils.to_date(task["created"]))
-            row.append(droveutils.to_date(task["updated"]))
+            row.append(task.instance_id)
+            row.append(task.source_app)
+            row.append(task.task_id)
+            row.append(task.state)
+            row.append(task.hostname)
+            row.append(task.numa_nodes)
+            row.append(task.memory)
+            row.append(droveutils.to_date(task.created))
+            row.append(droveutils.to_date(task.updated))
 
             task_rows.append(row)
 
@@ -122,7 +96,7 @@ class Tasks(plugins.DrovePlugin):
         droveutils.print_table(headers, task_rows)
 
     def show_task(self, options: SimpleNamespace):
-        raw = self.drove_client.get("/apis/v1/tasks/{source_app}/instances/{task_id}".format(source_app = options.source_app, task_id = options.task_id))
+        raw = self.api.tasks.get(options.source_app, options.task_id).raw
         data = OrderedDict()
         data["Source App"] = raw["sourceAppName"]
         data["Task ID"] = raw["taskId"]
@@ -0,0 +1,149 @@
+import argparse
+import droveclient
+import droveutils
+import json
+import plugins
+import time
+
+from collections import deque
+from types import SimpleNamespace
+
+class Top(plugins.DrovePlugin):
+    def __init__(self) -> None:
+        pass
+
+    def name(self) -> str:
+        return "top"
+
+    def populate_options(self, drove_client: droveclient.DroveClient, subparser: argparse.ArgumentParser):
+        parser = subparser.add_parser(self.name(), help="Live dashboard of executors, applications and cluster events")
+        parser.add_argument("--refresh", "-r", help="Seconds between refreshes. Default: 2", type=float, default=2)
+        parser.add_argument("--iterations", "-n", help="Exit after this many refreshes. Default: run till CTRL-C", type=int, default=0)
+        parser.add_argument("--rows", help="Rows to show per section. Default: 10", type=int, default=10)
+        parser.add_argument("--full-refresh", dest="full_refresh", type=float, default=30,
+                            help="Seconds after which the executor and application lists are fetched again even if the "
+                                 "cluster summary and events show no change. Default: 30")
+        super().populate_options(drove_client, parser)
+
+    def process(self, options: SimpleNamespace):
+        # top keeps its own copies of the executor and application lists, everything else is read fresh every frame
+        self.drove_client.cache_ttl = 0
+        self.event_cursor = droveutils.now() - 5 * 60 * 1000
+        self.seen_events = {}
+        self.recent_events = deque(maxlen=options.rows)
+        self.event_count = 0
+        self.executors = CachedList(self.api.executors.list, options.full_refresh)
+        self.apps = CachedList(self.api.apps.list, options.full_refresh)
+        self.sections = {}
+        renderer = droveutils.ScreenRenderer()
+        self.highlight = renderer.interactive
+        iteration = 0
+        try:
+            while True:
+                self.drove_client.policy.reset()
+                renderer.render(self.frame(options))
+                iteration += 1
+                if options.iterations and iteration >= options.iterations:
+                    break
+                time.sleep(options.refresh)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            renderer.close()
+
+    def frame(self, options: SimpleNamespace) -> list:
+        summary = self.api.cluster.summary()
+        self.poll_events()
+        lines = []
+        lines.append("drove top - {endpoint} - {now} - refreshing every {refresh:g}s"
+                     .format(endpoint=self.drove_client.endpoint, now=droveutils.to_date(droveutils.now()), refresh=options.refresh))
+        lines.append("State: {state}  Executors: {executors}  Cores: {used}/{total} ({cpu}) Memory: {used_mem:,}/{total_mem:,} MB ({mem})  Apps: {active}/{apps}"
+                     .format(state=summary["state"], executors=summary["numExecutors"],
+                             used=summary["usedCores"], total=summary["totalCores"],
+                             cpu=percent(summary["usedCores"], summary["totalCores"]),
+                             used_mem=summary["usedMemory"], total_mem=summary["totalMemory"],
+                             mem=percent(summary["usedMemory"], summary["totalMemory"]),
+                             active=summary["numActiveApplications"], apps=summary["numApplications"]))
+        lines.append("")
+
+        # The lists are only fetched again when the summary or new events show that something changed
+        usage = (summary["numExecutors"], summary["usedCores"], summary["totalCores"], summary["usedMemory"], summary["totalMemory"])
+        lines.append("EXECUTORS (by core utilisation)")
+        lines.append("{0:<30} {1:<12} {2:>11} {3:>6} {4:>19} {5:>6}".format("Host", "State", "Used Cores", "CPU%", "Used Memory (MB)", "Mem%"))
+        executors = sorted(self.executors.get(usage),
+                           key=lambda e: (-ratio(e.used_cores, e.used_cores + e.free_cores), e.hostname))
+        rows = []
+        for executor in executors[:options.rows]:
+            total_cores = executor.used_cores + executor.free_cores
+            total_memory = executor.used_memory + executor.free_memory
+            rows.append("{0:<30} {1:<12} {2:>11} {3:>6} {4:>19} {5:>6}".format(
+                executor.hostname[:30], executor.state,
+                "{0}/{1}".format(executor.used_cores, total_cores), percent(executor.used_cores, total_cores),
+                "{0:,}/{1:,}".format(executor.used_memory, total_memory), percent(executor.used_memory, total_memory)))
+        lines.extend(self.changed_rows("executors", rows))
+        lines.append("")
+
+        lines.append("APPLICATIONS (by missing healthy instances)")
+        lines.append("{0:<40} {1:<12} {2:>9} {3:>8} {4:>8}".format("Id", "State", "Required", "Healthy", "Missing"))
+        apps = sorted(self.apps.get(usage + (summary["numApplications"], summary["numActiveApplications"], self.event_count)),
+                      key=lambda a: (a.healthy_instances - a.required_instances, a.app_id))
+        rows = []
+        for app in apps[:options.rows]:
+            rows.append("{0:<40} {1:<12} {2:>9} {3:>8} {4:>8}".format(
+                app.app_id[:40], app.state, app.required_instances, app.healthy_instances,
+                max(0, app.required_instances - app.healthy_instances)))
+        lines.extend(self.changed_rows("apps", rows))
+        lines.append("")
+
+        lines.append("RECENT EVENTS")
+        for event in reversed(self.recent_events):
+            lines.append("{0:<20} {1:<30} {2}".format(droveutils.to_date(event.time), event.type, json.dumps(event.metadata)))
+        return lines
+
+    def poll_events(self):
+        # Resume from the newest event seen, skipping events at the cursor that were already shown
+        for event in self.api.cluster.iter_events(since=self.event_cursor):
+            if event.event_id in self.seen_events:
+                continue
+            self.seen_events[event.event_id] = event.time
+            self.recent_events.append(event)
+            self.event_count += 1
+            self.event_cursor = max(self.event_cursor, event.time)
+        self.seen_events = {event_id: event_time for event_id, event_time in self.seen_events.items() if event_time >= self.event_cursor}
+
+    def changed_rows(self, section: str, rows: list) -> list:
+        """
+        The rows of a section. On a terminal rows added or changed since the section last changed are
+        highlighted, and stay so until it changes again, so frames without changes redraw nothing.
+        """
+        previous, shown = self.sections.get(section, (None, rows))
+        if previous is not None and previous != rows:
+            shown = rows
+            if self.highlight:
+                added, changed, _ = droveutils.diff_rows(previous, rows)
+                keys = list(droveutils.keyed_rows(rows).keys())
+                shown = ["\x1b[33m" + row + "\x1b[0m" if key in added or key in changed else row for key, row in zip(keys, rows)]
+        self.sections[section] = (rows, shown)
+        return shown
+
+class CachedList:
+    """A list read from the cluster, read again when its key changes or it is older than max_age seconds"""
+    def __init__(self, fetch, max_age: float):
+        self.fetch = fetch
+        self.max_age = max_age
+        self.items = None
+        self.key = None
+        self.fetched = 0.0
+
+    def get(self, key) -> list:
+        if self.items is None or key != self.key or time.monotonic() - self.fetched >= self.max_age:
+            self.items = list(self.fetch())
+            self.key = key
+            self.fetched = time.monotonic()
+        return self.items
+
+def ratio(used: int, total: int) -> float:
+    return used / total if total > 0 else 0.0
+
+def percent(used: int, total: int) -> str:
+    return "{0:.0%}".format(ratio(used, total))
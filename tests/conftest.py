@@ -25,6 +25,8 @@ Environment Variables (override ~/.drove — used by live tests):
   DROVE_CLUSTER     cluster name from ~/.drove  (default: uses current_cluster)
   DROVE_INSECURE    set to '1' to skip SSL verification
 """
+import contextlib
+import io
 import json
 import os
 import subprocess
@@ -47,9 +49,18 @@ FIXTURES_DIR = TESTS_DIR / "fixtures"
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Whether drove() runs the CLI in this process for the current test, see the cli_runner fixture
+_cli_runner = {"inprocess": False}
+
+
 def _base_cmd() -> list[str]:
     """Build the base `drove` command, always using the local source tree."""
-    cmd = [sys.executable, str(TESTS_DIR.parent / "drove.py")]
+    return [sys.executable, str(TESTS_DIR.parent / "drove.py")] + _base_args()
+
+
+def _base_args() -> list[str]:
+    """Connection arguments for the CLI, taken from the environment."""
+    cmd = []
     endpoint = os.environ.get("DROVE_ENDPOINT")
     cluster  = os.environ.get("DROVE_CLUSTER")
     username = os.environ.get("DROVE_USERNAME")
@@ -72,15 +83,50 @@ def _base_cmd() -> list[str]:
     return cmd
 
 
+def run_inprocess(args: list) -> subprocess.CompletedProcess:
+    """
+    Run the CLI in this process through drove.run() and capture its output. This skips the interpreter
+    start and imports a subprocess pays on every call, but the command shares the interpreter with the
+    test: there is no timeout, and a command that never returns hangs the test.
+    """
+    import drove
+    import drovetrace
+    stdout, stderr = io.StringIO(), io.StringIO()
+    code = 0
+    saved = sys.argv, sys.stdin
+    # Each invocation starts with a fresh tracer, the same as a new process
+    drovetrace.TRACER = drovetrace.Tracer()
+    sys.argv = [str(TESTS_DIR.parent / "drove.py")] + list(args)
+    sys.stdin = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                drove.run(list(args))
+            except SystemExit as e:
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+                    code = 1
+                else:
+                    code = (e.code or 0) & 0xFF
+    finally:
+        sys.argv, sys.stdin = saved
+    return subprocess.CompletedProcess(["drove"] + list(args), code, stdout.getvalue(), stderr.getvalue())
+
+
 def drove(*args, check: bool = True, timeout: int = 30) -> subprocess.CompletedProcess:
-    """Run the drove CLI with the given arguments and return the result."""
-    cmd = _base_cmd() + list(args)
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
+    """
+    Run the drove CLI with the given arguments and return the result. Offline tests run it in this
+    process unless they are marked ``subprocess`` or pytest was started with ``--cli-runner subprocess``.
+    """
+    if _cli_runner["inprocess"]:
+        result = run_inprocess(_base_args() + list(args))
+    else:
+        result = subprocess.run(
+            _base_cmd() + list(args),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
     if check and result.returncode != 0:
         raise AssertionError(
             f"drove {' '.join(args)} failed (rc={result.returncode}):\n"
@@ -301,12 +347,36 @@ def live_service():
 # Offline / mock server fixtures
 # ---------------------------------------------------------------------------
 
+def pytest_addoption(parser):
+    parser.addoption("--mock-backend", default="werkzeug", choices=["werkzeug", "threaded"],
+                     help="Server backend for the offline mock Drove API (default: werkzeug)")
+    parser.addoption("--cli-runner", default="inprocess", choices=["inprocess", "subprocess"],
+                     help="How offline tests run the CLI (default: inprocess). Tests marked subprocess always use a subprocess")
+    parser.addoption("--perf-report", help="Write request counts, time and memory of the commands in tests/perf_budgets.json to this file")
+
+
+@pytest.fixture(autouse=True)
+def cli_runner(request):
+    """Run the CLI in process for offline tests, see drove()"""
+    _cli_runner["inprocess"] = (request.config.getoption("--cli-runner") == "inprocess"
+                                and request.node.get_closest_marker("offline") is not None
+                                and request.node.get_closest_marker("subprocess") is None)
+    yield
+    _cli_runner["inprocess"] = False
+
+
 @pytest.fixture(scope="session")
-def mock_drove_server():
+def mock_drove_server(request):
     """
     Session-scoped fixture that starts the mock Drove API server on an
     ephemeral localhost port and yields the server object.
 
+    The backend comes from ``--mock-backend`` unless the fixture is
+    parametrized, which starts one server per backend::
+
+        @pytest.mark.parametrize("mock_drove_server", ["threaded"], indirect=True)
+        def test_many_clients(offline_env): ...
+
     The server is stopped automatically after all offline tests finish.
     Access the endpoint via ``mock_drove_server.endpoint``.
     Access (and mutate) state via ``mock_drove_server.state``.
@@ -320,7 +390,7 @@ def mock_drove_server():
             assert "ping successful" in out.lower()
     """
     from mock_server import MockDroveServer
-    server = MockDroveServer()
+    server = MockDroveServer(getattr(request, "param", None) or request.config.getoption("--mock-backend"))
     server.start()
     yield server
     server.stop()
@@ -0,0 +1,280 @@
+"""
+tests/datagen.py — deterministic generator for large mock clusters.
+
+``generate(ClusterShape(...))`` builds apps with specs, instances placed on
+executors with per NUMA node core and memory assignments, local services with
+one instance per executor, running tasks, cluster events and log files.
+The same shape and seed always produce the same cluster.
+
+``DroveState.load()`` swaps a generated cluster into the mock server in one
+step, so nothing goes through the per-object create helpers or deep copies.
+Objects are built directly in the shape the mock routes serve, and instances
+are shared between their app and executor views, as on a real controller.
+
+    from datagen import ClusterShape, generate
+    state.load(generate(ClusterShape(apps=10000, executors=2000, instances=100000)))
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+
+START_TIME = 1700000000000
+DAY_MS = 86400000
+
+TEAMS = ["PAYMENTS", "LEDGER", "SEARCH", "CATALOG", "RISK", "NOTIFY", "IDENTITY", "REPORTS", "GATEWAY", "CHECKOUT"]
+WORDS = ["API", "WORKER", "CONSUMER", "SCHEDULER", "INDEXER", "SYNC", "READER", "WRITER", "PROXY", "CACHE",
+         "BATCH", "STREAM", "ROUTER", "AUDIT", "EXPORT", "IMPORT"]
+SERVICES = ["LOG_SHIPPER", "NODE_EXPORTER", "DNS_CACHE", "ENVOY_SIDECAR", "SECRETS_AGENT"]
+EVENT_TYPES = ["APP_STATE_CHANGE", "INSTANCE_STATE_CHANGE", "TASK_STATE_CHANGE", "EXECUTOR_ADDED",
+               "EXECUTOR_REMOVED", "LOCAL_SERVICE_STATE_CHANGE"]
+LOG_LEVELS = ["INFO"] * 8 + ["DEBUG", "WARN", "ERROR"]
+
+
+@dataclass
+class ClusterShape:
+    apps: int = 100
+    executors: int = 20
+    instances: int = 500
+    local_services: int = 2
+    tasks: int = 20
+    events: int = 1000
+    numa_nodes: int = 2
+    cores_per_node: int = 32
+    memory_per_node: int = 131072
+    # Log file name to size in bytes. Every app and task instance serves the same files
+    log_sizes: dict = field(default_factory=dict)
+    seed: int = 1
+
+
+@dataclass
+class Cluster:
+    apps: dict
+    local_services: dict
+    tasks: dict
+    executors: list
+    events: list
+    logs: dict
+
+
+def executor_id(index: int) -> str:
+    return f"{index:08x}-0000-4000-8000-{index:012x}"
+
+
+class _Executor:
+    """Free resources of one executor while placing instances"""
+    __slots__ = ("detail", "free_cores", "used_cores", "free_memory", "used_memory", "apps")
+
+    def __init__(self, index: int, shape: ClusterShape, rng: random.Random):
+        nodes = [str(n) for n in range(shape.numa_nodes)]
+        self.free_cores = {n: list(range(int(n) * shape.cores_per_node, (int(n) + 1) * shape.cores_per_node)) for n in nodes}
+        self.used_cores = {n: [] for n in nodes}
+        self.free_memory = {n: shape.memory_per_node for n in nodes}
+        self.used_memory = {n: 0 for n in nodes}
+        self.apps: dict = {}
+        self.detail = {
+            "hostname": f"exec-{index:05d}.dc1.example.com",
+            "port": 3000,
+            "transportType": "HTTP",
+            "executorState": "ACTIVE",
+            "blacklisted": False,
+            "tags": ["high-mem"] if rng.random() < 0.1 else [],
+            "updated": START_TIME + DAY_MS,
+            "state": {
+                "executorId": executor_id(index),
+                "cpus": {"freeCores": self.free_cores, "usedCores": self.used_cores},
+                "memory": {"freeMemory": self.free_memory, "usedMemory": self.used_memory},
+            },
+            "instances": [],
+            "tasks": [],
+            "serviceInstances": [],
+        }
+
+    def allocate(self, cores: int, memory: int) -> tuple | None:
+        """Take cores and memory from a single NUMA node, or return None when no node has room"""
+        for node, free in self.free_cores.items():
+            if len(free) >= cores and self.free_memory[node] >= memory:
+                taken = free[:cores]
+                del free[:cores]
+                self.used_cores[node].extend(taken)
+                self.free_memory[node] -= memory
+                self.used_memory[node] += memory
+                return node, taken
+        return None
+
+
+class _Placer:
+    def __init__(self, executors: list, rng: random.Random):
+        self.executors = executors
+        self.next = rng.randrange(len(executors)) if executors else 0
+
+    def place(self, app_id: str, cores: int, memory: int, per_host: int) -> tuple | None:
+        """Round robin over executors, skipping those that are full or already run per_host instances of the app"""
+        for _ in range(len(self.executors)):
+            executor = self.executors[self.next]
+            self.next = (self.next + 1) % len(self.executors)
+            if per_host and executor.apps.get(app_id, 0) >= per_host:
+                continue
+            allocation = executor.allocate(cores, memory)
+            if allocation is not None:
+                executor.apps[app_id] = executor.apps.get(app_id, 0) + 1
+                return executor, allocation[0], allocation[1]
+        return None
+
+
+def _instance(prefix: str, owner_key: str, owner_id: str, name_key: str, name: str, number: int,
+              executor: _Executor, node: str, cores: list, memory: int, state: str, created: int) -> dict:
+    hostname = executor.detail["hostname"]
+    return {
+        "instanceId": f"{prefix}-{owner_id.lower()}-{number:04d}",
+        owner_key: owner_id,
+        name_key: name,
+        "executorId": executor.detail["state"]["executorId"],
+        "hostname": hostname,
+        "localInfo": {"hostname": hostname,
+                      "ports": {"main": {"containerPort": 8000, "hostPort": 20000 + number % 40000, "portType": "HTTP"}}},
+        "state": state,
+        "errorMessage": "Health check failed" if state == "UNHEALTHY" else "",
+        "resources": [{"type": "CPU", "cores": {node: cores}}, {"type": "MEMORY", "memoryInMB": {node: memory}}],
+        "metadata": {},
+        "created": created,
+        "updated": created + 60000,
+    }
+
+
+def _log(size: int, rng: random.Random) -> str:
+    """A log of exactly size characters built from a few hundred distinct lines"""
+    lines = []
+    for n in range(500):
+        level = rng.choice(LOG_LEVELS)
+        lines.append(f"2024-01-01 00:{n // 60 % 60:02d}:{n % 60:02d},{rng.randrange(1000):03d} {level:<5} "
+                     f"[pool-1-thread-{rng.randrange(1, 33)}] c.e.{rng.choice(WORDS).lower()}.Handler - "
+                     f"request {rng.getrandbits(64):016x} served in {rng.randrange(1, 900)} ms\n")
+    block = "".join(lines)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def generate(shape: ClusterShape) -> Cluster:
+    rng = random.Random(shape.seed)
+    executors = [_Executor(e, shape, rng) for e in range(shape.executors)]
+    placer = _Placer(executors, rng)
+
+    apps = {}
+    counts = [shape.instances // shape.apps + (1 if a < shape.instances % shape.apps else 0) for a in range(shape.apps)] if shape.apps else []
+    for a in range(shape.apps):
+        name = f"{TEAMS[a % len(TEAMS)]}_{rng.choice(WORDS)}_{a:05d}"
+        version = str(rng.randrange(1, 30))
+        app_id = f"{name}-{version}"
+        cores = rng.choice([1, 1, 1, 2, 2, 4])
+        memory = cores * rng.choice([1024, 2048, 4096])
+        policy = rng.choice(["ANY", "ANY", "ONE_PER_HOST", "MAX_N_PER_HOST"])
+        per_host = {"ANY": 0, "ONE_PER_HOST": 1, "MAX_N_PER_HOST": 2}[policy]
+        created = START_TIME + rng.randrange(DAY_MS)
+        spec = {
+            "name": name,
+            "version": version,
+            "type": "SERVICE",
+            "executable": {"type": "DOCKER",
+                           "url": f"registry.example.com/{name.split('_')[0].lower()}/{name.lower().replace('_', '-')}:"
+                                  f"1.{rng.randrange(40)}.{rng.randrange(10)}",
+                           "dockerPullTimeout": "100 seconds"},
+            "resources": [{"type": "CPU", "count": cores}, {"type": "MEMORY", "sizeInMB": memory}],
+            "placementPolicy": {"type": policy, "maxInstances": per_host} if policy == "MAX_N_PER_HOST" else {"type": policy},
+            "exposedPorts": [{"name": "main", "port": 8000, "type": "HTTP"}],
+            "env": {"ENVIRONMENT": "production", "TEAM": name.split("_")[0]},
+        }
+        if rng.random() < 0.8:
+            spec["exposureSpec"] = {"vhost": f"{name.lower().replace('_', '-')}.internal.example.com", "portName": "main", "mode": "ALL"}
+
+        instances = []
+        for number in range(counts[a]):
+            placed = placer.place(app_id, cores, memory, per_host)
+            if placed is None:
+                break
+            executor, node, taken = placed
+            roll = rng.random()
+            state = "HEALTHY" if roll < 0.95 else ("UNHEALTHY" if roll < 0.98 else "STARTING")
+            instance = _instance("AI", "appId", app_id, "appName", name, number, executor, node, taken, memory, state,
+                                 created + rng.randrange(DAY_MS))
+            instances.append(instance)
+            executor.detail["instances"].append(instance)
+        healthy = sum(1 for instance in instances if instance["state"] == "HEALTHY")
+        apps[app_id] = {
+            "summary": {
+                "id": app_id, "name": name, "version": version,
+                "state": "RUNNING" if counts[a] else "MONITORING",
+                "totalCPUs": cores * counts[a], "totalMemory": memory * counts[a],
+                "requiredInstances": counts[a], "healthyInstances": healthy,
+                "created": created, "updated": created + DAY_MS // 2,
+            },
+            "spec": spec,
+            "instances": instances,
+        }
+
+    local_services = {}
+    for s in range(shape.local_services):
+        name = SERVICES[s % len(SERVICES)] + ("" if s < len(SERVICES) else f"_{s}")
+        service_id = f"{name}-1"
+        instances = []
+        for number, executor in enumerate(executors):
+            allocation = executor.allocate(1, 512)
+            if allocation is None:
+                continue
+            instance = _instance("SI", "serviceId", service_id, "serviceName", name, number, executor,
+                                 allocation[0], allocation[1], 512, "HEALTHY", START_TIME)
+            instances.append(instance)
+            executor.detail["serviceInstances"].append(instance)
+        local_services[service_id] = {
+            "summary": {
+                "id": service_id, "name": name, "version": "1", "state": "ACTIVE", "activationState": "ACTIVE",
+                "totalCPUs": len(instances), "totalMemory": 512 * len(instances), "instancesPerHost": 1,
+                "requiredInstances": len(executors), "healthyInstances": len(instances), "totalInstances": len(instances),
+                "created": START_TIME, "updated": START_TIME + DAY_MS // 2,
+            },
+            "spec": {"name": name, "version": "1", "type": "LOCAL_SERVICE",
+                     "executable": {"type": "DOCKER", "url": f"registry.example.com/infra/{name.lower().replace('_', '-')}:2.0.0"},
+                     "resources": [{"type": "CPU", "count": 1}, {"type": "MEMORY", "sizeInMB": 512}]},
+            "instances": instances,
+        }
+
+    tasks = {}
+    app_names = [app["summary"]["name"] for app in apps.values()] or ["TASK_SOURCE"]
+    for t in range(shape.tasks):
+        source = rng.choice(app_names)
+        task_id = f"T{t:06d}"
+        placed = placer.place("", 1, 1024, 0)
+        if placed is None:
+            break
+        executor, node, taken = placed
+        created = START_TIME + DAY_MS - rng.randrange(3600000)
+        task = {
+            "taskId": task_id,
+            "sourceAppName": source,
+            "instanceId": f"TI-{source.lower()}-{t:06d}",
+            "executorId": executor.detail["state"]["executorId"],
+            "hostname": executor.detail["hostname"],
+            "state": "RUNNING",
+            "resources": [{"type": "CPU", "cores": {node: taken}}, {"type": "MEMORY", "memoryInMB": {node: 1024}}],
+            "executable": {"type": "DOCKER", "url": f"registry.example.com/jobs/{source.lower().replace('_', '-')}-job:1.0.0"},
+            "volumes": [],
+            "logging": {"type": "LOCAL"},
+            "metadata": {},
+            "taskResult": {},
+            "errorMessage": "",
+            "created": created,
+            "updated": created,
+        }
+        tasks[f"{source}/{task_id}"] = task
+        executor.detail["tasks"].append(task)
+
+    app_ids = list(apps) or ["NONE-1"]
+    spacing = max(DAY_MS // max(shape.events, 1), 1)
+    events = []
+    for n in range(shape.events):
+        event_type = rng.choice(EVENT_TYPES)
+        events.append({"id": f"{shape.seed:04x}-{n:012x}", "type": event_type, "time": START_TIME + n * spacing,
+                       "metadata": {"APP_ID": rng.choice(app_ids), "CURRENT_STATE": "RUNNING"}})
+
+    logs = {name: _log(size, rng) for name, size in shape.log_sizes.items()}
+    return Cluster(apps=apps, local_services=local_services, tasks=tasks,
+                   executors=[executor.detail for executor in executors], events=events, logs=logs)
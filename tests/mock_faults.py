@@ -0,0 +1,178 @@
+"""
+tests/mock_faults.py — latency and fault injection for the mock Drove server.
+
+A fault configuration is a list of rules. The first rule whose path glob and
+method match a request decides what happens to it:
+
+    {
+        "seed": 7,
+        "rules": [
+            {
+                "path": "/apis/v1/applications*",   # fnmatch glob, default "*"
+                "methods": ["GET"],                  # default: all methods
+                "latency": {"distribution": "normal", "mean": 80, "stddev": 20},
+                "error_rate": 0.05,                  # answer with error_status instead
+                "error_status": 503,                 # default 503
+                "reset_rate": 0.01,                  # drop the connection without answering
+                "bandwidth": 262144,                 # bytes per second for the response body
+                "drip": {"chunk": 16, "interval_ms": 100},
+                "count": 3                           # only the next 3 matching requests
+            }
+        ]
+    }
+
+Latency distributions (all values in milliseconds, samples below 0 become 0):
+
+    {"distribution": "fixed", "value": 100}
+    {"distribution": "uniform", "min": 10, "max": 200}
+    {"distribution": "normal", "mean": 80, "stddev": 20}
+    {"distribution": "lognormal", "median": 50, "sigma": 0.5}
+    {"distribution": "exponential", "mean": 40}
+
+Latency is applied before the error and reset checks, so a failing request
+can also be a slow one. bandwidth and drip slow down the response body once
+the handler has produced it; drip sends chunk bytes every interval_ms.
+
+The configuration is replaced with configure() or through the admin API of
+the mock server (see create_app in mock_server.py).
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import random
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Iterator
+
+DISTRIBUTIONS = {
+    "fixed": ("value",),
+    "uniform": ("min", "max"),
+    "normal": ("mean", "stddev"),
+    "lognormal": ("median", "sigma"),
+    "exponential": ("mean",),
+}
+
+# Largest piece written at a time when only a bandwidth limit applies
+BANDWIDTH_CHUNK = 16384
+
+
+class FaultConfigError(ValueError):
+    pass
+
+
+def _check_rule(rule: dict) -> dict:
+    if not isinstance(rule, dict):
+        raise FaultConfigError("A rule must be an object")
+    latency = rule.get("latency")
+    if latency is not None:
+        distribution = latency.get("distribution")
+        if distribution not in DISTRIBUTIONS:
+            raise FaultConfigError("Unknown latency distribution: {0}. Use one of {1}".format(distribution, ", ".join(DISTRIBUTIONS)))
+        missing = [name for name in DISTRIBUTIONS[distribution] if name not in latency]
+        if missing:
+            raise FaultConfigError("Latency distribution {0} needs {1}".format(distribution, ", ".join(missing)))
+    for name in ("error_rate", "reset_rate"):
+        if not 0 <= rule.get(name, 0) <= 1:
+            raise FaultConfigError(name + " must be between 0 and 1")
+    if rule.get("bandwidth") is not None and rule["bandwidth"] <= 0:
+        raise FaultConfigError("bandwidth must be positive")
+    drip = rule.get("drip")
+    if drip is not None and (drip.get("chunk", 0) <= 0 or drip.get("interval_ms", -1) < 0):
+        raise FaultConfigError("drip needs a positive chunk and an interval_ms")
+    rule = dict(rule)
+    rule.setdefault("path", "*")
+    if rule.get("methods"):
+        rule["methods"] = [m.upper() for m in rule["methods"]]
+    return rule
+
+
+class FaultInjector:
+    """Thread safe holder of the fault rules, their random source and counts of the faults injected so far."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rules: list[dict] = []
+        self.seed = None
+        self._random = random.Random()
+        self.stats: Counter = Counter()
+
+    def configure(self, config: dict) -> None:
+        """Replace all rules. Raises FaultConfigError and keeps the old rules if config is invalid."""
+        rules = [_check_rule(rule) for rule in config.get("rules", [])]
+        with self._lock:
+            self.rules = rules
+            self.seed = config.get("seed")
+            self._random = random.Random(self.seed)
+            self.stats = Counter()
+
+    def clear(self) -> None:
+        self.configure({})
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"seed": self.seed, "rules": [dict(rule) for rule in self.rules], "stats": dict(self.stats)}
+
+    def decide(self, method: str, path: str) -> dict | None:
+        """
+        Pick the rule for a request and roll the dice for it. Returns None when no rule applies, otherwise
+        a dict with delay (seconds), reset and error (status or None), plus chunk and interval (seconds) when
+        the response body has to be slowed down.
+        """
+        with self._lock:
+            rule = next((r for r in self.rules
+                         if fnmatch.fnmatchcase(path, r["path"]) and (not r.get("methods") or method in r["methods"])), None)
+            if rule is None:
+                return None
+            if rule.get("count") is not None:
+                rule["count"] -= 1
+                if rule["count"] <= 0:
+                    self.rules.remove(rule)
+            decision = {"delay": self._sample(rule.get("latency")), "reset": False, "error": None}
+            if self._random.random() < rule.get("reset_rate", 0):
+                decision["reset"] = True
+            elif self._random.random() < rule.get("error_rate", 0):
+                decision["error"] = rule.get("error_status", 503)
+            if rule.get("drip"):
+                decision["chunk"] = rule["drip"]["chunk"]
+                decision["interval"] = rule["drip"]["interval_ms"] / 1000
+            elif rule.get("bandwidth"):
+                decision["chunk"] = min(BANDWIDTH_CHUNK, rule["bandwidth"])
+                decision["interval"] = decision["chunk"] / rule["bandwidth"]
+            self.stats["requests"] += 1
+            self.stats["delayed"] += 1 if decision["delay"] > 0 else 0
+            self.stats["resets"] += 1 if decision["reset"] else 0
+            self.stats["errors"] += 1 if decision["error"] else 0
+            self.stats["throttled"] += 1 if "chunk" in decision else 0
+            return decision
+
+    def _sample(self, latency: dict | None) -> float:
+        """Delay in seconds. Called with the lock held."""
+        if latency is None:
+            return 0.0
+        distribution = latency["distribution"]
+        if distribution == "fixed":
+            value = latency["value"]
+        elif distribution == "uniform":
+            value = self._random.uniform(latency["min"], latency["max"])
+        elif distribution == "normal":
+            value = self._random.gauss(latency["mean"], latency["stddev"])
+        elif distribution == "lognormal":
+            value = self._random.lognormvariate(0, latency["sigma"]) * latency["median"]
+        else:
+            value = self._random.expovariate(1 / latency["mean"]) if latency["mean"] > 0 else 0
+        return max(value, 0) / 1000
+
+
+def throttle(body: Iterable[bytes], chunk: int, interval: float) -> Iterator[bytes]:
+    """Re-chunk a response body into pieces of chunk bytes with interval seconds between them"""
+    first = True
+    for data in body:
+        if isinstance(data, str):
+            data = data.encode()
+        for start in range(0, len(data), chunk):
+            if not first:
+                time.sleep(interval)
+            first = False
+            yield data[start:start + chunk]
@@ -0,0 +1,204 @@
+"""
+tests/mock_http.py — threaded HTTP/1.1 server for the mock Drove API.
+
+Werkzeug's development server spends more time parsing and writing than the
+mock's views take to run, and without threads a slow request holds up every
+other client. ThreadedServer is a small WSGI server built for load: every
+connection gets its own thread, connections are kept alive between requests,
+the listen backlog is large enough for thousands of clients connecting at once
+and small responses go out in a single write.
+
+It implements what the CLI and tests need from HTTP/1.1 (keep-alive,
+Content-Length and chunked bodies in both directions) and nothing more.
+"""
+
+from __future__ import annotations
+
+import io
+import socket
+import sys
+import threading
+from urllib.parse import unquote_to_bytes
+
+# Longest request or header line accepted
+MAX_LINE = 65536
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _read_body(rfile, headers: dict) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = io.BytesIO()
+        while True:
+            size = int(rfile.readline(MAX_LINE).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the blank line ending the body
+                while rfile.readline(MAX_LINE) not in (b"\r\n", b"\n", b""):
+                    pass
+                return body.getvalue()
+            body.write(rfile.read(size))
+            rfile.readline(MAX_LINE)
+    length = int(headers.get("content-length", 0) or 0)
+    return rfile.read(length) if length > 0 else b""
+
+
+class ThreadedServer:
+    def __init__(self, host: str, port: int, app, backlog: int = 4096):
+        self.app = app
+        self.socket = socket.create_server((host, port), backlog=backlog)
+        # accept() wakes up regularly so shutdown() does not have to wait for a client
+        self.socket.settimeout(0.2)
+        self.host, self.port = self.socket.getsockname()[:2]
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._connections: set = set()
+
+    def serve_forever(self):
+        while not self._stopping.is_set():
+            try:
+                connection, address = self.socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            connection.setblocking(True)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._connections.add(connection)
+            threading.Thread(target=self._serve_connection, args=(connection, address),
+                             name="MockConnection", daemon=True).start()
+
+    def shutdown(self):
+        self._stopping.set()
+        self.socket.close()
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _serve_connection(self, connection: socket.socket, address: tuple):
+        rfile = connection.makefile("rb", 65536)
+        try:
+            keep_alive = True
+            while keep_alive and not self._stopping.is_set():
+                line = rfile.readline(MAX_LINE)
+                if not line:
+                    break
+                if line in (b"\r\n", b"\n"):
+                    continue
+                try:
+                    keep_alive = self._serve_request(connection, rfile, line, address)
+                except BadRequest as e:
+                    self._send_error(connection, 400, str(e))
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+            rfile.close()
+            connection.close()
+
+    def _serve_request(self, connection: socket.socket, rfile, line: bytes, address: tuple) -> bool:
+        """Answer one request. Returns whether the connection can be used for another one."""
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise BadRequest("Malformed request line")
+        headers: dict = {}
+        while True:
+            header = rfile.readline(MAX_LINE)
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, separator, value = header.decode("latin-1").partition(":")
+            if not separator:
+                raise BadRequest("Malformed header")
+            name = name.strip().lower()
+            headers[name] = headers[name] + "," + value.strip() if name in headers else value.strip()
+        try:
+            body = _read_body(rfile, headers)
+        except ValueError:
+            raise BadRequest("Malformed chunked body")
+
+        path, _, query = target.partition("?")
+        environ = {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote_to_bytes(path).decode("latin-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": version,
+            "REMOTE_ADDR": address[0],
+            "REMOTE_PORT": str(address[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            # Same key as werkzeug, the fault injection uses it to drop connections
+            "werkzeug.socket": connection,
+        }
+        for name, value in headers.items():
+            if name == "content-type":
+                environ["CONTENT_TYPE"] = value
+            elif name == "content-length":
+                environ["CONTENT_LENGTH"] = value
+            else:
+                environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started["status"] = status
+            started["headers"] = response_headers
+            return lambda data: None
+
+        result = self.app(environ, start_response)
+        try:
+            status = started["status"]
+            response_headers = list(started["headers"])
+            names = {name.lower() for name, _ in response_headers}
+            code = int(status.split()[0])
+            bodyless = method == "HEAD" or code in (204, 304) or code < 200
+            chunked = "content-length" not in names and not bodyless
+            if chunked and version != "HTTP/1.1":
+                chunked = False
+                keep_alive = False
+            if chunked:
+                response_headers.append(("Transfer-Encoding", "chunked"))
+            if not keep_alive:
+                response_headers.append(("Connection", "close"))
+            head = "{version} {status}\r\n{headers}\r\n".format(
+                version="HTTP/1.1", status=status,
+                headers="".join("{0}: {1}\r\n".format(name, value) for name, value in response_headers)).encode("latin-1")
+            for data in result:
+                if not data or bodyless:
+                    continue
+                if chunked:
+                    data = b"%x\r\n%s\r\n" % (len(data), data)
+                if head:
+                    # Headers and the first part of the body go out in one write
+                    data = head + data
+                    head = b""
+                connection.sendall(data)
+            connection.sendall(head + (b"0\r\n\r\n" if chunked else b""))
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return keep_alive
+
+    def _send_error(self, connection: socket.socket, code: int, message: str):
+        body = message.encode()
+        connection.sendall("HTTP/1.1 {code} {reason}\r\nContent-Type: text/plain\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n"
+                           .format(code=code, reason=REASONS.get(code, ""), length=len(body)).encode("latin-1") + body)
@@ -52,17 +52,42 @@ POST /apis/v1/tasks/operations
 GET  /apis/v1/logfiles/<prefix>/<domain>/<obj_id>/list
 GET  /apis/v1/logfiles/<prefix>/<domain>/<obj_id>/read/<name>
 GET  /apis/v1/logfiles/<prefix>/<domain>/<obj_id>/download/<name>
+
+Backends
+────────
+MockDroveServer(backend="werkzeug") runs the app on werkzeug's single threaded
+development server. backend="threaded" uses the keep-alive, thread per
+connection server from tests/mock_http.py, for tests and benchmarks that make
+many concurrent calls. Views run one at a time under DroveState.lock, so
+concurrent mutations are safe with either backend.
+
+Admin API (not part of Drove; not counted in request_counts and never faulted)
+──────────────────────────────────────────────────────────────────────────────
+GET    /_mock/faults       current fault rules and counts of injected faults
+PUT    /_mock/faults       replace the fault rules (see tests/mock_faults.py)
+DELETE /_mock/faults       remove all fault rules
+GET    /_mock/leader       current leader and remaining election time
+POST   /_mock/leader       {"leader": "host:port", "election_ms": 500, "followers_refuse": true}
+                           change the leader; API calls fail with 503 until the election is
+                           over, and with followers_refuse calls sent to any other host:port
+                           than the leader are refused like a follower controller would
 """
 
 from __future__ import annotations
 
+import bisect
 import copy
 import json
 import threading
 import time
+from collections import Counter
 from typing import Any
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
+
+from mock_faults import FaultConfigError, FaultInjector, throttle
+
+BACKENDS = ("werkzeug", "threaded")
 
 # ---------------------------------------------------------------------------
 # Seed data — these mirror what the live tests expect to find pre-existing
@@ -298,12 +323,51 @@ class DroveState:
     """Mutable in-memory state for the mock server."""
 
     def __init__(self):
+        # Held by every API view while it runs, tests can take it to change state while the server is busy
+        self.lock = threading.RLock()
         self.apps: dict[str, dict] = copy.deepcopy(_APP_SEED)
         self.local_services: dict[str, dict] = copy.deepcopy(_LS_SEED)
         self.tasks: dict[str, dict] = copy.deepcopy(_TASK_SEED)  # key: f"{src}/{tid}"
         self.executor_list_entry: dict = copy.deepcopy(_EXECUTOR_LIST_ENTRY)
         self.executor_info: dict = copy.deepcopy(_EXECUTOR_INFO_SEED)
+        # Detail views for executors beyond the seeded one, same shape as _EXECUTOR_INFO_SEED
+        self.other_executors: list[dict] = []
+        # Endpoints served in addition to those derived from app exposure specs
+        self.other_endpoints: list[dict] = []
         self.maintenance: bool = False
+        self.leader: str = "controller-1:10000"
+        # Number of requests served per path, so tests can assert on call counts
+        self.request_counts: Counter = Counter()
+        # Cluster events, in time order. Tests append dicts with id, type, time and metadata
+        self.events: list[dict] = []
+        # Log file contents by file name. Files not listed here get the canned mock log responses
+        self.logs: dict[str, str] = {}
+        # Largest chunk returned by one log read call
+        self.log_read_size: int = 65536
+        # Latency, errors and dropped connections injected into API calls
+        self.faults: FaultInjector = FaultInjector()
+        # No controller is leader until time.monotonic() reaches this, API calls fail meanwhile
+        self.election_until: float = 0.0
+        # Refuse API calls sent to any other host:port than the leader, as followers do
+        self.followers_refuse: bool = False
+
+    def load(self, cluster) -> None:
+        """Replace apps, services, tasks, executors, events and logs with a generated cluster (see tests/datagen.py)."""
+        self.apps = cluster.apps
+        self.local_services = cluster.local_services
+        self.tasks = cluster.tasks
+        self.executor_info = cluster.executors[0]
+        self.executor_list_entry = executor_list_entry(cluster.executors[0])
+        self.other_executors = cluster.executors[1:]
+        self.events = cluster.events
+        self.logs = dict(cluster.logs)
+
+    def change_leader(self, leader: str, election_ms: int = 0, followers_refuse: bool | None = None) -> None:
+        """Make leader the new leader after an election lasting election_ms"""
+        self.leader = leader
+        self.election_until = time.monotonic() + election_ms / 1000
+        if followers_refuse is not None:
+            self.followers_refuse = followers_refuse
 
     # ------------------------------------------------------------------
     # App helpers
@@ -396,7 +460,7 @@ class DroveState:
     def get_ls(self, svc_id: str) -> dict | None:
         return self.local_services.get(svc_id)
 
-    def create_ls(self, spec: dict) -> str:
+    def create_ls(self, spec: dict, instances_per_host: int = 1) -> str:
         name = spec.get("name", "UNKNOWN")
         version = spec.get("version", "1")
         svc_id = f"{name}-{version}"
@@ -410,7 +474,7 @@ class DroveState:
                 "activationState": "INACTIVE",
                 "totalCPUs": 0,
                 "totalMemory": 0,
-                "instancesPerHost": 1,
+                "instancesPerHost": instances_per_host,
                 "requiredInstances": 0,
                 "healthyInstances": 0,
                 "totalInstances": 0,
@@ -532,6 +596,24 @@ class DroveState:
             self.tasks[key]["state"] = "STOPPED"
 
 
+def executor_list_entry(info: dict) -> dict:
+    """Build the executor list view entry for an executor detail view."""
+    cpus = info["state"]["cpus"]
+    memory = info["state"]["memory"]
+    return {
+        "executorId": info["state"]["executorId"],
+        "hostname": info["hostname"],
+        "port": info["port"],
+        "transportType": info["transportType"],
+        "state": info["executorState"],
+        "tags": info["tags"],
+        "freeCores": sum(len(cores) for cores in cpus["freeCores"].values()),
+        "usedCores": sum(len(cores) for cores in cpus["usedCores"].values()),
+        "freeMemory": sum(memory["freeMemory"].values()),
+        "usedMemory": sum(memory["usedMemory"].values()),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Flask application factory
 # ---------------------------------------------------------------------------
@@ -558,6 +640,63 @@ def create_app(state: DroveState | None = None) -> Flask:
     def err(message: str, code: int = 400):
         return jsonify({"status": "ERROR", "message": message}), code
 
+    @app.before_request
+    def count_request():
+        if request.path.startswith("/_mock/"):
+            return None
+        with state.lock:
+            state.request_counts[request.path] += 1
+        if time.monotonic() < state.election_until:
+            return err("No leader elected", 503)
+        if (state.followers_refuse and request.host != state.leader
+                and request.path not in ("/apis/v1/ping", "/apis/v1/cluster")):
+            return err("Controller {0} is not the leader, leader is {1}".format(request.host, state.leader), 503)
+        decision = state.faults.decide(request.method, request.path)
+        if decision is None:
+            return None
+        if decision["delay"] > 0:
+            time.sleep(decision["delay"])
+        if decision["reset"]:
+            # Close the connection without answering, the client sees it drop mid request
+            import socket
+            request.environ["werkzeug.socket"].shutdown(socket.SHUT_RDWR)
+            return "", 500
+        g.fault = decision
+        if decision["error"]:
+            return err("Injected failure", decision["error"])
+        return None
+
+    @app.after_request
+    def slow_down(response):
+        decision = g.pop("fault", None)
+        if decision is None or "chunk" not in decision:
+            return response
+        body = response.response if response.is_streamed else [response.get_data()]
+        response.response = throttle(body, decision["chunk"], decision["interval"])
+        return response
+
+    # ------------------------------------------------------------------ admin
+    @app.route("/_mock/faults", methods=["GET", "PUT", "DELETE"])
+    def mock_faults():
+        if request.method == "PUT":
+            try:
+                state.faults.configure(request.get_json(force=True) or {})
+            except (FaultConfigError, AttributeError, TypeError) as e:
+                return err("Invalid fault configuration: {0}".format(e))
+        elif request.method == "DELETE":
+            state.faults.clear()
+        return ok(state.faults.as_dict())
+
+    @app.route("/_mock/leader", methods=["GET", "POST"])
+    def mock_leader():
+        if request.method == "POST":
+            body = request.get_json(force=True) or {}
+            if not body.get("leader"):
+                return err("leader is required")
+            state.change_leader(body["leader"], body.get("election_ms", 0), body.get("followers_refuse"))
+        return ok({"leader": state.leader, "followers_refuse": state.followers_refuse,
+                   "election_remaining_ms": max(state.election_until - time.monotonic(), 0) * 1000})
+
     # ------------------------------------------------------------------ ping
     @app.route("/apis/v1/ping")
     def ping():
@@ -570,17 +709,22 @@ def create_app(state: DroveState | None = None) -> Flask:
             1 for a in state.apps.values()
             if a["summary"].get("state") == "RUNNING"
         )
+        executors = [state.executor_list_entry] + [executor_list_entry(info) for info in state.other_executors]
+        free_cores = sum(e["freeCores"] for e in executors)
+        used_cores = sum(e["usedCores"] for e in executors)
+        free_memory = sum(e["freeMemory"] for e in executors)
+        used_memory = sum(e["usedMemory"] for e in executors)
         data = {
             "state": "NORMAL" if not state.maintenance else "MAINTENANCE",
             # leader must be a plain string (show_leader does: print("Cluster leader: " + data["leader"]))
-            "leader": "controller-1:10000",
-            "freeCores": 8,
-            "usedCores": 2,
-            "freeMemory": 2048,
-            "usedMemory": 512,
-            "totalCores": 10,
-            "totalMemory": 2560,
-            "numExecutors": 1,
+            "leader": state.leader,
+            "freeCores": free_cores,
+            "usedCores": used_cores,
+            "freeMemory": free_memory,
+            "usedMemory": used_memory,
+            "totalCores": free_cores + used_cores,
+            "totalMemory": free_memory + used_memory,
+            "numExecutors": len(executors),
             # show_summary uses both numActiveApplications and numApplications
             "numApplications": len(state.apps),
             "numActiveApplications": num_active,
@@ -591,17 +735,22 @@ def create_app(state: DroveState | None = None) -> Flask:
     @app.route("/apis/v1/cluster/executors")
     def executor_list():
         # Returns a list; each entry has executorId at top level (not "id")
-        return ok([state.executor_list_entry])
+        return ok([state.executor_list_entry] + [executor_list_entry(info) for info in state.other_executors])
 
     @app.route("/apis/v1/cluster/executors/<exec_id>")
     def executor_info(exec_id: str):
-        if exec_id != state.executor_info["state"]["executorId"]:
-            return err(f"Executor {exec_id} not found", 404)
-        return ok(state.executor_info)
+        for info in [state.executor_info] + state.other_executors:
+            if exec_id == info["state"]["executorId"]:
+                return ok(info)
+        return err(f"Executor {exec_id} not found", 404)
 
     @app.route("/apis/v1/cluster/events")
     def cluster_events():
-        return ok([])
+        # lastSyncTime is inclusive here, so clients must cope with events repeated across pages
+        last_sync_time = int(request.args.get("lastSyncTime", 0))
+        size = int(request.args.get("size", 1024))
+        start = bisect.bisect_left(state.events, last_sync_time, key=lambda e: e["time"])
+        return ok(state.events[start:start + size])
 
     @app.route("/apis/v1/endpoints")
     def endpoints():
@@ -617,7 +766,12 @@ def create_app(state: DroveState | None = None) -> Flask:
                         "vhost": vhost,
                         "portName": exposure.get("portName", "main"),
                         "appId": spec.get("name", ""),
+                        "tags": [],
+                        "hosts": [{"host": inst.get("hostname"), "port": 32000 + i, "portType": "HTTP"}
+                                  for i, inst in enumerate(app_data.get("instances", []))
+                                  if inst.get("state") == "HEALTHY"],
                     })
+        result.extend(e for e in state.other_endpoints if not vhost_filter or vhost_filter in e["vhost"])
         return ok(result)
 
     @app.route("/apis/v1/cluster/maintenance/set", methods=["POST"])
@@ -799,7 +953,7 @@ def create_app(state: DroveState | None = None) -> Flask:
 
         if op_type == "CREATE":
             spec = body.get("spec", {})
-            svc_id = state.create_ls(spec)
+            svc_id = state.create_ls(spec, body.get("instancesPerHost", 1))
             return ok({"serviceId": svc_id})
 
         elif op_type == "ACTIVATE":
@@ -898,6 +1052,11 @@ def create_app(state: DroveState | None = None) -> Flask:
     @app.route("/apis/v1/logfiles/<prefix>/<domain>/<obj_id>/read/<name>")
     def logfiles_read(prefix: str, domain: str, obj_id: str, name: str):
         offset = request.args.get("offset", 0)
+        if name in state.logs:
+            # Behaves as if the whole file was written after tailing started: offset -1 (end of file) is 0
+            start = max(int(offset), 0)
+            data = state.logs[name][start:start + state.log_read_size]
+            return jsonify({"data": data, "offset": start, "length": len(data)})
         return jsonify({
             "data": f"[mock log] {name} offset={offset}\n",
             "offset": int(offset) + 30,
@@ -907,12 +1066,28 @@ def create_app(state: DroveState | None = None) -> Flask:
     @app.route("/apis/v1/logfiles/<prefix>/<domain>/<obj_id>/download/<name>")
     def logfiles_download(prefix: str, domain: str, obj_id: str, name: str):
         from flask import Response
+        if name in state.logs:
+            content = state.logs[name]
+            return Response((content[i:i + 65536] for i in range(0, len(content), 65536)), mimetype="text/plain")
         content = f"[mock log download] {name}\nLine 1\nLine 2\n"
         return Response(content, mimetype="text/plain")
 
+    # Injected latency and throttled bodies stay outside the lock, so they only slow down their own request
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != "static" and not endpoint.startswith("mock_"):
+            app.view_functions[endpoint] = _locked(state, view)
+
     return app
 
 
+def _locked(state: DroveState, view):
+    # state.lock is looked up per call because reset() replaces it
+    def locked_view(**kwargs):
+        with state.lock:
+            return view(**kwargs)
+    return locked_view
+
+
 # ---------------------------------------------------------------------------
 # Server runner (used by the pytest fixture)
 # ---------------------------------------------------------------------------
@@ -920,7 +1095,10 @@ def create_app(state: DroveState | None = None) -> Flask:
 class MockDroveServer:
     """Wraps a Flask app running in a background daemon thread."""
 
-    def __init__(self):
+    def __init__(self, backend: str = "werkzeug"):
+        if backend not in BACKENDS:
+            raise ValueError("Unknown mock server backend: " + backend)
+        self.backend = backend
         self.state = DroveState()
         self._app = create_app(self.state)
         self._server = None
@@ -932,6 +1110,14 @@ class MockDroveServer:
         import socket
         from werkzeug.serving import make_server
 
+        if self.backend == "threaded":
+            from mock_http import ThreadedServer
+            self._server = ThreadedServer(self.host, 0, self._app)
+            self.port = self._server.port
+            self._thread = threading.Thread(target=self._server.serve_forever, name="MockDroveServer", daemon=True)
+            self._thread.start()
+            return
+
         # Find a free ephemeral port: bind to port 0, record the assigned port,
         # then close the socket so Werkzeug can bind to it by port number.
         # (Passing fd= to make_server is unreliable — it fails silently when the
@@ -0,0 +1,75 @@
+"""
+tests/test_offline_api.py — offline tests for the droveapi python package.
+
+These run in-process against the mock server instead of through the CLI.
+
+Run with:  pytest -m offline tests/test_offline_api.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture
+def api(offline_env):
+    import droveapi
+    return droveapi.connect(offline_env.endpoint)
+
+
+class TestOfflineApiModels:
+    def test_lazy_list_builds_models_on_access(self):
+        from droveapi import Application, LazyList
+        built = []
+
+        def factory(raw):
+            built.append(raw)
+            return Application.from_json(raw)
+
+        items = LazyList([{"id": "A-1"}, {"id": "B-1"}], factory)
+        assert len(items) == 2
+        assert built == []
+        assert items[1].app_id == "B-1"
+        assert len(built) == 1
+
+    def test_models_use_slots(self):
+        from droveapi import Application
+        app = Application.from_json({"id": "A-1"})
+        assert not hasattr(app, "__dict__")
+
+    def test_instance_cpus_count_all_cores(self):
+        from droveapi import Instance
+        instance = Instance.from_json({"instanceId": "I-1", "serviceId": "S-1",
+                                       "resources": [{"type": "CPU", "cores": {"0": [1, 2], "1": [5]}},
+                                                     {"type": "MEMORY", "memoryInMB": {"0": 128, "1": 64}}]})
+        assert instance.app_id == "S-1"
+        assert instance.cpus == 3
+        assert instance.numa_nodes == 2
+        assert instance.memory == 192
+
+
+class TestOfflineApiResources:
+    def test_apps_list(self, api):
+        apps = {app.app_id: app for app in api.apps.list()}
+        assert apps["TEST_APP-1"].name == "TEST_APP"
+        assert apps["TEST_APP-1"].healthy_instances == 1
+
+    def test_app_instances(self, api):
+        instances = api.apps.instances("TEST_APP-1")
+        assert [instance.instance_id for instance in instances] == ["AI-test-app-inst-001"]
+        assert instances[0].hostname == "exec-host-1"
+
+    def test_apps_scale(self, api):
+        api.apps.scale("TEST_APP_DEV-1", 2)
+        assert api.apps.get("TEST_APP_DEV-1").required_instances == 2
+
+    def test_executor_detail(self, api):
+        from mock_server import EXECUTOR_ID
+        executor = api.executors.get(EXECUTOR_ID)
+        assert executor.executor_id == EXECUTOR_ID
+        assert executor.free_cores == 8
+        assert [task.task_id for task in executor.tasks] == ["T0012"]
+        assert [e.executor_id for e in api.executors.list()] == [EXECUTOR_ID]
+
+    def test_localservices_list(self, api):
+        services = [service.service_id for service in api.localservices.list()]
+        assert "TEST_LOCAL_SERVICE-1" in services
@@ -0,0 +1,140 @@
+"""
+tests/test_offline_apply.py — offline tests for ``drove apply``.
+
+A directory of app, local service and task specs is planned against the mock
+cluster and applied. Specs that match the cluster must not lead to any
+operation, and once their digests are cached not even to a spec fetch.
+
+Run with:  pytest -m offline tests/test_offline_apply.py
+"""
+import copy
+import json
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture
+def specs(offline_env, tmp_path, monkeypatch):
+    """A spec directory with the seeded TEST_APP-1 unchanged, a new app, a new local service and a new task"""
+    from conftest import TESTS_DIR
+    offline_env.reset()
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    directory = tmp_path / "specs"
+    (directory / "apps").mkdir(parents=True)
+    existing = copy.deepcopy(offline_env.state.apps["TEST_APP-1"]["spec"])
+    write(directory / "apps" / "test_app.json", {"instances": 1, "spec": existing})
+    new_app = json.loads((TESTS_DIR.parent / "sample" / "test_app.json").read_text())
+    new_app["name"] = "NEW_APP"
+    write(directory / "apps" / "new_app.json", {"instances": 2, "spec": new_app})
+    service = json.loads((TESTS_DIR.parent / "sample" / "test_service.json").read_text())
+    service["name"] = "NEW_SERVICE"
+    write(directory / "new_service.json", {"instancesPerHost": 2, "spec": service})
+    write(directory / "task.json", json.loads((TESTS_DIR.parent / "sample" / "test_task.json").read_text()))
+    yield directory
+    offline_env.reset()
+
+
+def write(path, data):
+    path.write_text(json.dumps(data, indent=2))
+
+
+def plan_lines(stdout: str) -> dict:
+    """Change per id from the plan table"""
+    rows = [line.split() for line in stdout.splitlines() if line.startswith(("app ", "localservice ", "task "))]
+    return {row[1]: row[2] for row in rows}
+
+
+class TestOfflineApply:
+    def test_dry_run_submits_nothing(self, offline_env, specs):
+        from conftest import drove_ok
+        offline_env.state.request_counts.clear()
+        out = drove_ok("apply", "-f", str(specs), "--dry-run", "--all")
+        assert plan_lines(out) == {"TEST_APP-1": "UNCHANGED", "NEW_APP-1": "CREATE", "NEW_SERVICE-1": "CREATE", "TEST_APP/T0012": "CREATE"}
+        assert "Plan: 3 to create, 0 to scale, 1 unchanged, 0 conflicts" in out
+        assert "NEW_APP-1" not in offline_env.state.apps
+        assert not any(path.endswith("/operations") for path in offline_env.state.request_counts)
+
+    def test_apply_and_reapply(self, offline_env, specs):
+        from conftest import drove_ok
+        out = drove_ok("apply", "-f", str(specs))
+        assert "Plan: 3 to create" in out and "FAILED" not in out, out
+        assert offline_env.state.apps["NEW_APP-1"]["summary"]["requiredInstances"] == 2
+        assert offline_env.state.local_services["NEW_SERVICE-1"]["spec"]["name"] == "NEW_SERVICE"
+        assert offline_env.state.get_task("TEST_APP", "T0012") is not None
+
+        offline_env.state.request_counts.clear()
+        out = drove_ok("apply", "-f", str(specs))
+        assert "Plan: 0 to create, 0 to scale, 4 unchanged, 0 conflicts" in out, out
+        # Only specs created by the first run are fetched, TEST_APP-1's digest was cached then
+        counts = offline_env.state.request_counts
+        assert sorted(path for path in counts if path.endswith("/spec")) == [
+            "/apis/v1/applications/NEW_APP-1/spec", "/apis/v1/localservices/NEW_SERVICE-1/spec"]
+
+        offline_env.state.request_counts.clear()
+        assert "4 unchanged" in drove_ok("apply", "-f", str(specs))
+        assert not any(path.endswith("/spec") or path.endswith("/operations") for path in counts), dict(counts)
+
+    def test_no_cache_fetches_specs(self, offline_env, specs):
+        from conftest import drove_ok
+        drove_ok("apply", "-f", str(specs / "apps"))
+        offline_env.state.request_counts.clear()
+        assert "2 unchanged" in drove_ok("apply", "-f", str(specs / "apps"), "--no-cache")
+        assert offline_env.state.request_counts["/apis/v1/applications/TEST_APP-1/spec"] == 1
+
+    def test_scale_and_conflict(self, offline_env, specs):
+        from conftest import drove
+        document = json.loads((specs / "apps" / "test_app.json").read_text())
+        document["instances"] = 3
+        write(specs / "apps" / "test_app.json", document)
+        result = drove("apply", "-f", str(specs / "apps" / "test_app.json"))
+        assert plan_lines(result.stdout) == {"TEST_APP-1": "SCALE"}, result.stdout
+        assert offline_env.state.apps["TEST_APP-1"]["summary"]["requiredInstances"] == 3
+
+        document["spec"]["env"] = {"CHANGED": "yes"}
+        write(specs / "apps" / "test_app.json", document)
+        result = drove("apply", "-f", str(specs / "apps" / "test_app.json"), check=False)
+        assert plan_lines(result.stdout) == {"TEST_APP-1": "CONFLICT"}, result.stdout
+        assert result.returncode == 1 and "1 conflicts" in result.stderr
+        assert "env" not in offline_env.state.apps["TEST_APP-1"]["spec"]
+
+    def test_fields_defaulted_by_the_cluster(self, offline_env, specs):
+        from conftest import drove_ok
+        deployed = offline_env.state.apps["TEST_APP-1"]["spec"]
+        deployed["logging"] = {"type": "LOCAL", "maxSize": "10m"}
+        deployed["executable"]["dockerPullTimeout"] = "100 seconds"
+        out = drove_ok("apply", "-f", str(specs / "apps" / "test_app.json"), "--all", "--no-cache")
+        assert plan_lines(out) == {"TEST_APP-1": "UNCHANGED"}, out
+
+    def test_duplicate_ids(self, offline_env, specs):
+        from conftest import drove
+        (specs / "copy.json").write_text((specs / "apps" / "new_app.json").read_text())
+        result = drove("apply", "-f", str(specs), check=False)
+        assert result.returncode == 1
+        assert result.stdout.startswith("Error: NEW_APP-1 is in both"), result.stdout
+
+
+class TestOfflineApplyLoad:
+    def test_null_fields_do_not_change_the_digest(self, tmp_path):
+        from droveapi import apply
+        write(tmp_path / "a.json", {"name": "A", "version": "1", "type": "SERVICE", "tags": {"x": None}})
+        write(tmp_path / "b.json", {"name": "B", "version": "1", "type": "SERVICE", "tags": {}})
+        first, second = apply.load([str(tmp_path)])
+        assert (first.key, first.kind, first.size) == ("A-1", "app", None)
+        assert apply.normalise({"tags": {"x": None}}) == {"tags": {}}
+        assert first.spec_hash != second.spec_hash
+        second.spec["name"] = "A"
+        assert apply.digest(apply.normalise(second.spec)) == first.spec_hash
+
+    def test_project_keeps_fields_in_the_file(self):
+        from droveapi import apply
+        deployed = {"name": "A", "logging": {"type": "LOCAL"}, "ports": [{"port": 80, "type": "HTTP"}]}
+        assert apply.project(deployed, {"name": "A", "ports": [{"port": 80}]}) == {"name": "A", "ports": [{"port": 80}]}
+        assert apply.project(deployed, {"name": "A", "missing": 1}) == {"name": "A"}
+
+    def test_missing_fields(self, tmp_path):
+        from droveapi import apply
+        write(tmp_path / "bad.json", {"spec": {"type": "SERVICE"}})
+        with pytest.raises(apply.ApplyError, match="bad.json has no 'name'"):
+            apply.load([str(tmp_path)])
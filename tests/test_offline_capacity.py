@@ -0,0 +1,137 @@
+"""
+tests/test_offline_capacity.py — offline tests for ``cluster capacity``.
+
+Run with:  pytest -m offline tests/test_offline_capacity.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Four free cores, but split across two NUMA nodes
+FRAGMENTED_EXECUTOR = {
+    "hostname": "exec-host-2",
+    "port": 12000,
+    "transportType": "HTTP",
+    "executorState": "ACTIVE",
+    "blacklisted": False,
+    "tags": ["gpu"],
+    "updated": 1700000010000,
+    "state": {
+        "executorId": "exec-fragmented",
+        "cpus": {
+            "freeCores": {"0": [2, 3], "1": [6, 7]},
+            "usedCores": {"0": [0, 1], "1": [4, 5]},
+        },
+        "memory": {
+            "freeMemory": {"0": 2048, "1": 2048},
+            "usedMemory": {"0": 512, "1": 512},
+        },
+    },
+    "instances": [],
+    "tasks": [],
+    "serviceInstances": [],
+}
+
+
+@pytest.fixture
+def cluster(offline_env, monkeypatch):
+    monkeypatch.setattr(offline_env.state, "other_executors", [FRAGMENTED_EXECUTOR])
+    return offline_env
+
+
+class TestOfflineCapacityModel:
+    def _capacity(self, raw):
+        from droveapi import Executor
+        from droveapi.capacity import ExecutorCapacity
+        return ExecutorCapacity.from_executor(Executor.from_json(raw))
+
+    def test_cores_on_different_nodes_are_not_combined(self):
+        from droveapi.capacity import Shape
+        executor = self._capacity(FRAGMENTED_EXECUTOR)
+        assert executor.free_cores == 4
+        assert executor.placeable(Shape(3, 512)) == 0
+        assert executor.stranded_cores(Shape(3, 512)) == 4
+        assert executor.placeable(Shape(2, 512)) == 2
+        assert executor.fragmentation() == 0.5
+
+    def test_memory_limits_placement(self):
+        from droveapi.capacity import Shape
+        executor = self._capacity(FRAGMENTED_EXECUTOR)
+        assert executor.placeable(Shape(1, 1024)) == 4
+        assert executor.placeable(Shape(1, 2048)) == 2
+
+    def test_shape_from_spec(self):
+        from droveapi.capacity import Shape
+        spec = {"resources": [{"type": "CPU", "count": 2}, {"type": "MEMORY", "sizeInMB": 256}]}
+        assert Shape.from_spec(spec) == Shape(2, 256)
+
+
+class TestOfflineCapacityCommand:
+    def test_capacity_for_shape(self, cluster):
+        from conftest import drove_ok
+        out = drove_ok("cluster", "capacity", "--cpus", "3", "--memory", "512")
+        assert "Placeable Instances" in out
+        summary = {line.split()[0]: line.split()[-1] for line in out.splitlines() if line.startswith(("Placeable", "Stranded"))}
+        assert summary == {"Placeable": "2", "Stranded": "6"}, f"Unexpected output: {out}"
+        assert "exec-fragmented" in out and "0:2 1:2" in out
+        assert "gpu" in out and "(untagged)" in out
+
+    def test_capacity_for_app(self, cluster):
+        from conftest import drove_ok
+        out = drove_ok("cluster", "capacity", "--app", "TEST_APP-1")
+        assert "1 cores, 128 MB memory" in out
+        placeable = [line for line in out.splitlines() if line.startswith("Placeable Instances")][0]
+        assert placeable.split()[-1] == "12", f"Unexpected output: {out}"
+
+
+def make_executor(executor_id, tags=(), free_cores=None, free_memory=4096):
+    from droveapi.capacity import ExecutorCapacity, NumaNode, core_mask
+    free_cores = free_cores if free_cores is not None else {"0": range(8)}
+    nodes = [NumaNode(node_id, core_mask(cores), 0, free_memory, 0) for node_id, cores in free_cores.items()]
+    return ExecutorCapacity(executor_id, executor_id + ".host", list(tags), True, nodes)
+
+
+class TestOfflinePlacementSimulation:
+    def test_one_per_host_counts_existing_instances(self):
+        from droveapi.capacity import Shape, simulate_placement
+        executors = [make_executor("e1"), make_executor("e2"), make_executor("e3")]
+        placement = simulate_placement(executors, Shape(1, 128), 3, {"type": "ONE_PER_HOST"}, {"e1": 1})
+        assert placement.allocations == {"e2": 1, "e3": 1}
+        assert placement.unplaced == 1
+
+    def test_tagged_executors_need_matching_tag(self):
+        from droveapi.capacity import Shape, simulate_placement
+        executors = [make_executor("plain"), make_executor("gpu", tags=["gpu"])]
+        any_policy = simulate_placement(executors, Shape(1, 128), 100, {"type": "ANY"})
+        assert set(any_policy.allocations) == {"plain"}
+        tagged = simulate_placement(executors, Shape(1, 128), 100, {"type": "MATCH_TAG", "tag": "gpu"})
+        assert set(tagged.allocations) == {"gpu"}
+
+    def test_composite_and(self):
+        from droveapi.capacity import Shape, simulate_placement
+        executors = [make_executor("g1", tags=["gpu"]), make_executor("g2", tags=["gpu"]), make_executor("plain")]
+        policy = {"type": "COMPOSITE", "combiner": "AND",
+                  "policies": [{"type": "MATCH_TAG", "tag": "gpu"}, {"type": "MAX_N_PER_HOST", "maxCount": 2}]}
+        placement = simulate_placement(executors, Shape(1, 128), 10, policy)
+        assert placement.allocations == {"g1": 2, "g2": 2}
+
+    def test_tightest_node_is_filled_first(self):
+        from droveapi.capacity import Shape, simulate_placement
+        executors = [make_executor("big", free_cores={"0": range(16)}), make_executor("small", free_cores={"0": range(2)})]
+        placement = simulate_placement(executors, Shape(2, 128), 1)
+        assert placement.allocations == {"small": 1}
+
+    def test_thousand_executors_simulate_quickly(self):
+        import time
+        from droveapi.capacity import Shape, simulate_placement
+        executors = [make_executor(f"e{i}", free_cores={"0": range(12), "1": range(12, 24)}) for i in range(1000)]
+        start = time.perf_counter()
+        placement = simulate_placement(executors, Shape(4, 1024), 5000, {"type": "MAX_N_PER_HOST", "maxCount": 4})
+        assert time.perf_counter() - start < 1
+        assert placement.placed == 4000
+
+    def test_simulate_scale_command(self, cluster):
+        from conftest import drove_ok
+        out = drove_ok("apps", "simulate-scale", "TEST_APP-1", "20")
+        assert "cannot place 12 of the required instances" in out, f"Unexpected output: {out}"
+        assert "exec-host-1" in out and "exec-host-2" not in out
@@ -0,0 +1,82 @@
+"""
+tests/test_offline_client_cache.py — offline tests for GET coalescing and memoization
+in DroveClient.
+
+Run with:  pytest -m offline tests/test_offline_client_cache.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+APPS_PATH = "/apis/v1/applications"
+
+
+def _client(endpoint: str, cache_ttl: float = 60):
+    import droveclient
+    client = droveclient.DroveClient(cache_ttl=cache_ttl)
+    client.endpoints = [endpoint]
+    client.endpoint = endpoint
+    return client
+
+
+class TestOfflineClientCache:
+    def test_repeated_get_is_served_from_cache(self, offline_env):
+        client = _client(offline_env.endpoint)
+        before = offline_env.state.request_counts[APPS_PATH]
+        first = client.get(APPS_PATH)
+        second = client.get(APPS_PATH)
+        assert first == second and first is not second
+        assert offline_env.state.request_counts[APPS_PATH] - before == 1
+
+    def test_changing_a_result_does_not_affect_later_calls(self, offline_env):
+        client = _client(offline_env.endpoint)
+        first = client.get(APPS_PATH)
+        first["TEST_APP-1"]["state"] = "CHANGED"
+        del first["TEST_APP_DEV-1"]
+        second = client.get(APPS_PATH)
+        assert second["TEST_APP-1"]["state"] != "CHANGED" and "TEST_APP_DEV-1" in second
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: client.get("/apis/v1/cluster"), range(4)))
+        assert len({id(result) for result in results}) == 4
+
+    def test_library_clients_do_not_cache(self, offline_env):
+        import droveclient
+        client = droveclient.DroveClient()
+        client.endpoints = [offline_env.endpoint]
+        client.endpoint = offline_env.endpoint
+        before = offline_env.state.request_counts[APPS_PATH]
+        client.get(APPS_PATH)
+        client.get(APPS_PATH)
+        assert offline_env.state.request_counts[APPS_PATH] - before == 2
+
+    def test_concurrent_gets_are_coalesced(self, offline_env):
+        client = _client(offline_env.endpoint)
+        before = offline_env.state.request_counts[APPS_PATH]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: client.get(APPS_PATH), range(8)))
+        assert all("TEST_APP-1" in r for r in results)
+        assert offline_env.state.request_counts[APPS_PATH] - before == 1
+
+    def test_params_are_part_of_the_key(self, offline_env):
+        client = _client(offline_env.endpoint)
+        before = offline_env.state.request_counts["/apis/v1/tasks"]
+        client.get("/apis/v1/tasks", params={"app": "A"})
+        client.get("/apis/v1/tasks", params={"app": "B"})
+        assert offline_env.state.request_counts["/apis/v1/tasks"] - before == 2
+
+    def test_post_invalidates_cache(self, offline_env):
+        client = _client(offline_env.endpoint)
+        before = offline_env.state.request_counts[APPS_PATH]
+        client.get(APPS_PATH)
+        client.post("/apis/v1/cluster/maintenance/unset", body={})
+        client.get(APPS_PATH)
+        assert offline_env.state.request_counts[APPS_PATH] - before == 2
+
+    def test_zero_ttl_disables_cache(self, offline_env):
+        client = _client(offline_env.endpoint, cache_ttl=0)
+        before = offline_env.state.request_counts[APPS_PATH]
+        client.get(APPS_PATH)
+        client.get(APPS_PATH)
+        assert offline_env.state.request_counts[APPS_PATH] - before == 2
@@ -0,0 +1,73 @@
+"""
+tests/test_offline_datagen.py — offline tests for the large cluster generator.
+
+``tests/datagen.py`` must be deterministic, keep NUMA assignments consistent
+with executor resources, and load into the mock server so the CLI sees the
+generated cluster.
+
+Run with:  pytest -m offline tests/test_offline_datagen.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+def cores_of(instance: dict) -> dict:
+    return next(r["cores"] for r in instance["resources"] if r["type"] == "CPU")
+
+
+class TestOfflineDatagen:
+    def test_same_seed_same_cluster(self):
+        from datagen import ClusterShape, generate
+        shape = ClusterShape(apps=50, executors=10, instances=200, events=100, log_sizes={"output.log": 10000})
+        assert generate(shape) == generate(shape)
+        other = generate(ClusterShape(apps=50, executors=10, instances=200, events=100, seed=2))
+        assert list(other.apps) != list(generate(shape).apps)
+
+    def test_numa_assignments_match_executor_resources(self):
+        from datagen import ClusterShape, generate
+        shape = ClusterShape(apps=200, executors=10, instances=1000, local_services=2, tasks=50,
+                             numa_nodes=2, cores_per_node=40)
+        cluster = generate(shape)
+        for executor in cluster.executors:
+            cpus = executor["state"]["cpus"]
+            assigned = []
+            for instance in executor["instances"] + executor["serviceInstances"] + executor["tasks"]:
+                cores = cores_of(instance)
+                assert len(cores) == 1, "An instance must get all cores from one NUMA node"
+                node, node_cores = next(iter(cores.items()))
+                assert set(node_cores) <= set(cpus["usedCores"][node])
+                assigned.extend(node_cores)
+            assert len(assigned) == len(set(assigned)), "A core was given to two instances"
+            assert sorted(assigned) == sorted(c for cores in cpus["usedCores"].values() for c in cores)
+            assert sum(len(c) for c in cpus["freeCores"].values()) + len(assigned) == 80
+
+    def test_sizes_and_log_files(self):
+        from datagen import ClusterShape, generate
+        cluster = generate(ClusterShape(apps=100, executors=50, instances=300, tasks=30, events=5000,
+                                        log_sizes={"output.log": 123456, "error.log": 10}))
+        assert len(cluster.apps) == 100
+        assert sum(len(app["instances"]) for app in cluster.apps.values()) == 300
+        assert len(cluster.tasks) == 30 and len(cluster.events) == 5000
+        assert [e["time"] for e in cluster.events] == sorted(e["time"] for e in cluster.events)
+        assert {name: len(log) for name, log in cluster.logs.items()} == {"output.log": 123456, "error.log": 10}
+
+
+class TestOfflineGeneratedCluster:
+    @pytest.fixture
+    def generated(self, offline_env):
+        from datagen import ClusterShape, generate
+        cluster = generate(ClusterShape(apps=2000, executors=100, instances=6000, tasks=40))
+        offline_env.state.load(cluster)
+        yield cluster
+        offline_env.reset()
+
+    def test_cli_sees_generated_cluster(self, generated):
+        from conftest import drove_ok
+        apps = [line for line in drove_ok("apps", "list").splitlines()[2:] if line.strip()]
+        assert len(apps) == 2000
+        executors = [line for line in drove_ok("executor", "list").splitlines()[2:] if line.strip()]
+        assert len(executors) == 100
+        summary = drove_ok("cluster", "summary")
+        live = next(line for line in summary.splitlines() if "Number of live executors" in line)
+        assert live.split()[-1] == "100", summary
@@ -0,0 +1,74 @@
+"""
+tests/test_offline_endpoints.py — offline tests for endpoint lookups.
+
+``cluster endpoints`` answers from an index over the endpoint list (exact,
+prefix and wildcard vhost matching), keeps the list in a short lived cache
+file and can print compact table or jsonl output.
+
+Run with:  pytest -m offline tests/test_offline_endpoints.py
+"""
+import json
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+def endpoint(vhost: str, app: str, *ports) -> dict:
+    return {"vhost": vhost, "appId": app, "tags": [],
+            "hosts": [{"host": "exec-host-1", "port": port, "portType": "HTTP"} for port in ports]}
+
+
+@pytest.fixture
+def many_vhosts(offline_env, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(offline_env.state, "other_endpoints",
+                        [endpoint(f"svc{i:04d}.{'internal' if i % 2 else 'example.com'}", f"APP_{i}-1", 31000 + i)
+                         for i in range(2000)])
+    return offline_env
+
+
+class TestOfflineEndpointIndex:
+    def test_exact_prefix_and_wildcards(self):
+        from droveapi.endpoints import EndpointIndex
+        index = EndpointIndex([endpoint("a.example.com", "A-1", 1), endpoint("A.example.com", "A-2", 2),
+                               endpoint("b.example.com", "B-1", 3), endpoint("b.internal", "B-1", 4),
+                               endpoint("ab.internal", "AB-1", 5)])
+        assert len(index) == 5
+        # Vhosts match exactly, case included, as the plain comparison before the index did
+        assert [e["appId"] for e in index.lookup("a.example.com")] == ["A-1"]
+        assert [e["appId"] for e in index.lookup("A.example.com")] == ["A-2"]
+        assert index.lookup("B.example.com") == [] and index.matching("B.*") == [] and index.with_suffix(".INTERNAL") == []
+        assert index.matching("*.internal") == ["ab.internal", "b.internal"]
+        assert index.matching("b.*") == ["b.example.com", "b.internal"]
+        assert index.matching("?.example.com") == ["A.example.com", "a.example.com", "b.example.com"]
+        assert index.with_prefix("a") == ["a.example.com", "ab.internal"]
+        assert [e["appId"] for e in index.lookup(prefix="b", app="B-1")] == ["B-1", "B-1"]
+        assert index.lookup("missing.example.com") == []
+
+
+class TestOfflineClusterEndpointLookup:
+    def test_table_output_with_wildcard(self, many_vhosts):
+        from conftest import drove_ok
+        out = drove_ok("cluster", "endpoints", "--vhost", "svc00?1.internal", "--format", "table")
+        lines = out.splitlines()
+        assert lines[0].split() == ["VHost", "App", "Hosts"]
+        assert [line.split()[0] for line in lines[2:]] == [f"svc00{i}1.internal" for i in range(10)], out
+
+    def test_jsonl_output_with_prefix(self, many_vhosts):
+        from conftest import drove_ok
+        out = drove_ok("cluster", "endpoints", "--prefix", "svc001", "--format", "jsonl")
+        records = [json.loads(line) for line in out.splitlines()]
+        assert len(records) == 10
+        assert records[0] == {"vhost": "svc0010.example.com", "appId": "APP_10-1", "hosts": ["exec-host-1:31010"]}
+
+    def test_endpoint_list_is_cached(self, many_vhosts):
+        from conftest import drove_ok
+        drove_ok("cluster", "endpoints", "--vhost", "testapp.local", "--cache-ttl", "30")
+        before = many_vhosts.state.request_counts["/apis/v1/endpoints"]
+        out = drove_ok("cluster", "endpoints", "--vhost", "testapp.local", "--format", "table", "--cache-ttl", "30")
+        assert many_vhosts.state.request_counts["/apis/v1/endpoints"] == before
+        assert "exec-host-1:32000" in out
+        # Caching is opt in, by default the list is always fetched
+        drove_ok("cluster", "endpoints")
+        assert many_vhosts.state.request_counts["/apis/v1/endpoints"] == before + 1
@@ -0,0 +1,66 @@
+"""
+tests/test_offline_events.py — offline tests for paged event and collection iterators.
+
+The mock treats lastSyncTime as inclusive, so events at a page boundary are
+returned again on the next page and must be skipped by the client.
+
+Run with:  pytest -m offline tests/test_offline_events.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+EVENTS = [
+    {"id": "E1", "type": "APP_STATE_CHANGE", "time": 1700000000000, "metadata": {}},
+    {"id": "E2", "type": "INSTANCE_STATE_CHANGE", "time": 1700000001000, "metadata": {}},
+    {"id": "E3", "type": "APP_STATE_CHANGE", "time": 1700000001000, "metadata": {}},
+    {"id": "E4", "type": "INSTANCE_STATE_CHANGE", "time": 1700000002000, "metadata": {}},
+    {"id": "E5", "type": "APP_STATE_CHANGE", "time": 1700000002000, "metadata": {}},
+]
+
+
+@pytest.fixture
+def events(offline_env, monkeypatch):
+    monkeypatch.setattr(offline_env.state, "events", [dict(e) for e in EVENTS])
+    return offline_env
+
+
+@pytest.fixture
+def client(offline_env):
+    import droveclient
+    client = droveclient.DroveClient()
+    client.start(offline_env.endpoint)
+    return client
+
+
+class TestOfflineEventIterator:
+    def test_pages_yield_each_event_once(self, events, client):
+        ids = [e["id"] for e in client.iter_events(page_size=2)]
+        assert ids == ["E1", "E2", "E3", "E4", "E5"]
+
+    def test_type_filter(self, events, client):
+        ids = [e["id"] for e in client.iter_events(types={"APP_STATE_CHANGE"}, page_size=2)]
+        assert ids == ["E1", "E3", "E5"]
+
+    def test_since(self, events, client):
+        ids = [e["id"] for e in client.iter_events(since=1700000002000)]
+        assert ids == ["E4", "E5"]
+
+    def test_cli_events_paged(self, events):
+        from conftest import drove_ok
+        out = drove_ok("cluster", "events", "--count", "2", "--type", "INSTANCE_STATE_CHANGE")
+        lines = [line for line in out.splitlines() if line.strip()]
+        assert len(lines) == 2, f"Unexpected output: {out}"
+        assert "E2" in lines[0] and "E4" in lines[1]
+
+
+class TestOfflineCollectionIterators:
+    def test_iter_app_instances(self, offline_env, client):
+        instances = list(client.iter_app_instances(["TEST_APP-1", "TEST_APP_DEV-1"]))
+        assert [i["instanceId"] for i in instances] == ["AI-test-app-inst-001"]
+
+    def test_api_iter_tasks(self, offline_env):
+        import droveapi
+        api = droveapi.connect(offline_env.endpoint)
+        tasks = list(api.tasks.iter_tasks(app="NO_SUCH_APP"))
+        assert tasks == []
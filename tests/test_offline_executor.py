@@ -95,6 +95,13 @@ class TestOfflineExecutorTasks:
             f"Expected 'TEST_APP' in tasks output but got:\n{out}"
         )
 
+    def test_executor_tasks_cpu_column(self, offline_executor_id):
+        """The CPU column counts the NUMA nodes of the allocation, as before the typed models: 1 for cores {"0": [0, 1]}"""
+        from conftest import drove_ok
+        out = drove_ok("executor", "tasks", offline_executor_id, "--app", "TEST_APP")
+        row = [line.split() for line in out.splitlines() if line.startswith("TI-mock-task-001")][0]
+        assert row[4] == "1", out
+
     def test_executor_tasks_app_filter_shows_match(self, offline_executor_id):
         """The --app flag should show tasks matching the given source app."""
         from conftest import drove_ok
@@ -0,0 +1,56 @@
+"""
+tests/test_offline_exporter.py — offline tests for the OpenMetrics exporter.
+
+Run with:  pytest -m offline tests/test_offline_exporter.py
+"""
+import urllib.request
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+class TestOfflineExporter:
+    def test_once(self, offline_env):
+        from conftest import drove_ok
+        out = drove_ok("exporter", "--once")
+        assert 'drove_cluster_cores{type="total"}' in out
+        assert 'drove_app_instances{app_id="TEST_APP-1",name="TEST_APP",type="healthy"} 1' in out
+        assert 'drove_executor_cores{executor_id="93b6b6f3-c7c8-3824-afc9-cb6d0b32454c",hostname="exec-host-1",type="free"} 8' in out
+        assert "drove_exporter_refresh_errors_total 0" in out
+        assert out.endswith("# EOF\n")
+
+    def test_scrapes_are_served_from_cache(self, offline_env):
+        import threading
+        import droveapi
+        from droveapi import exporter
+        refresher = exporter.Refresher(droveapi.connect(offline_env.endpoint), interval=3600)
+        refresher.refresh()
+        server = exporter.serve(refresher, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            calls = sum(offline_env.state.request_counts.values())
+            url = "http://127.0.0.1:{port}/metrics".format(port=server.server_address[1])
+            for _ in range(5):
+                with urllib.request.urlopen(url) as response:
+                    assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+                    assert b"drove_cluster_executors 1" in response.read()
+            assert sum(offline_env.state.request_counts.values()) == calls
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_failed_poll_keeps_last_metrics(self, offline_env, monkeypatch):
+        import droveapi
+        from droveapi import exporter
+        api = droveapi.connect(offline_env.endpoint)
+        refresher = exporter.Refresher(api)
+        first = refresher.refresh()
+
+        def fail():
+            raise RuntimeError("controller down")
+        monkeypatch.setattr(api.cluster, "summary", fail)
+        second = refresher.refresh()
+        assert "drove_exporter_refresh_errors_total 1" in second
+        assert 'drove_cluster_cores{type="total"}' in second
+        assert first.split("# TYPE drove_exporter")[0] == second.split("# TYPE drove_exporter")[0]
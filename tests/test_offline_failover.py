@@ -0,0 +1,75 @@
+"""
+tests/test_offline_failover.py — offline tests for multi-controller endpoints.
+
+A comma separated ``--endpoint`` makes the CLI probe every controller, route
+requests to the leader and skip controllers that cannot be reached.
+
+Run with:  pytest -m offline tests/test_offline_failover.py
+"""
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Nothing listens on port 1, so connections are refused immediately
+DEAD_ENDPOINT = "http://127.0.0.1:1"
+
+
+class TestOfflineFailover:
+    def test_dead_controller_is_skipped(self, offline_env, monkeypatch):
+        from conftest import drove_ok
+        monkeypatch.setenv("DROVE_ENDPOINT", DEAD_ENDPOINT + "," + offline_env.endpoint)
+        start = time.time()
+        out = drove_ok("cluster", "ping")
+        assert "ping successful" in out.lower(), f"Unexpected output: {out}"
+        assert time.time() - start < 10, "Failover took as long as the full retry budget"
+
+    def test_leader_is_preferred(self, offline_env, monkeypatch):
+        from conftest import drove_ok
+        port = urlparse(offline_env.endpoint).port
+        follower = f"http://localhost:{port}"
+        leader = f"http://127.0.0.1:{port}"
+        monkeypatch.setattr(offline_env.state, "leader", f"127.0.0.1:{port}")
+        monkeypatch.setenv("DROVE_ENDPOINT", follower + "," + leader)
+        out = drove_ok("-d", "cluster", "ping")
+        assert f"Leader endpoint: {leader}" in out, f"Unexpected output: {out}"
+
+    def test_leader_change_is_followed(self, offline_env):
+        import droveclient
+        port = urlparse(offline_env.endpoint).port
+        first, second = f"http://127.0.0.1:{port}", f"http://localhost:{port}"
+        leader = offline_env.state.leader
+        offline_env.state.change_leader(f"127.0.0.1:{port}", followers_refuse=True)
+        try:
+            client = droveclient.DroveClient()
+            client.start(first + "," + second)
+            assert client.endpoint == first
+            # The old leader still answers, but refuses calls once it is a follower
+            offline_env.state.change_leader(f"localhost:{port}")
+            offline_env.state.request_counts.clear()
+            assert "TEST_APP-1" in client.get("/apis/v1/applications")
+            assert client.endpoint == second
+            # Refused once, no retries against the follower, then replayed on the new leader
+            assert offline_env.state.request_counts["/apis/v1/applications"] == 2
+        finally:
+            offline_env.state.change_leader(leader, followers_refuse=False)
+
+    def test_probe_session_is_closed(self, offline_env, monkeypatch):
+        import droveclient
+        import requests
+        closed = []
+        close = requests.Session.close
+        monkeypatch.setattr(requests.Session, "close", lambda session: closed.append(session) or close(session))
+        client = droveclient.DroveClient()
+        client.endpoints = [DEAD_ENDPOINT, offline_env.endpoint]
+        for _ in range(3):
+            assert client.find_leader() == offline_env.endpoint
+        assert len(closed) == 3
+
+    def test_all_controllers_down(self, offline_env, monkeypatch):
+        from conftest import drove
+        monkeypatch.setenv("DROVE_ENDPOINT", DEAD_ENDPOINT + ",http://127.0.0.1:2")
+        result = drove("cluster", "summary", check=False)
+        assert "Error connecting to endpoints" in result.stdout, f"Unexpected output: {result.stdout}"
@@ -0,0 +1,79 @@
+"""
+tests/test_offline_fanout.py — offline tests for multi-cluster fan-out.
+
+``--all-clusters`` and ``--clusters`` run a read-only command against several
+clusters from the config file at once and merge the results with a cluster
+column. A cluster that cannot be reached is reported but does not fail the
+others.
+
+Run with:  pytest -m offline tests/test_offline_fanout.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Nothing listens on port 1, so connections are refused immediately
+DEAD_ENDPOINT = "http://127.0.0.1:1"
+
+
+@pytest.fixture
+def fanout_config(offline_env, tmp_path, monkeypatch):
+    monkeypatch.delenv("DROVE_ENDPOINT", raising=False)
+    config = tmp_path / "drove.ini"
+    config.write_text(
+        f"[a]\nendpoint = {offline_env.endpoint}\n\n"
+        f"[b]\nendpoint = {offline_env.endpoint}\n\n"
+        f"[down]\nendpoint = {DEAD_ENDPOINT}\n")
+    return str(config)
+
+
+class TestOfflineFanout:
+    def test_tables_are_merged_with_cluster_column(self, fanout_config):
+        from conftest import drove
+        result = drove("-f", fanout_config, "--clusters", "a,b", "apps", "list")
+        lines = result.stdout.splitlines()
+        assert lines[0].split()[0] == "Cluster", f"Unexpected output: {result.stdout}"
+        clusters = {line.split()[0] for line in lines[2:] if line.strip()}
+        assert clusters == {"a", "b"}, f"Unexpected output: {result.stdout}"
+
+    def test_dict_tables_are_merged_with_cluster_column(self, fanout_config):
+        from conftest import drove
+        result = drove("-f", fanout_config, "--clusters", "a,b", "executor", "list")
+        lines = result.stdout.splitlines()
+        assert lines[0].split()[:3] == ["Cluster", "Executor", "ID"], f"Unexpected output: {result.stdout}"
+        clusters = {line.split()[0] for line in lines[2:] if line.strip()}
+        assert clusters == {"a", "b"}, f"Unexpected output: {result.stdout}"
+        assert "===" not in result.stdout
+
+    def test_failed_cluster_is_reported(self, fanout_config):
+        from conftest import drove
+        result = drove("-f", fanout_config, "--all-clusters", "apps", "list")
+        assert "TEST_APP" in result.stdout, f"Unexpected output: {result.stdout}"
+        report = {line.split()[0]: line.split()[1] for line in result.stderr.splitlines()[2:] if line.strip()}
+        assert report == {"a": "OK", "b": "OK", "down": "ERROR"}, f"Unexpected report: {result.stderr}"
+        assert "Latency (ms)" in result.stderr
+
+    def test_non_table_output_is_grouped_by_cluster(self, fanout_config):
+        from conftest import drove
+        result = drove("-f", fanout_config, "--clusters", "a,b", "cluster", "ping")
+        assert "=== a ===" in result.stdout and "=== b ===" in result.stdout, f"Unexpected output: {result.stdout}"
+
+    def test_write_commands_are_rejected(self, fanout_config, offline_env):
+        from conftest import drove
+        before = dict(offline_env.state.request_counts)
+        result = drove("-f", fanout_config, "--all-clusters", "apps", "scale", "TEST_APP-1", "2", check=False)
+        assert "read-only commands" in result.stdout, f"Unexpected output: {result.stdout}"
+        assert dict(offline_env.state.request_counts) == before
+
+    def test_commands_see_their_own_cluster(self, fanout_config, tmp_path, monkeypatch):
+        from conftest import drove_ok
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        drove_ok("-f", fanout_config, "--clusters", "a,b", "cluster", "endpoints", "--cache-ttl", "30")
+        cached = sorted(path.name for path in (tmp_path / "home" / ".drove-mirror" / "endpoints").iterdir())
+        assert cached == ["a.json", "b.json"]
+
+    def test_config_errors_are_reported(self, fanout_config):
+        from conftest import drove
+        result = drove("-f", fanout_config, "--clusters", "a,missing", "apps", "list")
+        report = {line.split()[0]: line for line in result.stderr.splitlines()[2:] if line.strip()}
+        assert "No cluster definition found for missing" in report["missing"], result.stderr
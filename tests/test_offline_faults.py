@@ -0,0 +1,147 @@
+"""
+tests/test_offline_faults.py — offline tests for the CLI against a slow or failing controller.
+
+The mock server injects latency, 5xx answers, dropped connections, throttled
+and dripping response bodies and leader changes (see tests/mock_faults.py).
+
+Run with:  pytest -m offline tests/test_offline_faults.py
+"""
+import json
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture(autouse=True)
+def no_faults(offline_env):
+    leader = offline_env.state.leader
+    yield
+    offline_env.state.faults.clear()
+    offline_env.state.change_leader(leader, followers_refuse=False)
+
+
+class TestOfflineInjectedFaults:
+    def test_latency(self, offline_env, tmp_path):
+        from conftest import drove
+        offline_env.state.faults.configure({"rules": [
+            {"path": "/apis/v1/applications", "latency": {"distribution": "fixed", "value": 400}}]})
+        trace_file = tmp_path / "trace.json"
+        result = drove("--trace-file", str(trace_file), "apps", "list")
+        assert "TEST_APP-1" in result.stdout
+        spans = [e for e in json.loads(trace_file.read_text())["traceEvents"]
+                 if e.get("cat") == "http" and e["args"]["path"] == "/apis/v1/applications"]
+        assert spans[0]["args"]["ttfb_ms"] >= 400
+        assert offline_env.state.faults.as_dict()["stats"]["delayed"] == 1
+
+    def test_transient_errors_are_retried(self, offline_env):
+        from conftest import drove_ok
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/applications", "error_rate": 1, "count": 2}]})
+        out = drove_ok("apps", "list")
+        assert "TEST_APP-1" in out
+        assert offline_env.state.request_counts["/apis/v1/applications"] == 3
+
+    def test_persistent_errors_are_reported(self, offline_env):
+        from conftest import drove
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/applications", "error_rate": 1, "error_status": 500}]})
+        result = drove("apps", "list", check=False)
+        assert "Injected failure" in result.stdout, result.stdout
+        assert "TEST_APP-1" not in result.stdout
+
+    def test_dropped_connection_is_retried(self, offline_env):
+        from conftest import drove_ok
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/applications", "reset_rate": 1, "count": 1}]})
+        out = drove_ok("apps", "list")
+        assert "TEST_APP-1" in out
+        assert offline_env.state.request_counts["/apis/v1/applications"] == 2
+        assert offline_env.state.faults.as_dict()["stats"]["resets"] == 1
+
+    def test_throttled_download(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        content = "".join("line {0}\n".format(i) for i in range(40000))
+        offline_env.state.logs["big.log"] = content
+        offline_env.state.faults.configure({"rules": [{"path": "*/download/*", "bandwidth": 1 << 20}]})
+        target = tmp_path / "big.log"
+        drove_ok("appinstances", "download", "TEST_APP-1", "AI-00000000-0000-0000-0000-000000000001",
+                 "big.log", "-o", str(target))
+        assert target.read_text() == content
+        assert offline_env.state.faults.as_dict()["stats"]["throttled"] == 1
+
+
+class TestOfflineFaultInjector:
+    def test_bandwidth_and_drip(self, offline_env):
+        import requests
+        offline_env.state.logs["small.log"] = "x" * 100000
+        offline_env.state.faults.configure({"rules": [
+            {"path": "*/download/*", "bandwidth": 200000},
+            {"path": "/apis/v1/ping", "drip": {"chunk": 8, "interval_ms": 50}}]})
+        start = time.monotonic()
+        response = requests.get(offline_env.endpoint + "/apis/v1/logfiles/applications/A/I/download/small.log")
+        assert len(response.content) == 100000
+        assert time.monotonic() - start >= 0.4
+        start = time.monotonic()
+        assert requests.get(offline_env.endpoint + "/apis/v1/ping").json()["data"] == "pong"
+        assert time.monotonic() - start >= 0.2
+
+    def test_seeded_decisions_repeat(self):
+        from mock_faults import FaultInjector
+        config = {"seed": 3, "rules": [{"latency": {"distribution": "normal", "mean": 5, "stddev": 10},
+                                        "error_rate": 0.3, "reset_rate": 0.1}]}
+        runs = []
+        for _ in range(2):
+            injector = FaultInjector()
+            injector.configure(config)
+            runs.append([injector.decide("GET", "/apis/v1/ping") for _ in range(200)])
+        assert runs[0] == runs[1]
+        assert all(decision["delay"] >= 0 for decision in runs[0])
+        assert any(decision["error"] for decision in runs[0]) and any(decision["reset"] for decision in runs[0])
+
+    def test_first_matching_rule_applies(self):
+        from mock_faults import FaultInjector
+        injector = FaultInjector()
+        injector.configure({"rules": [{"path": "/apis/v1/applications/*", "methods": ["post"], "error_rate": 1},
+                                      {"path": "/apis/v1/applications/*", "latency": {"distribution": "fixed", "value": 10}}]})
+        assert injector.decide("POST", "/apis/v1/applications/operations")["error"] == 503
+        assert injector.decide("GET", "/apis/v1/applications/A")["delay"] == pytest.approx(0.01)
+        assert injector.decide("GET", "/apis/v1/ping") is None
+
+    def test_admin_api(self, offline_env):
+        import requests
+        url = offline_env.endpoint + "/_mock/faults"
+        rules = {"rules": [{"path": "/apis/v1/tasks", "error_rate": 1, "error_status": 502}]}
+        assert requests.put(url, json=rules).status_code == 200
+        invalid = requests.put(url, json={"rules": [{"latency": {"distribution": "pareto"}}]})
+        assert invalid.status_code == 400 and "pareto" in invalid.json()["message"]
+        assert requests.get(offline_env.endpoint + "/apis/v1/tasks").status_code == 502
+        current = requests.get(url).json()["data"]
+        assert current["rules"][0]["path"] == "/apis/v1/tasks" and current["stats"]["errors"] == 1
+        requests.delete(url)
+        assert requests.get(offline_env.endpoint + "/apis/v1/tasks").status_code == 200
+
+
+class TestOfflineLeaderChange:
+    def test_no_leader_during_election(self, offline_env):
+        import requests
+        from conftest import drove, drove_ok
+        response = requests.post(offline_env.endpoint + "/_mock/leader", json={"leader": "controller-2:10000", "election_ms": 60000})
+        assert response.json()["data"]["election_remaining_ms"] > 0
+        result = drove("--retry-budget", "1", "cluster", "leader", check=False)
+        assert "No leader elected" in result.stdout, result.stdout
+        requests.post(offline_env.endpoint + "/_mock/leader", json={"leader": "controller-2:10000"})
+        assert "controller-2:10000" in drove_ok("cluster", "leader")
+
+    def test_followers_refuse_calls(self, offline_env, monkeypatch):
+        from conftest import drove, drove_ok
+        port = urlparse(offline_env.endpoint).port
+        follower = f"http://localhost:{port}"
+        leader = f"http://127.0.0.1:{port}"
+        offline_env.state.change_leader(f"127.0.0.1:{port}", followers_refuse=True)
+        monkeypatch.setenv("DROVE_ENDPOINT", follower)
+        result = drove("--retry-budget", "1", "apps", "list", check=False)
+        assert "is not the leader" in result.stdout, result.stdout
+        monkeypatch.setenv("DROVE_ENDPOINT", follower + "," + leader)
+        assert "TEST_APP-1" in drove_ok("apps", "list")
@@ -0,0 +1,96 @@
+"""
+tests/test_offline_find.py — offline tests for the cross-cluster search index.
+
+``drove find`` answers from a local SQLite index of every configured cluster.
+The index is built on first use, refreshed on demand with ``--refresh`` and in
+a background process once it is older than ``--max-age``.
+
+Run with:  pytest -m offline tests/test_offline_find.py
+"""
+import sqlite3
+import time
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Nothing listens on port 1, so connections are refused immediately
+DEAD_ENDPOINT = "http://127.0.0.1:1"
+
+
+@pytest.fixture
+def find_env(offline_env, tmp_path, monkeypatch):
+    monkeypatch.delenv("DROVE_ENDPOINT", raising=False)
+    config = tmp_path / "drove.ini"
+    config.write_text(
+        f"[a]\nendpoint = {offline_env.endpoint}\n\n"
+        f"[b]\nendpoint = {offline_env.endpoint}\n\n"
+        f"[down]\nendpoint = {DEAD_ENDPOINT}\n")
+    return ["-f", str(config), "find", "--db", str(tmp_path / "index.db")]
+
+
+def rows(out: str) -> list:
+    return [line.split() for line in out.splitlines()[2:] if line.strip()]
+
+
+class TestOfflineFind:
+    def test_first_search_builds_index(self, find_env):
+        from conftest import drove
+        result = drove(*find_env, "testapp.local")
+        assert {(row[0], row[1], row[4]) for row in rows(result.stdout)} == {("a", "app", "vhost"), ("b", "app", "vhost")}, result.stdout
+        report = {line.split()[0]: line.split()[1] for line in result.stderr.splitlines()[2:] if line.strip()}
+        assert report == {"a": "OK", "b": "OK", "down": "ERROR"}, f"Unexpected report: {result.stderr}"
+
+    def test_search_uses_index_only(self, find_env, offline_env):
+        from conftest import drove_ok
+        drove_ok(*find_env, "--refresh")
+        before = sum(offline_env.state.request_counts.values())
+        out = drove_ok(*find_env, "perf-test-server", "--field", "image")
+        assert sum(offline_env.state.request_counts.values()) == before
+        assert all(row[4] == "image" for row in rows(out)) and len(rows(out)) > 0, out
+
+    def test_wildcards_and_kind_filter(self, find_env):
+        from conftest import drove_ok
+        out = drove_ok(*find_env, "TEST_APP*", "--kind", "app", "--field", "id")
+        ids = {row[2] for row in rows(out)}
+        assert ids and all(i.startswith("TEST_APP") for i in ids), out
+        assert rows(drove_ok(*find_env, "EST_APP?", "--field", "id")) == [], "Wildcards should match the whole value"
+
+    def test_stale_index_refreshes_in_background(self, find_env):
+        from conftest import drove
+        db = find_env[find_env.index("--db") + 1]
+        drove(*find_env, "--refresh")
+        before = dict(sqlite3.connect(db).execute("SELECT cluster, refreshed FROM clusters WHERE cluster = 'a'"))
+        time.sleep(1.1)
+        result = drove(*find_env, "TEST_APP", "--max-age", "1")
+        assert "refreshing in the background" in result.stderr, result.stderr
+        assert "TEST_APP" in result.stdout
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            after = dict(sqlite3.connect(db).execute("SELECT cluster, refreshed FROM clusters WHERE cluster = 'a'"))
+            if after["a"] > before["a"]:
+                break
+            time.sleep(0.2)
+        assert after["a"] > before["a"], "Background refresh did not update the index"
+
+    def test_index_per_config_file(self, tmp_path, monkeypatch):
+        from plugins.find import default_index_path
+        monkeypatch.setenv("HOME", str(tmp_path))
+        assert default_index_path() == str(tmp_path / ".drove-mirror" / "find-index.db")
+        first, second = default_index_path(str(tmp_path / "a.ini")), default_index_path(str(tmp_path / "b.ini"))
+        assert first != second and first == default_index_path(str(tmp_path / "a.ini"))
+
+    def test_background_refresh_command(self, find_env, tmp_path):
+        import subprocess
+        import sys
+        from types import SimpleNamespace
+        from plugins.find import refresh_command
+        db = find_env[find_env.index("--db") + 1]
+        options = SimpleNamespace(file=find_env[1], insecure=False, parallelism=2)
+        command, env = refresh_command(options, db)
+        assert command[:3] == [sys.executable, "-m", "drove"] and sys.argv[0] not in command
+        # Runs from any directory, whatever started the parent process
+        result = subprocess.run(command, env=env, cwd=str(tmp_path), capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        refreshed = dict(sqlite3.connect(db).execute("SELECT cluster, refreshed FROM clusters"))
+        assert refreshed["a"] and refreshed["b"]
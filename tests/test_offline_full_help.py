@@ -6,7 +6,7 @@ and every sub-command parser in a single pass.  It must:
 
 * Exit with code 0.
 * Require no live cluster (works without DROVE_ENDPOINT / ~/.drove).
-* Print exactly 80 ``=``-separator sections (1 root + 79 command/sub-command
+* Print exactly 92 ``=``-separator sections (1 root + 91 command/sub-command
   parsers).
 * Cover every top-level plugin group and representative sub-commands.
 
@@ -25,21 +25,28 @@ pytestmark = pytest.mark.offline
 # ── constants ────────────────────────────────────────────────────────────────
 
 SEPARATOR = "=" * 72
-EXPECTED_SECTIONS = 80          # 1 root + 9 plugin groups + ~70 sub-commands
-MIN_EXPECTED_LINES = 975        # lower bound (argparse wrapping varies by Python version)
-MAX_EXPECTED_LINES = 1000       # upper bound
+EXPECTED_SECTIONS = 92          # 1 root + 16 plugin groups + ~70 sub-commands
+MIN_EXPECTED_LINES = 1230       # lower bound (argparse wrapping varies by Python version)
+MAX_EXPECTED_LINES = 1260       # upper bound
 
 # All top-level plugin groups that must appear in the output
 TOP_LEVEL_GROUPS = [
     "appinstances",
+    "apply",
     "apps",
     "cluster",
     "config",
     "describe",
     "executor",
+    "exporter",
+    "find",
     "localservices",
     "lsinstances",
+    "mirror",
+    "query",
+    "snapshot",
     "tasks",
+    "top",
 ]
 
 # A representative sub-command from each group (group, subcommand)
@@ -61,8 +68,10 @@ SUBCOMMAND_SAMPLES = [
     ("apps", "spec"),
     ("apps", "summary"),
     ("apps", "cancelop"),
+    ("apps", "simulate-scale"),
     ("cluster", "ping"),
     ("cluster", "summary"),
+    ("cluster", "capacity"),
     ("describe", "app"),
     ("describe", "cluster"),
     ("describe", "executor"),
@@ -0,0 +1,84 @@
+"""
+tests/test_offline_mirror.py — offline tests for ``mirror sync`` and ``query``.
+
+Run with:  pytest -m offline tests/test_offline_mirror.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+def written(out: str, table: str) -> int:
+    line = [l for l in out.splitlines() if l.split() and l.split()[0] == table][0]
+    return int(line.split()[1])
+
+
+class TestOfflineMirror:
+    def test_sync_and_query(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        db = str(tmp_path / "mirror.db")
+        out = drove_ok("mirror", "sync", "--db", db)
+        assert "Mirror updated: " + db in out
+        out = drove_ok("query", "--db", db,
+                       "SELECT i.instance_id, a.image FROM instances i JOIN apps a USING (app_id) "
+                       "WHERE i.executor_id = '93b6b6f3-c7c8-3824-afc9-cb6d0b32454c' AND i.state = 'HEALTHY'")
+        assert "AI-test-app-inst-001" in out
+        assert "ghcr.io/appform-io/perf-test-server-httplib" in out
+
+    def test_unchanged_rows_are_skipped(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        db = str(tmp_path / "mirror.db")
+        first = drove_ok("mirror", "sync", "--db", db)
+        assert written(first, "apps") >= 2
+        second = drove_ok("mirror", "sync", "--db", db)
+        assert written(second, "apps") == 0
+        assert written(second, "instances") == 0
+        drove_ok("apps", "scale", "TEST_APP_DEV-1", "1")
+        third = drove_ok("mirror", "sync", "--db", db)
+        assert written(third, "apps") == 1
+        assert written(third, "instances") == 1
+
+    def test_query_is_read_only(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        db = str(tmp_path / "mirror.db")
+        drove_ok("mirror", "sync", "--db", db)
+        out = drove_ok("query", "--db", db, "DELETE FROM apps")
+        assert "Query error" in out and "readonly" in out
+        assert "TEST_APP-1" in drove_ok("query", "--db", db, "SELECT app_id FROM apps")
+
+    def test_query_without_mirror(self, tmp_path):
+        from conftest import drove_ok
+        out = drove_ok("query", "--db", str(tmp_path / "missing.db"), "SELECT 1")
+        assert "No mirror found" in out
+
+    def test_instance_counts_refresh_without_updated(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        db = str(tmp_path / "mirror.db")
+        drove_ok("mirror", "sync", "--db", db)
+        summary = offline_env.state.apps["TEST_APP-1"]["summary"]
+        healthy = summary["healthyInstances"]
+        summary["healthyInstances"] = healthy + 5
+        try:
+            out = drove_ok("mirror", "sync", "--db", db)
+            assert written(out, "apps") == 1
+            assert str(healthy + 5) in drove_ok("query", "--db", db, "SELECT healthy_instances FROM apps WHERE app_id = 'TEST_APP-1'")
+        finally:
+            summary["healthyInstances"] = healthy
+        # The spec was not fetched again, it is kept from the first sync
+        assert "perf-test-server" in drove_ok("query", "--db", db, "SELECT image FROM apps WHERE app_id = 'TEST_APP-1'")
+
+
+class TestOfflineMirrorPath:
+    def test_current_cluster_from_config(self, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+        from plugins.mirror import default_db_path
+        monkeypatch.setenv("HOME", str(tmp_path))
+        config = tmp_path / "drove.conf"
+        config.write_text("[DEFAULT]\ncurrent_cluster = stage\n\n[stage]\nendpoint = http://stage:8080\n\n"
+                          "[prod]\nendpoint = http://prod:8080\n")
+        options = SimpleNamespace(cluster=None, endpoint=None, file=str(config))
+        assert default_db_path(options) == str(tmp_path / ".drove-mirror" / "stage.db")
+        options.cluster = "prod"
+        assert default_db_path(options) == str(tmp_path / ".drove-mirror" / "prod.db")
+        options.endpoint = "http://localhost:9000,http://localhost:9001"
+        assert default_db_path(options) == str(tmp_path / ".drove-mirror" / "localhost_9000.db")
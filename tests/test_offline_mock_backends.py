@@ -0,0 +1,97 @@
+"""
+tests/test_offline_mock_backends.py — offline tests for the mock server backends.
+
+Every test runs against both the werkzeug and the threaded backend of the mock
+server (see tests/mock_http.py), which must serve the same routes and keep
+DroveState consistent under concurrent calls.
+
+Run with:  pytest -m offline tests/test_offline_mock_backends.py
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytestmark = [
+    pytest.mark.offline,
+    pytest.mark.parametrize("mock_drove_server", ["werkzeug", "threaded"], indirect=True),
+]
+
+
+def threaded_only(server):
+    if server.backend != "threaded":
+        pytest.skip("werkzeug's development server answers one request at a time")
+
+
+class TestOfflineMockBackends:
+    def test_cli_commands(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        assert "TEST_APP-1" in drove_ok("apps", "list")
+        assert "TEST_LOCAL_SERVICE-1" in drove_ok("localservices", "list")
+        content = "".join("line {0}\n".format(i) for i in range(20000))
+        offline_env.state.logs["big.log"] = content
+        target = tmp_path / "big.log"
+        drove_ok("appinstances", "download", "TEST_APP-1", "AI-00000000-0000-0000-0000-000000000001",
+                 "big.log", "-o", str(target))
+        assert target.read_text() == content
+
+    def test_post_body_and_errors(self, offline_env):
+        import requests
+        response = requests.post(offline_env.endpoint + "/apis/v1/applications/operations",
+                                 json={"type": "SCALE", "appId": "NO_SUCH_APP", "requiredInstances": 1})
+        assert response.status_code == 404 and "NO_SUCH_APP" in response.json()["message"]
+        assert requests.get(offline_env.endpoint + "/apis/v1/no/such/route").status_code == 404
+
+    def test_concurrent_mutations(self, offline_env):
+        import requests
+        before = len(offline_env.state.apps["TEST_APP-1"]["instances"])
+        offline_env.state.request_counts.clear()
+
+        def start_instance(_):
+            return requests.post(offline_env.endpoint + "/apis/v1/applications/operations",
+                                 json={"type": "START_INSTANCES", "appId": "TEST_APP-1", "instances": 1}).status_code
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            assert set(pool.map(start_instance, range(40))) == {200}
+        assert len(offline_env.state.apps["TEST_APP-1"]["instances"]) == before + 40
+        assert offline_env.state.request_counts["/apis/v1/applications/operations"] == 40
+
+    def test_many_clients(self, offline_env):
+        import requests
+        threaded_only(offline_env)
+        offline_env.state.request_counts.clear()
+
+        def client(_):
+            with requests.Session() as session:
+                return [session.get(offline_env.endpoint + "/apis/v1/applications").status_code for _ in range(5)]
+
+        with ThreadPoolExecutor(max_workers=200) as pool:
+            statuses = [status for result in pool.map(client, range(200)) for status in result]
+        assert statuses == [200] * 1000
+        assert offline_env.state.request_counts["/apis/v1/applications"] == 1000
+
+    def test_slow_request_does_not_hold_up_others(self, offline_env):
+        import requests
+        threaded_only(offline_env)
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/tasks", "latency": {"distribution": "fixed", "value": 2000}}]})
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                slow = pool.submit(requests.get, offline_env.endpoint + "/apis/v1/tasks")
+                time.sleep(0.1)
+                start = time.monotonic()
+                for _ in range(10):
+                    assert requests.get(offline_env.endpoint + "/apis/v1/ping").status_code == 200
+                assert time.monotonic() - start < 1.5
+                assert slow.result().status_code == 200
+        finally:
+            offline_env.state.faults.clear()
+
+    def test_dropped_connection_is_retried(self, offline_env):
+        from conftest import drove_ok
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/applications", "reset_rate": 1, "count": 1}]})
+        try:
+            assert "TEST_APP-1" in drove_ok("apps", "list")
+        finally:
+            offline_env.state.faults.clear()
+        assert offline_env.state.request_counts["/apis/v1/applications"] == 2
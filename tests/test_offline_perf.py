@@ -0,0 +1,95 @@
+"""
+tests/test_offline_perf.py — performance budgets for CLI commands.
+
+Each command in ``tests/perf_budgets.json`` runs in process against a
+generated cluster. It fails when it makes more HTTP calls than its budget
+allows, takes longer than its time budget, or its peak traced Python memory
+is above its memory budget. Request counts are exact, so a command that starts
+making extra calls fails even when it stays fast.
+
+Pass ``--perf-report FILE`` to write the measurements, which is the easiest way
+to update the budgets after an intended change.
+
+Run with:  pytest -m perf
+"""
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+pytestmark = [pytest.mark.offline, pytest.mark.perf]
+
+BUDGETS_FILE = Path(__file__).parent / "perf_budgets.json"
+BUDGETS = json.loads(BUDGETS_FILE.read_text())
+
+
+@pytest.fixture(scope="module")
+def perf_cluster(offline_env, tmp_path_factory):
+    """Generated cluster loaded into the mock, and the ids commands in the budgets file refer to"""
+    from datagen import ClusterShape, generate
+    cluster = generate(ClusterShape(apps=200, executors=80, instances=2000, local_services=3, tasks=50, events=5000))
+    offline_env.state.load(cluster)
+    app_id, app = next((app_id, app) for app_id, app in cluster.apps.items() if app["instances"])
+    task = next(iter(cluster.tasks.values()))
+    with pytest.MonkeyPatch.context() as patch:
+        # Commands that keep caches under the home directory must not find them from an earlier run
+        patch.setenv("HOME", str(tmp_path_factory.mktemp("home")))
+        yield {
+            "app": app_id,
+            "instance": app["instances"][0]["instanceId"],
+            "service": next(iter(cluster.local_services)),
+            "executor": cluster.executors[0]["state"]["executorId"],
+            "task_app": task["sourceAppName"],
+            "task": task["taskId"],
+        }
+    offline_env.reset()
+
+
+@pytest.fixture(scope="module")
+def perf_report(request):
+    results = {}
+    yield results
+    path = request.config.getoption("--perf-report")
+    if path:
+        with open(path, "w") as stream:
+            json.dump(results, stream, indent=2, sort_keys=True)
+
+
+def measure(state, args: list) -> dict:
+    """Run once to warm up, once for time and request count and once under tracemalloc for memory"""
+    from conftest import _base_args, run_inprocess
+    args = _base_args() + args
+    run_inprocess(args)
+    state.request_counts.clear()
+    start = time.perf_counter()
+    result = run_inprocess(args)
+    seconds = time.perf_counter() - start
+    counts = dict(state.request_counts)
+    tracemalloc.start()
+    try:
+        run_inprocess(args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"result": result, "requests": sum(counts.values()), "calls": counts,
+            "seconds": seconds, "memory_kb": peak // 1024}
+
+
+@pytest.mark.parametrize("command", sorted(BUDGETS))
+def test_command_within_budget(command, offline_env, perf_cluster, perf_report, record_property):
+    budget = BUDGETS[command]
+    measured = measure(offline_env.state, [arg.format(**perf_cluster) for arg in budget["argv"]])
+    result = measured.pop("result")
+    assert result.returncode == 0 and not result.stdout.startswith("Error"), result.stdout + result.stderr
+    perf_report[command] = {key: measured[key] for key in ("requests", "calls", "seconds", "memory_kb")}
+    for key in ("requests", "seconds", "memory_kb"):
+        record_property(key, measured[key])
+
+    assert measured["requests"] <= budget["requests"], \
+        "{0} made {1} requests, the budget is {2}: {3}".format(command, measured["requests"], budget["requests"], measured["calls"])
+    assert measured["seconds"] <= budget["seconds"], \
+        "{0} took {1:.3f}s, the budget is {2}s".format(command, measured["seconds"], budget["seconds"])
+    assert measured["memory_kb"] <= budget["memory_kb"], \
+        "{0} peaked at {1} KB of traced memory, the budget is {2} KB".format(command, measured["memory_kb"], budget["memory_kb"])
@@ -0,0 +1,119 @@
+"""
+tests/test_offline_retries.py — offline tests for the retry budget and circuit breaker.
+
+Run with:  pytest -m offline tests/test_offline_retries.py
+"""
+import time
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Nothing listens on port 1, so connections are refused immediately
+DEAD_ENDPOINT = "http://127.0.0.1:1"
+
+
+class TestOfflineRetryBudget:
+    def test_exhausted_budget_is_reported(self, offline_env, monkeypatch):
+        from conftest import drove
+        monkeypatch.setenv("DROVE_ENDPOINT", DEAD_ENDPOINT)
+        start = time.time()
+        result = drove("--retry-budget", "0", "apps", "list", check=False)
+        assert "retry budget of 0 seconds exhausted" in result.stdout, f"Unexpected output: {result.stdout}"
+        assert time.time() - start < 10
+
+    def test_budget_does_not_affect_healthy_calls(self, offline_env):
+        from conftest import drove_ok
+        out = drove_ok("--retry-budget", "1", "apps", "list")
+        assert "TEST_APP-1" in out
+
+    def test_client_older_than_budget_still_retries(self, offline_env):
+        import droveclient
+        client = droveclient.DroveClient()
+        client.configure_retries(droveclient.RetryPolicy(budget=0.5, backoff_factor=0.01))
+        client.endpoints = [offline_env.endpoint]
+        client.endpoint = offline_env.endpoint
+        time.sleep(0.6)
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/ping", "error_rate": 1, "count": 2}]})
+        try:
+            assert client.get("/apis/v1/ping") == "pong"
+        finally:
+            offline_env.state.faults.clear()
+        assert offline_env.state.request_counts["/apis/v1/ping"] == 3
+
+    def test_retry_time_is_charged_to_the_budget(self, offline_env):
+        import droveclient
+        policy = droveclient.RetryPolicy(budget=0.3, retries=50, backoff_factor=0.05, backoff_max=0.1)
+        client = droveclient.DroveClient()
+        client.configure_retries(policy)
+        client.endpoints = [offline_env.endpoint]
+        client.endpoint = offline_env.endpoint
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/ping", "error_rate": 1}]})
+        try:
+            start = time.monotonic()
+            with pytest.raises(droveclient.DroveException):
+                client.get("/apis/v1/ping")
+            assert time.monotonic() - start < 3
+        finally:
+            offline_env.state.faults.clear()
+        assert policy.exhausted() and offline_env.state.request_counts["/apis/v1/ping"] < 50
+        # The budget covers every call of a command, a successful call does not refill it
+        assert client.get("/apis/v1/ping") == "pong"
+        assert policy.exhausted()
+        client.invalidate()
+        offline_env.state.request_counts.clear()
+        offline_env.state.faults.configure({"rules": [{"path": "/apis/v1/ping", "error_rate": 1, "count": 1}]})
+        try:
+            with pytest.raises(droveclient.DroveException):
+                client.get("/apis/v1/ping")
+        finally:
+            offline_env.state.faults.clear()
+        assert offline_env.state.request_counts["/apis/v1/ping"] == 1
+        # Long running commands start every cycle with the whole budget
+        policy.reset()
+        assert policy.remaining() == pytest.approx(0.3)
+
+    def test_exporter_polls_reset_the_budget(self, offline_env):
+        import droveapi
+        import droveclient
+        from droveapi import exporter
+        client = droveclient.DroveClient()
+        client.endpoints = [offline_env.endpoint]
+        client.endpoint = offline_env.endpoint
+        client.policy.spend(client.policy.budget)
+        assert exporter.Refresher(droveapi.DroveAPI(client)).refresh() is not None
+        assert client.policy.remaining() == client.policy.budget
+
+
+class TestOfflineCircuitBreaker:
+    def test_breaker_opens_after_consecutive_failures(self):
+        import droveclient
+        client = droveclient.DroveClient()
+        client.configure_retries(droveclient.RetryPolicy(retries=0, breaker_threshold=2))
+        client.endpoints = [DEAD_ENDPOINT]
+        client.endpoint = DEAD_ENDPOINT
+        for _ in range(2):
+            with pytest.raises(droveclient.DroveException, match="Error connecting"):
+                client.get("/apis/v1/ping")
+        with pytest.raises(droveclient.DroveException, match="Circuit breaker open after 2 consecutive failed calls"):
+            client.get("/apis/v1/ping")
+
+    def test_breaker_resets_on_success(self, offline_env):
+        import droveclient
+        client = droveclient.DroveClient()
+        client.configure_retries(droveclient.RetryPolicy(retries=0, breaker_threshold=2))
+        client.endpoints = [offline_env.endpoint]
+        client.endpoint = offline_env.endpoint
+        client.breaker.record_failure()
+        assert client.get("/apis/v1/ping") == "pong"
+        assert client.breaker.failures == 0
+
+    def test_concurrent_updates(self):
+        import droveclient
+        from concurrent.futures import ThreadPoolExecutor
+        breaker = droveclient.CircuitBreaker(threshold=10 ** 9, cooldown=30)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: [breaker.record_failure() for _ in range(1000)], range(16)))
+        assert breaker.failures == 16000
@@ -0,0 +1,72 @@
+"""
+tests/test_offline_snapshot.py — offline tests for ``snapshot save`` and ``snapshot diff``.
+
+Run with:  pytest -m offline tests/test_offline_snapshot.py
+"""
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+def make_snapshot(apps=None, executors=None):
+    from droveapi import snapshot
+    sections = {name: {} for name in snapshot.SECTIONS}
+    sections["apps"] = apps or {}
+    sections["executors"] = executors or {}
+    built = {name: snapshot.build_section(sections[name]) for name in snapshot.SECTIONS}
+    return {"version": snapshot.FORMAT_VERSION, "endpoint": "",
+            "hash": snapshot.digest([built[name]["hash"] for name in snapshot.SECTIONS]), "sections": built}
+
+
+def make_app(spec_version="1", instances=None):
+    from droveapi import snapshot
+    spec = {"name": "A", "version": spec_version}
+    return {"summary": {"state": "RUNNING"}, "spec": spec, "specHash": snapshot.digest(spec), "instances": instances or {}}
+
+
+class TestOfflineSnapshotDiff:
+    def test_identical_snapshots_short_circuit(self):
+        from droveapi import snapshot
+        assert snapshot.diff(make_snapshot(), make_snapshot()).identical
+
+    def test_spec_change_and_instance_movement(self):
+        from droveapi import snapshot
+        old = make_snapshot(apps={"A-1": make_app("1", {"I1": {"executorId": "E1", "state": "HEALTHY"}})})
+        new = make_snapshot(apps={"A-1": make_app("2", {"I1": {"executorId": "E2", "state": "HEALTHY"},
+                                                         "I2": {"executorId": "E2", "state": "HEALTHY"}})})
+        result = snapshot.diff(old, new)
+        assert [(c.section, c.key, c.change) for c in result.changes] == [("apps", "A-1", "CHANGED")]
+        details = result.changes[0].details
+        assert "spec " in details and "instances +1 -0" in details and "I1 moved E1 -> E2" in details
+
+    def test_capacity_delta(self):
+        from droveapi import snapshot
+        old = make_snapshot(executors={"E1": {"hostname": "h1", "usedCores": 2, "usedMemory": 512}})
+        new = make_snapshot(executors={"E1": {"hostname": "h1", "usedCores": 6, "usedMemory": 1024},
+                                       "E2": {"hostname": "h2", "usedCores": 0, "usedMemory": 0}})
+        result = snapshot.diff(old, new)
+        assert [(d.executor_id, d.used_cores, d.used_memory) for d in result.capacity] == [("E1", 4, 512)]
+        assert ("executors", "E2", "ADDED") in [(c.section, c.key, c.change) for c in result.changes]
+
+
+class TestOfflineSnapshotCommand:
+    def test_save_and_diff(self, offline_env, tmp_path):
+        from conftest import drove_ok
+        before = str(tmp_path / "before.json.gz")
+        after = str(tmp_path / "after.json.gz")
+        out = drove_ok("snapshot", "save", "-o", before)
+        assert "Snapshot saved to " + before in out
+        assert drove_ok("snapshot", "diff", before, before).strip() == "Snapshots are identical"
+        drove_ok("apps", "scale", "TEST_APP_DEV-1", "2")
+        drove_ok("snapshot", "save", "-o", after)
+        out = drove_ok("snapshot", "diff", before, after)
+        line = [l for l in out.splitlines() if "TEST_APP_DEV-1" in l]
+        assert line and "CHANGED" in line[0] and "instances +2 -0" in line[0], f"Unexpected output: {out}"
+
+    def test_diff_does_not_need_cluster(self, tmp_path, monkeypatch):
+        from conftest import drove_ok
+        from droveapi import snapshot
+        path = str(tmp_path / "empty.json.gz")
+        snapshot.save(make_snapshot(), path)
+        monkeypatch.setenv("DROVE_ENDPOINT", "http://127.0.0.1:1")
+        assert "identical" in drove_ok("snapshot", "diff", path, path)
@@ -0,0 +1,86 @@
+"""
+tests/test_offline_startup.py — startup time and import cost of the CLI.
+
+Commands that never talk to a cluster must not pay for the HTTP stack, the
+table renderer or the retry library, so ``drove --help`` and
+``drove config current-cluster`` are checked for the modules they import and
+against a wall time budget. ``--startup-report`` prints the same numbers for
+any command.
+
+Run with:  pytest -m offline tests/test_offline_startup.py
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+# Median wall time in seconds of a fresh `drove --help` or `drove config current-cluster`.
+# About 0.2s on a laptop; it was 0.55s while everything was imported up front.
+STARTUP_BUDGET = 1.0
+
+# Packages only commands that need them may import
+DEFERRED = {"requests", "urllib3", "tabulate", "tenacity", "shtab", "ssl", "http", "sqlite3", "cProfile", "tracemalloc"}
+
+COMMANDS = [["--help"], ["config", "current-cluster"]]
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+def imported_packages(*args) -> set:
+    from drovetrace import parse_import_times
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], capture_output=True, text=True, timeout=30)
+    return {module.split(".")[0] for module, _, _ in parse_import_times(result.stderr)}
+
+
+@pytest.mark.subprocess
+class TestOfflineStartupBudget:
+    @pytest.mark.parametrize("command", COMMANDS, ids=" ".join)
+    def test_heavy_modules_are_deferred(self, home, command):
+        from conftest import TESTS_DIR
+        # Whatever the interpreter imports on its own (site hooks, for one) is not ours to defer
+        interpreter = imported_packages("-c", "pass")
+        imported = imported_packages(str(TESTS_DIR.parent / "drove.py"), *command)
+        assert "drovecli" in imported
+        assert not (imported - interpreter) & DEFERRED, sorted((imported - interpreter) & DEFERRED)
+
+    @pytest.mark.parametrize("command", COMMANDS, ids=" ".join)
+    def test_within_budget(self, home, command):
+        from conftest import TESTS_DIR
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(TESTS_DIR.parent / "drove.py"), *command], capture_output=True, timeout=30)
+            times.append(time.perf_counter() - start)
+        assert statistics.median(times) <= STARTUP_BUDGET, \
+            "{0} took {1:.3f}s, the budget is {2}s".format(" ".join(command), statistics.median(times), STARTUP_BUDGET)
+
+
+class TestOfflineStartupReport:
+    def test_report(self, offline_env):
+        from conftest import drove
+        result = drove("--startup-report", "--profile-top", "5", "apps", "list")
+        assert "TEST_APP-1" in result.stdout
+        phases = {line.rsplit(None, 1)[0] for line in result.stderr.splitlines() if line.strip()}
+        assert {"interpreter start", "import", "parser", "first request", "wall"} <= phases, result.stderr
+        assert "Import self time (ms)" in result.stderr and "total (" in result.stderr
+        assert "import time:" not in result.stderr
+
+    def test_import_times_are_aggregated_per_package(self):
+        from drovetrace import import_costs, parse_import_times
+        imports = parse_import_times("\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     urllib3.util",
+            "import time:       250 |        350 |   urllib3",
+            "import time:      1000 |       1400 | requests",
+            "Some other line",
+        ]))
+        assert imports == [("urllib3.util", 100, 100), ("urllib3", 250, 350), ("requests", 1000, 1400)]
+        assert list(import_costs(imports).items()) == [("requests", 1000), ("urllib3", 350)]
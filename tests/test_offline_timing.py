@@ -0,0 +1,81 @@
+"""
+tests/test_offline_timing.py — offline tests for ``--timing`` and ``--trace-file``.
+
+``--timing`` prints per request and per phase timings to stderr, and
+``--trace-file`` writes the same spans as a Chrome trace.
+
+Run with:  pytest -m offline tests/test_offline_timing.py
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+class TestOfflineTiming:
+    # The import phase is only recorded by a fresh process
+    @pytest.mark.subprocess
+    def test_timing_summary(self, offline_env):
+        from conftest import drove
+        result = drove("--timing", "apps", "list")
+        assert "TEST_APP" in result.stdout
+        assert "Connect (ms)" in result.stderr and "TTFB (ms)" in result.stderr, result.stderr
+        assert "/apis/v1/applications" in result.stderr
+        phases = {line.split()[0] for line in result.stderr.splitlines() if line.strip()}
+        assert {"import", "parser", "config", "connect", "command", "decode", "render", "wall"} <= phases, result.stderr
+
+    def test_no_timing_by_default(self, offline_env):
+        from conftest import drove
+        result = drove("apps", "list")
+        assert "TTFB" not in result.stderr and "Phase" not in result.stderr
+
+    def test_chrome_trace(self, offline_env, tmp_path):
+        from conftest import drove
+        trace_file = tmp_path / "trace.json"
+        drove("--trace-file", str(trace_file), "apps", "summary", "TEST_APP-1")
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        requests = [e for e in events if e.get("cat") == "http"]
+        assert {e["args"]["path"] for e in requests} >= {"/apis/v1/ping", "/apis/v1/applications/TEST_APP-1"}
+        for event in requests:
+            assert event["ph"] == "X" and event["dur"] > 0
+            assert event["args"]["status"] == 200 and event["args"]["bytes"] > 0
+        assert any(e["name"] == "command" for e in events)
+
+    def test_library_use_records_nothing(self, offline_env):
+        from conftest import TESTS_DIR
+        script = ("import sys, drove, droveapi, drovetrace; api = droveapi.connect(sys.argv[1]); "
+                  "[api.apps.list() for _ in range(20)]; print(len(drovetrace.TRACER.spans))")
+        result = subprocess.run([sys.executable, "-c", script, offline_env.endpoint], cwd=str(TESTS_DIR.parent),
+                                capture_output=True, text=True, timeout=30)
+        assert result.stdout.strip() == "0", result.stdout + result.stderr
+
+
+class TestOfflineProfile:
+    def test_cpu_profile(self, offline_env, tmp_path):
+        import pstats
+        from conftest import drove
+        profile_file = tmp_path / "apps.prof"
+        result = drove("--profile", "--profile-file", str(profile_file), "--profile-top", "5", "apps", "list")
+        assert "TEST_APP" in result.stdout
+        assert "Ordered by: cumulative time" in result.stderr, result.stderr
+        functions = {function for _, _, function in pstats.Stats(str(profile_file)).stats}
+        assert "_run" in functions
+
+    def test_profile_before_command(self, offline_env, tmp_path, monkeypatch):
+        from conftest import drove
+        monkeypatch.chdir(tmp_path)
+        result = drove("--profile", "apps", "list")
+        assert "TEST_APP" in result.stdout, result.stdout + result.stderr
+        assert "CPU profile written to drove-cpu-" in result.stderr
+        assert len(list(tmp_path.glob("drove-cpu-*.prof"))) == 1
+
+    def test_alloc_profile(self, offline_env, tmp_path):
+        from conftest import drove
+        profile_file = tmp_path / "apps.folded"
+        result = drove("--profile", "--profile-mode", "alloc", "--profile-file", str(profile_file), "apps", "list")
+        assert "Peak traced memory" in result.stderr, result.stderr
+        lines = profile_file.read_text().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,74 @@
+"""
+tests/test_offline_top.py — offline tests for ``drove top`` and the screen renderer.
+
+Run with:  pytest -m offline tests/test_offline_top.py
+"""
+import io
+import time
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+class TestOfflineScreenRenderer:
+    def test_only_changed_lines_are_redrawn(self):
+        import droveutils
+        stream = io.StringIO()
+        renderer = droveutils.ScreenRenderer(stream, interactive=True)
+        assert renderer.render(["a", "b", "c"]) == 3
+        assert renderer.render(["a", "b", "c"]) == 0
+        stream.truncate(0)
+        stream.seek(0)
+        assert renderer.render(["a", "x", "c"]) == 1
+        assert stream.getvalue() == "\x1b[2;1Hx\x1b[K"
+
+    def test_removed_lines_are_cleared(self):
+        import droveutils
+        stream = io.StringIO()
+        renderer = droveutils.ScreenRenderer(stream, interactive=True)
+        renderer.render(["a", "b", "c"])
+        stream.truncate(0)
+        stream.seek(0)
+        renderer.render(["a"])
+        assert stream.getvalue() == "\x1b[2;1H\x1b[K\x1b[3;1H\x1b[K"
+
+
+class TestOfflineTop:
+    def test_top_iterations(self, offline_env, monkeypatch):
+        from conftest import drove_ok
+        now = int(time.time() * 1000)
+        monkeypatch.setattr(offline_env.state, "events", [
+            {"id": "E1", "type": "APP_STATE_CHANGE", "time": now, "metadata": {"appId": "TEST_APP-1"}},
+        ])
+        out = drove_ok("top", "--iterations", "2", "--refresh", "0.1")
+        assert out.count("EXECUTORS (by core utilisation)") == 2
+        assert "exec-host-1" in out
+        assert "TEST_APP-1" in out
+        # The event is shown in both frames but fetched once per frame without duplicates
+        assert out.count("APP_STATE_CHANGE") == 2, f"Unexpected output: {out}"
+
+    def test_lists_are_not_fetched_every_frame(self, offline_env, monkeypatch):
+        from conftest import drove_ok
+        monkeypatch.setattr(offline_env.state, "events", [])
+        counts = offline_env.state.request_counts
+        counts.clear()
+        drove_ok("top", "--iterations", "5", "--refresh", "0.01")
+        assert counts["/apis/v1/cluster"] == 5
+        assert counts["/apis/v1/cluster/executors"] == 1
+        assert counts["/apis/v1/applications"] == 1
+
+        counts.clear()
+        drove_ok("top", "--iterations", "3", "--refresh", "0.01", "--full-refresh", "0")
+        assert counts["/apis/v1/cluster/executors"] == 3
+        assert counts["/apis/v1/applications"] == 3
+
+    def test_changed_rows_are_highlighted(self):
+        from plugins.top import Top
+        top = Top()
+        top.sections = {}
+        top.highlight = True
+        assert top.changed_rows("apps", ["A 1", "B 1"]) == ["A 1", "B 1"]
+        assert top.changed_rows("apps", ["A 1", "B 2", "C 1"]) == ["A 1", "\x1b[33mB 2\x1b[0m", "\x1b[33mC 1\x1b[0m"]
+        # Unchanged rows keep the highlight, so the frame does not change
+        assert top.changed_rows("apps", ["A 1", "B 2", "C 1"]) == ["A 1", "\x1b[33mB 2\x1b[0m", "\x1b[33mC 1\x1b[0m"]
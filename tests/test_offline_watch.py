@@ -0,0 +1,73 @@
+"""
+tests/test_offline_watch.py — offline tests for ``--watch`` on list commands.
+
+Run with:  pytest -m offline tests/test_offline_watch.py
+"""
+import io
+import signal
+import subprocess
+import time
+
+import pytest
+
+pytestmark = pytest.mark.offline
+
+
+class TestOfflineRowDiff:
+    def test_rows_are_matched_on_first_column(self):
+        import droveutils
+        previous = ["Id   State", "A-1  RUNNING", "B-1  RUNNING"]
+        current = ["Id   State", "A-1  MONITORING", "C-1  RUNNING"]
+        added, changed, removed = droveutils.diff_rows(previous, current)
+        assert added == {("C-1", 0)}
+        assert changed == {("A-1", 0)}
+        assert removed == ["B-1  RUNNING"]
+
+    def test_only_changes_are_printed_when_not_a_terminal(self):
+        import droveutils
+        frames = iter([["Id", "A-1 1"], ["Id", "A-1 1"], ["Id", "A-1 2", "B-1 1"]])
+        stream = io.StringIO()
+        droveutils.watch(lambda: next(frames), 0.01, stream=stream, interactive=False, iterations=3)
+        lines = stream.getvalue().splitlines()
+        assert "A-1 1" in lines
+        assert "~ A-1 2" in lines
+        assert "+ B-1 1" in lines
+        # The unchanged second frame prints nothing
+        assert sum(1 for line in lines if line.startswith("Every")) == 2
+
+
+class TestOfflineWatchCommand:
+    def test_watch_option_on_list_commands_only(self):
+        from conftest import drove_ok
+        assert "--watch" in drove_ok("apps", "list", "--help")
+        assert "--watch" not in drove_ok("describe", "app", "--help")
+        assert "--watch" not in drove_ok("apps", "scale", "--help")
+
+    @pytest.mark.parametrize("command", [
+        ["apps", "list"],
+        ["appinstances", "list", "TEST_APP_DEV-1"],
+        ["executor", "list"],
+        ["tasks", "list"],
+        ["localservices", "list"],
+    ])
+    def test_watched_commands_render_one_table(self, offline_env, tmp_path, monkeypatch, command):
+        # A single table is what fan-out merges under a Cluster column, and what --watch diffs row by row
+        from conftest import drove
+        monkeypatch.delenv("DROVE_ENDPOINT", raising=False)
+        config = tmp_path / "drove.ini"
+        config.write_text(f"[a]\nendpoint = {offline_env.endpoint}\n")
+        result = drove("-f", str(config), "--clusters", "a", *command)
+        assert result.stdout.split()[0] == "Cluster", f"Unexpected output: {result.stdout}"
+
+    def test_watch_shows_new_instances(self, offline_env):
+        from conftest import _base_cmd, drove_ok
+        process = subprocess.Popen(_base_cmd() + ["appinstances", "list", "TEST_APP_DEV-1", "--watch", "0.2"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            time.sleep(2)
+            drove_ok("apps", "scale", "TEST_APP_DEV-1", "1")
+            time.sleep(2)
+        finally:
+            process.send_signal(signal.SIGINT)
+            out, err = process.communicate(timeout=10)
+        assert "+ AI-test_app_dev-1-inst-000" in out, f"Unexpected output: {out}\n{err}"
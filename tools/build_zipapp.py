@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+tools/build_zipapp.py — build drove as a single file zipapp.
+
+The archive holds the CLI modules, plugins/ and droveapi/, and by default
+every runtime dependency, so it runs on any machine with a matching Python and
+no virtual environment:
+
+    python tools/build_zipapp.py                     # writes dist/drove.pyz
+    python dist/drove.pyz --help
+    python tools/build_zipapp.py --no-deps           # dependencies come from the interpreter
+
+Every module is compiled ahead of time. zipimport can not write bytecode into
+the archive, so without this each run would compile the whole CLI again. The
+bytecode is written next to its source (zipimport does not look in
+__pycache__) as unchecked hash based .pyc, so nothing is compared against the
+timestamps of the archive entries. Bytecode only works on the Python version
+that built it; on any other version the sources in the archive are used.
+
+Dependencies are installed from pure Python wheels only, because extension
+modules can not be imported from inside a zip file, at the versions pinned in
+poetry.lock. Installing them needs pip and access to the package index.
+"""
+from __future__ import annotations
+
+import argparse
+import compileall
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PACKAGES = ("plugins", "droveapi")
+
+MAIN = """\
+import drove
+
+drove.run()
+"""
+
+
+def dependencies(pyproject: Path) -> list[str]:
+    """pip requirements for the runtime dependencies in pyproject.toml. Poetry's ^ constraints become ranges."""
+    section = re.search(r"^\[tool\.poetry\.dependencies\]\n(.*?)(?=^\[)", pyproject.read_text(), re.S | re.M)
+    requirements = []
+    for name, spec in re.findall(r'^([A-Za-z0-9_.-]+)\s*=\s*"([^"]*)"', section.group(1) if section else "", re.M):
+        if name == "python":
+            continue
+        if spec.startswith("^"):
+            parts = [int(part) for part in spec[1:].split(".")]
+            # ^1.2.3 allows anything below 2.0.0, ^0.9.0 anything below 0.10.0
+            position = next((i for i, part in enumerate(parts) if part != 0), len(parts) - 1)
+            upper = parts[:position] + [parts[position] + 1]
+            spec = ">={0},<{1}".format(spec[1:], ".".join(str(part) for part in upper))
+        elif spec and spec[0].isdigit():
+            spec = "==" + spec
+        requirements.append(name + ("" if spec == "*" else spec))
+    return requirements
+
+
+def locked_versions(lock: Path) -> list[str]:
+    """name==version for every package in poetry.lock, used as pip constraints"""
+    if not lock.is_file():
+        return []
+    return ["{0}=={1}".format(name, version)
+            for name, version in re.findall(r'^\[\[package\]\]\nname = "([^"]+)"\nversion = "([^"]+)"', lock.read_text(), re.M)]
+
+
+def stage(target: Path) -> None:
+    """Copy the CLI modules and packages, leaving out caches"""
+    for source in ROOT.glob("*.py"):
+        shutil.copy2(source, target / source.name)
+    for package in PACKAGES:
+        shutil.copytree(ROOT / package, target / package, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+    (target / "__main__.py").write_text(MAIN)
+
+
+def install_dependencies(target: Path, requirements: list[str], constraints: list[str]) -> None:
+    version = "{0}.{1}".format(*sys.version_info[:2])
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as constraints_file:
+        constraints_file.write("\n".join(constraints) + "\n")
+        constraints_file.flush()
+        subprocess.run([sys.executable, "-m", "pip", "install", "--quiet", "--disable-pip-version-check",
+                        "--target", str(target), "--only-binary", ":all:", "--platform", "any",
+                        "--implementation", "py", "--python-version", version,
+                        "--constraint", constraints_file.name, *requirements], check=True)
+    # Installer metadata and console scripts are of no use inside the archive
+    shutil.rmtree(target / "bin", ignore_errors=True)
+    extensions = [path for path in target.rglob("*") if path.suffix in (".so", ".pyd")]
+    if extensions:
+        raise SystemExit("Extension modules can not be imported from a zipapp: " + ", ".join(map(str, extensions)))
+
+
+def compile_all(target: Path) -> None:
+    if not compileall.compile_dir(str(target), quiet=1, legacy=True, ddir="",
+                                  invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH):
+        raise SystemExit("Compiling the staged modules failed")
+
+
+def build(output: Path, interpreter: str | None, with_dependencies: bool, compress: bool) -> Path:
+    with tempfile.TemporaryDirectory(prefix="drove-zipapp-") as directory:
+        target = Path(directory)
+        stage(target)
+        if with_dependencies:
+            install_dependencies(target, dependencies(ROOT / "pyproject.toml"), locked_versions(ROOT / "poetry.lock"))
+        compile_all(target)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Entries are added in sorted order, so the same tree gives the same archive apart from timestamps
+        zipapp.create_archive(target, output, interpreter=interpreter, compressed=compress)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build drove as a single file zipapp")
+    parser.add_argument("--output", "-o", default=str(ROOT / "dist" / "drove.pyz"), help="Archive to write (default: dist/drove.pyz)")
+    parser.add_argument("--python", default="/usr/bin/env python3", help="Interpreter for the #! line (default: /usr/bin/env python3)")
+    parser.add_argument("--no-deps", dest="with_dependencies", default=True, action="store_false",
+                        help="Do not bundle dependencies, they must be installed for the interpreter that runs the archive")
+    parser.add_argument("--compress", default=False, action="store_true",
+                        help="Deflate the entries. The archive gets smaller and every start slower")
+    args = parser.parse_args()
+    output = build(Path(args.output), args.python, args.with_dependencies, args.compress)
+    print("Built {0} ({1:.0f} KB) for Python {2}.{3}".format(output, os.path.getsize(output) / 1024, *sys.version_info[:2]))
+
+
+if __name__ == "__main__":
+    main()